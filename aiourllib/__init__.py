@@ -1,9 +1,38 @@
 from . import exc
+from .cache import Cache
+from .pool import ConnectionPool
+from .pipeline import pipeline
+from .download import (
+    download,
+    parallel_download,
+)
+from .resolver import Resolver
+from .session import Session
+from .timeouts import Timeout
+from .tracing import TraceConfig
 from .api import (
+    gather_get,
     get,
     head,
     post,
+    put,
 )
 
 __version__ = '0.2.0'
-__all__ = ['get', 'head', 'post', 'exc']
+__all__ = [
+    'get',
+    'head',
+    'post',
+    'put',
+    'gather_get',
+    'pipeline',
+    'download',
+    'parallel_download',
+    'exc',
+    'Cache',
+    'ConnectionPool',
+    'Resolver',
+    'Session',
+    'Timeout',
+    'TraceConfig',
+]
@@ -3,7 +3,9 @@ import asyncio
 from . import (
     exc,
     models,
-    uri)
+    uri,
+    utils)
+from .pool import ConnectionPool
 from .response import Response
 from .request import Request
 
@@ -14,7 +16,12 @@ async def get(
     connection_timeout=None,
     read_timeout=None,
     loop=None,
+    pool=None,
+    max_content_size=None,
+    timeout=None,
+    trace_config=None,
 ):
+    utils.deprecated_loop(loop)
     return await Request(
         Request.PROTOCOL.METHOD_GET,
         uri_reference,
@@ -22,7 +29,10 @@ async def get(
     ).connect(
         connection_timeout=connection_timeout,
         read_timeout=read_timeout,
-        loop=loop,
+        pool=pool,
+        max_content_size=max_content_size,
+        timeout=timeout,
+        trace_config=trace_config,
     )
 
 
@@ -32,7 +42,12 @@ async def head(
     connection_timeout=None,
     read_timeout=None,
     loop=None,
+    pool=None,
+    max_content_size=None,
+    timeout=None,
+    trace_config=None,
 ):
+    utils.deprecated_loop(loop)
     return await Request(
         Request.PROTOCOL.METHOD_HEAD,
         uri_reference,
@@ -40,7 +55,10 @@ async def head(
     ).connect(
         connection_timeout=connection_timeout,
         read_timeout=read_timeout,
-        loop=loop,
+        pool=pool,
+        max_content_size=max_content_size,
+        timeout=timeout,
+        trace_config=trace_config,
     )
 
 
@@ -51,7 +69,12 @@ async def post(
     connection_timeout=None,
     read_timeout=None,
     loop=None,
+    pool=None,
+    max_content_size=None,
+    timeout=None,
+    trace_config=None,
 ):
+    utils.deprecated_loop(loop)
     return await Request(
         Request.PROTOCOL.METHOD_POST,
         uri_reference,
@@ -60,5 +83,106 @@ async def post(
     ).connect(
         connection_timeout=connection_timeout,
         read_timeout=read_timeout,
-        loop=loop,
+        pool=pool,
+        max_content_size=max_content_size,
+        timeout=timeout,
+        trace_config=trace_config,
     )
+
+
+async def put(
+    uri_reference,
+    data,
+    headers=None,
+    connection_timeout=None,
+    read_timeout=None,
+    loop=None,
+    pool=None,
+    max_content_size=None,
+    timeout=None,
+    trace_config=None,
+):
+    utils.deprecated_loop(loop)
+    return await Request(
+        Request.PROTOCOL.METHOD_PUT,
+        uri_reference,
+        data=data,
+        headers=headers,
+    ).connect(
+        connection_timeout=connection_timeout,
+        read_timeout=read_timeout,
+        pool=pool,
+        max_content_size=max_content_size,
+        timeout=timeout,
+        trace_config=trace_config,
+    )
+
+
+async def gather_get(
+    uri_references,
+    concurrency=ConnectionPool.LIMIT,
+    limit_per_host=ConnectionPool.LIMIT_PER_HOST,
+    headers=None,
+    connection_timeout=None,
+    read_timeout=None,
+    loop=None,
+    pool=None,
+    max_content_size=None,
+    timeout=None,
+    trace_config=None,
+):
+    utils.deprecated_loop(loop)
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(
+            limit=concurrency, limit_per_host=limit_per_host)
+
+    async def fetch(uri_reference):
+        try:
+            if isinstance(uri_reference, Request):
+                request = uri_reference
+                uri_reference = request.uri_reference
+            else:
+                request = Request(
+                    Request.PROTOCOL.METHOD_GET,
+                    uri_reference,
+                    headers=headers)
+            response = await request.connect(
+                connection_timeout=connection_timeout,
+                read_timeout=read_timeout,
+                pool=pool,
+                max_content_size=max_content_size,
+                timeout=timeout,
+                trace_config=trace_config)
+            await response.read_content()
+        except Exception as e:
+            return models.Result(uri_reference, None, e)
+        return models.Result(uri_reference, response, None)
+
+    # Only ``concurrency`` requests are in flight at a time, the next URI is
+    # taken from the iterable when one of them completes.
+    uri_references = utils.iter_async(uri_references)
+    pending = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    uri_reference = await uri_references.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.add(asyncio.ensure_future(fetch(uri_reference)))
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if own_pool:
+            pool.close()
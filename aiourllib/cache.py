@@ -0,0 +1,448 @@
+import asyncio
+import collections
+import email.utils
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+from . import (
+    models,
+    protocol,
+    uri)
+from .response import BufferedResponse
+
+
+CacheEntry = collections.namedtuple('CacheEntry', [
+    'status',
+    'http_version',
+    'headers',
+    'content',
+    'request_time',
+    'response_time',
+    'vary',
+])
+
+
+def parse_date(value):
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class MemoryStorage(object):
+    MAX_SIZE = 1024
+
+    def __init__(self, max_size=MAX_SIZE):
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key):
+        self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+
+class FileStorage(object):
+    SUFFIX = '.cache'
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def read(self, key):
+        try:
+            with open(self.path(key), 'rb') as fileobj:
+                stored_key, entry = pickle.load(fileobj)
+        except FileNotFoundError:
+            return None
+        except (EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            self.remove(key)
+            return None
+        if stored_key != key:
+            return None
+        return CacheEntry(*entry)
+
+    def write(self, key, entry):
+        # Written to a temporary file first, so readers never see a
+        # partially written entry.
+        fd, path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as fileobj:
+                pickle.dump((key, tuple(entry)), fileobj)
+            os.replace(path, self.path(key))
+        except BaseException:
+            os.unlink(path)
+            raise
+
+    def remove(self, key):
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def get(self, key):
+        return (await self.run(self.read, key))
+
+    async def set(self, key, entry):
+        await self.run(self.write, key, entry)
+
+    async def delete(self, key):
+        await self.run(self.remove, key)
+
+    async def clear(self):
+        def clear():
+            for name in os.listdir(self.directory):
+                if name.endswith(self.SUFFIX):
+                    os.unlink(os.path.join(self.directory, name))
+        await self.run(clear)
+
+
+class Cache(object):
+    PROTOCOL = protocol.ResponseProtocol
+
+    CACHEABLE_METHODS = (
+        protocol.RequestProtocol.METHOD_GET,
+        protocol.RequestProtocol.METHOD_HEAD,
+    )
+    # RFC 7231 section 6.1, status codes cacheable by default
+    CACHEABLE_STATUS_CODES = (
+        200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501)
+    # Headers of a 304 response that must not replace the stored ones
+    NOT_MODIFIED_SKIP_HEADERS = (
+        'content-length',
+        'content-encoding',
+        'transfer-encoding',
+    )
+    HEURISTIC_FRACTION = 0.1
+    MAX_ENTRY_SIZE = 2 ** 20
+
+    def __init__(
+        self,
+        storage=None,
+        max_entry_size=MAX_ENTRY_SIZE,
+    ):
+        self.storage = storage or MemoryStorage()
+        self.max_entry_size = max_entry_size
+
+        self._pending = {}
+
+    def time(self):
+        return time.time()
+
+    def key(self, method, uri_reference):
+        return '{} {}'.format(method, uri.normalize(uri_reference))
+
+    def cache_control(self, headers):
+        value = headers.get('Cache-Control')
+        if not value:
+            return {}
+        return self.PROTOCOL.parse_cache_control(value)
+
+    def seconds(self, cache_control, directive):
+        value = cache_control.get(directive)
+        return value if isinstance(value, int) else None
+
+    def freshness_lifetime(self, entry):
+        headers = models.Headers(entry.headers)
+        max_age = self.seconds(self.cache_control(headers), 'max-age')
+        if max_age is not None:
+            return max_age
+
+        date = parse_date(headers.get('Date')) or entry.response_time
+        if 'Expires' in headers:
+            expires = parse_date(headers.get('Expires'))
+            return max(0, expires - date) if expires is not None else 0
+
+        last_modified = parse_date(headers.get('Last-Modified'))
+        status_code = self.PROTOCOL.parse_status_code(entry.status)
+        if last_modified is not None and \
+                status_code in self.CACHEABLE_STATUS_CODES:
+            return max(0, (date - last_modified) * self.HEURISTIC_FRACTION)
+        return 0
+
+    def age(self, entry, now):
+        # RFC 7234 section 4.2.3
+        headers = models.Headers(entry.headers)
+        date = parse_date(headers.get('Date'))
+        apparent_age = \
+            max(0, entry.response_time - date) if date is not None else 0
+        try:
+            age_value = int(headers.get('Age') or 0)
+        except ValueError:
+            age_value = 0
+        corrected_age = age_value + entry.response_time - entry.request_time
+        return max(apparent_age, corrected_age) + now - entry.response_time
+
+    def too_large(self, size):
+        return self.max_entry_size is not None and \
+            size is not None and size > self.max_entry_size
+
+    def storable_head(self, method, response, request_cache_control):
+        # Decided before the body is read, responses that can not be stored
+        # are handed on unread. A body without Content-Length is read and
+        # its size checked by storable().
+        if self.too_large(response.content_length):
+            return False
+        return self.storable_headers(
+            method,
+            response.status,
+            response.headers,
+            request_cache_control)
+
+    def storable(self, method, entry, request_cache_control):
+        if self.too_large(len(entry.content)):
+            return False
+        return self.storable_headers(
+            method,
+            entry.status,
+            models.Headers(entry.headers),
+            request_cache_control)
+
+    def storable_headers(self, method, status, headers, request_cache_control):
+        if method not in self.CACHEABLE_METHODS:
+            return False
+        if 'no-store' in request_cache_control:
+            return False
+
+        cache_control = self.cache_control(headers)
+        if 'no-store' in cache_control:
+            return False
+        if any(v.strip() == '*' for v in self.vary_names(headers)):
+            return False
+
+        status_code = self.PROTOCOL.parse_status_code(status)
+        explicit = 'max-age' in cache_control or 'Expires' in headers
+        if status_code not in self.CACHEABLE_STATUS_CODES and \
+                not (explicit and status_code not in (206, 304)):
+            return False
+        return bool(
+            explicit or
+            'ETag' in headers or
+            'Last-Modified' in headers)
+
+    def vary_names(self, headers):
+        return [
+            name.strip()
+            for value in headers.getall('Vary')
+            for name in value.split(',') if name.strip()]
+
+    def vary(self, response_headers, request_headers):
+        return tuple(
+            (name.lower(), request_headers.get(name))
+            for name in self.vary_names(response_headers))
+
+    def matches(self, entry, request_headers):
+        return all(
+            request_headers.get(name) == value for name, value in entry.vary)
+
+    async def result(self, result, method, from_cache, owner, headers, send):
+        # A response that was not stored is unread, it goes to the caller
+        # that sent the request, others sharing it send their own.
+        if isinstance(result, CacheEntry):
+            return self.response(result, method, from_cache)
+        if owner:
+            return result
+        return (await send(headers))
+
+    def response(self, entry, method, from_cache=True):
+        response = BufferedResponse(
+            entry.status,
+            entry.http_version,
+            entry.headers,
+            entry.content,
+            request_method=method)
+        response.from_cache = from_cache
+        return response
+
+    def share(self, pending_key, func, *args):
+        # Concurrent misses and revalidations of the same resource share a
+        # single upstream request.
+        if pending_key not in self._pending:
+            task = asyncio.ensure_future(func(*args))
+            task.add_done_callback(
+                lambda task: self._pending.pop(pending_key, None))
+            self._pending[pending_key] = task
+        return self._pending[pending_key]
+
+    async def store(self, key, method, headers, response, request_time):
+        # Returns the entry, or the unread response if it can not be stored.
+        if not self.storable_head(
+                method, response, self.cache_control(headers)):
+            if response.status_code < 500:
+                await self.storage.delete(key)
+            return response
+
+        content = await response.read_content()
+        entry = CacheEntry(
+            response.status,
+            response.http_version,
+            response.headers.items(),
+            content,
+            request_time,
+            self.time(),
+            self.vary(response.headers, headers))
+        if self.storable(method, entry, self.cache_control(headers)):
+            await self.storage.set(key, entry)
+        elif response.status_code < 500:
+            await self.storage.delete(key)
+        return entry
+
+    async def request(self, key, method, headers, send):
+        request_time = self.time()
+        response = await send(headers)
+        entry = await self.store(key, method, headers, response, request_time)
+        return entry, False
+
+    async def revalidate(self, key, method, headers, entry, send):
+        stored = models.Headers(entry.headers)
+        conditional = models.Headers(headers.items())
+        if 'ETag' in stored:
+            conditional['If-None-Match'] = stored['ETag']
+        if 'Last-Modified' in stored:
+            conditional['If-Modified-Since'] = stored['Last-Modified']
+
+        request_time = self.time()
+        response = await send(conditional)
+        if response.status_code != 304:
+            entry = await self.store(
+                key, method, headers, response, request_time)
+            return entry, False
+
+        await response.read_content()
+        updated = models.Headers()
+        for name, value in response.headers.items():
+            if name.lower() not in self.NOT_MODIFIED_SKIP_HEADERS:
+                updated.add(name, value)
+        for name in updated:
+            if name in stored:
+                del stored[name]
+        stored.extend(updated.items())
+        entry = entry._replace(
+            headers=stored.items(),
+            request_time=request_time,
+            response_time=self.time())
+        await self.storage.set(key, entry)
+        return entry, True
+
+    def close_unstored(self, task):
+        # Nobody is left to read a response that was not stored.
+        def done(task):
+            if task.cancelled() or task.exception():
+                return
+            result, from_cache = task.result()
+            if not isinstance(result, CacheEntry):
+                result.close()
+
+        task.add_done_callback(done)
+
+    def revalidate_later(self, key, method, headers, entry, send):
+        # Background failures are only reported to the next foreground
+        # request, which finds the entry still stale.
+        self.close_unstored(self.share(
+            (key, tuple(headers.items())),
+            self.revalidate, key, method, headers, entry, send))
+
+    async def wait(self, task, owner):
+        # The shared task outlives a cancelled caller. The unread response
+        # the owner would have taken is closed once it arrives.
+        try:
+            return (await asyncio.shield(task))
+        except asyncio.CancelledError:
+            if owner:
+                self.close_unstored(task)
+            raise
+
+    async def fetch(self, method, uri_reference, headers, send):
+        headers = models.Headers(headers)
+        key = self.key(method, uri_reference)
+        pending_key = key, tuple(headers.items())
+        request_cache_control = self.cache_control(headers)
+
+        entry = None
+        if 'no-store' not in request_cache_control:
+            entry = await self.storage.get(key)
+        if entry is not None and not self.matches(entry, headers):
+            entry = None
+
+        owner = pending_key not in self._pending
+        if entry is None:
+            result, from_cache = await self.wait(self.share(
+                pending_key, self.request, key, method, headers, send), owner)
+            return (await self.result(
+                result, method, from_cache, owner, headers, send))
+
+        cache_control = self.cache_control(models.Headers(entry.headers))
+        lifetime = self.freshness_lifetime(entry)
+        staleness = self.age(entry, self.time()) - lifetime
+        if staleness < 0 and \
+                'no-cache' not in request_cache_control and \
+                'no-cache' not in cache_control:
+            return self.response(entry, method)
+
+        must_revalidate = 'must-revalidate' in cache_control or \
+            'no-cache' in cache_control
+        stale_while_revalidate = \
+            self.seconds(cache_control, 'stale-while-revalidate') or 0
+        if not must_revalidate and \
+                'no-cache' not in request_cache_control and \
+                staleness < stale_while_revalidate:
+            self.revalidate_later(key, method, headers, entry, send)
+            return self.response(entry, method)
+
+        stale_if_error = 0 if must_revalidate else max(
+            self.seconds(cache_control, 'stale-if-error') or 0,
+            self.seconds(request_cache_control, 'stale-if-error') or 0)
+        try:
+            fresh, from_cache = await self.wait(self.share(
+                pending_key,
+                self.revalidate, key, method, headers, entry, send), owner)
+        except Exception:
+            if staleness < stale_if_error:
+                return self.response(entry, method)
+            raise
+
+        if self.PROTOCOL.parse_status_code(fresh.status) >= 500 and \
+                staleness < stale_if_error:
+            if owner and not isinstance(fresh, CacheEntry):
+                fresh.close()
+            return self.response(entry, method)
+        return (await self.result(
+            fresh, method, from_cache, owner, headers, send))
+
+    async def invalidate(self, uri_reference):
+        # RFC 7234 section 4.4, unsafe requests invalidate stored responses
+        for method in self.CACHEABLE_METHODS:
+            await self.storage.delete(self.key(method, uri_reference))
+
+    async def clear(self):
+        await self.storage.clear()
+
+    def close(self):
+        for task in list(self._pending.values()):
+            task.cancel()
+        self._pending.clear()
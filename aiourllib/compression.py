@@ -0,0 +1,113 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from . import exc
+
+
+class Decoder(object):
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.size = 0
+
+    def limit(self):
+        if self.max_size is None:
+            return 0
+        # One byte past the limit is enough to tell that it was exceeded.
+        return self.max_size - self.size + 1
+
+    def check_size(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise exc.ContentSizeException(self.max_size)
+        return data
+
+    def decompress(self, data):
+        raise NotImplementedError
+
+    def flush(self):
+        return b''
+
+
+class ZlibDecoder(Decoder):
+    def __init__(self, max_size=None):
+        super().__init__(max_size)
+        self.obj = None
+        self.head = b''
+
+    def decompressobj(self, data):
+        raise NotImplementedError
+
+    def decompress(self, data):
+        if self.obj is None:
+            data = self.head + data
+            self.obj = self.decompressobj(data)
+            if self.obj is None:
+                self.head = data
+                return b''
+        try:
+            return self.check_size(self.obj.decompress(data, self.limit()))
+        except zlib.error as e:
+            raise exc.ContentEncodingException(str(e))
+
+    def flush(self):
+        if self.obj is None:
+            return b''
+        try:
+            return self.check_size(self.obj.flush())
+        except zlib.error as e:
+            raise exc.ContentEncodingException(str(e))
+
+
+class DeflateDecoder(ZlibDecoder):
+    def decompressobj(self, data):
+        if len(data) < 2:
+            return None
+        # Servers send both zlib-wrapped (RFC 1950) and raw (RFC 1951)
+        # deflate streams, so sniff the zlib header.
+        cmf, flg = data[0], data[1]
+        if cmf & 0x0f == 8 and ((cmf << 8) + flg) % 31 == 0:
+            return zlib.decompressobj()
+        return zlib.decompressobj(-zlib.MAX_WBITS)
+
+
+class GzipDecoder(ZlibDecoder):
+    def decompressobj(self, data):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        content = [super().decompress(data)]
+        # Concatenated gzip members are decoded one after another.
+        while self.obj and self.obj.eof and self.obj.unused_data:
+            data = self.obj.unused_data
+            self.obj = self.decompressobj(data)
+            content.append(super().decompress(data))
+        return b''.join(content)
+
+
+class BrotliDecoder(Decoder):
+    def __init__(self, max_size=None):
+        super().__init__(max_size)
+        self.obj = brotli.Decompressor()
+
+    def decompress(self, data):
+        try:
+            return self.check_size(self.obj.process(data))
+        except brotli.error as e:
+            raise exc.ContentEncodingException(str(e))
+
+
+DECODERS = {
+    'deflate': DeflateDecoder,
+    'gzip': GzipDecoder,
+    'x-gzip': GzipDecoder,
+}
+if brotli:
+    DECODERS['br'] = BrotliDecoder
+
+
+def decoder(encoding, max_size=None):
+    return DECODERS[encoding.lower()](max_size)
@@ -0,0 +1,194 @@
+import asyncio
+import os
+
+from . import (
+    api,
+    exc,
+    models,
+    utils)
+from .pool import ConnectionPool
+from .response import Response
+
+
+async def download(
+    uri_reference,
+    path,
+    resume=False,
+    preallocate=False,
+    chunk_size=Response.CHUNK_SIZE,
+    headers=None,
+    connection_timeout=None,
+    read_timeout=None,
+    loop=None,
+    pool=None,
+):
+    utils.deprecated_loop(loop)
+    headers = models.Headers(headers)
+    offset = 0
+    if resume:
+        try:
+            offset = os.stat(path).st_size
+        except FileNotFoundError:
+            pass
+        # Byte ranges refer to the encoded body, so resumable downloads
+        # must not be compressed.
+        if 'Accept-Encoding' not in headers:
+            headers['Accept-Encoding'] = 'identity'
+        if offset:
+            headers['Range'] = 'bytes={}-'.format(offset)
+
+    response = await api.get(
+        uri_reference,
+        headers=headers,
+        connection_timeout=connection_timeout,
+        read_timeout=read_timeout,
+        pool=pool)
+    try:
+        start, end, length = response.content_range
+        if response.status_code == 416 and offset and length == offset:
+            # Requested range starts at the end, the file is complete.
+            await response.read()
+            return response
+
+        if response.status_code == 200:
+            offset = 0
+        elif response.status_code != 206 or not offset or start != offset:
+            raise exc.ResponseException(response.status)
+
+        await response.save(
+            path,
+            offset=offset,
+            chunk_size=chunk_size,
+            preallocate=preallocate)
+    finally:
+        response.close()
+    return response
+
+
+async def download_range(
+    uri_reference,
+    fileobj,
+    start,
+    end,
+    retries=3,
+    chunk_size=Response.CHUNK_SIZE,
+    headers=None,
+    connection_timeout=None,
+    read_timeout=None,
+    loop=None,
+    pool=None,
+):
+    utils.deprecated_loop(loop)
+    headers = models.Headers(headers)
+    headers['Accept-Encoding'] = 'identity'
+    headers['Range'] = 'bytes={}-{}'.format(start, end)
+    for attempt in range(retries + 1):
+        try:
+            response = await api.get(
+                uri_reference,
+                headers=headers,
+                connection_timeout=connection_timeout,
+                read_timeout=read_timeout,
+                pool=pool)
+            try:
+                if response.status_code == 200:
+                    raise exc.RangeException(response.status)
+                if response.status_code != 206 or \
+                        response.content_range[:2] != (start, end):
+                    raise exc.ResponseException(response.status)
+                fileobj.seek(start)
+                return (await response.save(fileobj, chunk_size=chunk_size))
+            finally:
+                response.close()
+        except exc.RangeException:
+            raise
+        except (
+            exc.ResponseException,
+            exc.ConnectionTimeout,
+            exc.ReadTimeout,
+            OSError,
+        ):
+            if attempt == retries:
+                raise
+
+
+async def parallel_download(
+    uri_reference,
+    path,
+    parts=4,
+    min_part_size=2 ** 20,
+    retries=3,
+    chunk_size=Response.CHUNK_SIZE,
+    headers=None,
+    connection_timeout=None,
+    read_timeout=None,
+    loop=None,
+    pool=None,
+):
+    utils.deprecated_loop(loop)
+    options = dict(
+        headers=headers,
+        connection_timeout=connection_timeout,
+        read_timeout=read_timeout)
+
+    response = await api.head(uri_reference, pool=pool, **options)
+    length = response.content_length
+    accept_ranges = response.get_header('Accept-Ranges') or ''
+    parts = min(parts, (length or 0) // min_part_size)
+    if accept_ranges.lower() != 'bytes' or parts < 2:
+        return (await download(
+            uri_reference, path, chunk_size=chunk_size, pool=pool, **options))
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(limit_per_host=parts)
+
+    part_size = -(-length // parts)
+    ranges = [
+        (start, min(start + part_size, length) - 1)
+        for start in range(0, length, part_size)]
+
+    # Every range writes straight to its offset through its own handle of
+    # the preallocated file.
+    loop = asyncio.get_running_loop()
+    with open(path, 'wb') as fileobj:
+        await loop.run_in_executor(None, fileobj.truncate, length)
+    handles = [
+        await loop.run_in_executor(None, open, path, 'r+b')
+        for r in ranges]
+    tasks = [
+        asyncio.ensure_future(download_range(
+            uri_reference,
+            fileobj,
+            start,
+            end,
+            retries=retries,
+            chunk_size=chunk_size,
+            pool=pool,
+            **options))
+        for fileobj, (start, end) in zip(handles, ranges)]
+    ranges_ignored = False
+    try:
+        await asyncio.gather(*tasks)
+    except exc.RangeException:
+        ranges_ignored = True
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Their writes must be done before the handles are closed or the
+        # file is opened again.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for fileobj in handles:
+            await loop.run_in_executor(None, fileobj.close)
+        if own_pool:
+            pool.close()
+
+    if ranges_ignored:
+        # Accept-Ranges was advertised but not honoured.
+        return (await download(
+            uri_reference,
+            path,
+            chunk_size=chunk_size,
+            pool=None if own_pool else pool,
+            **options))
+    return response
@@ -0,0 +1,302 @@
+import asyncio
+
+from . import (
+    exc,
+    models)
+
+
+class HTTPProtocol(asyncio.BufferedProtocol):
+    # Reads straight into one reusable buffer. A reader waiting for more
+    # data is only woken up once what it asked for is there: a whole line,
+    # a whole head block or the requested number of bytes.
+    BUFFER_SIZE = 65536
+    MIN_FREE = 16384
+    HIGH_WATER = 262144
+    LOW_WATER = 65536
+
+    def __init__(self, limit=models.Connection.MAX_HEAD_SIZE):
+        self.limit = limit
+        self.transport = None
+
+        self._buffer = bytearray(self.BUFFER_SIZE)
+        self._start = 0
+        self._end = 0
+        self._eof = False
+        self._exception = None
+        self._reading_paused = False
+
+        self._waiter = None
+        self._wanted = 0
+        self._separator = None
+        self._searched = 0
+
+        self._writing_paused = False
+        self._drain_waiter = None
+
+        self._chunk_left = 0
+
+    # asyncio.BufferedProtocol
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        free = len(self._buffer) - self._end
+        if free >= self.MIN_FREE:
+            return memoryview(self._buffer)[self._end:]
+
+        size = self._end - self._start
+        if len(self._buffer) - size >= self.MIN_FREE:
+            # The slice assignment keeps the length, so it works while the
+            # transport still holds a view of the old buffer.
+            self._buffer[:size] = self._buffer[self._start:self._end]
+        else:
+            buffer = bytearray(max(len(self._buffer) * 2, size * 2))
+            buffer[:size] = self._buffer[self._start:self._end]
+            self._buffer = buffer
+        self._start, self._end = 0, size
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+        if self._end - self._start >= self.HIGH_WATER and \
+                not self._reading_paused:
+            self._reading_paused = True
+            self.transport.pause_reading()
+        if self._waiter is not None and self.satisfied():
+            self.wakeup()
+
+    def eof_received(self):
+        self._eof = True
+        self.wakeup()
+
+    def connection_lost(self, exception):
+        self._eof = True
+        self._exception = exception
+        self.wakeup()
+
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            if exception is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exception)
+
+    def pause_writing(self):
+        self._writing_paused = True
+
+    def resume_writing(self):
+        self._writing_paused = False
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    # buffer
+
+    def available(self):
+        return self._end - self._start
+
+    def satisfied(self):
+        if self._separator is None:
+            return self.available() >= self._wanted
+
+        start = self._start + self._searched
+        if self._buffer.find(self._separator, start, self._end) >= 0:
+            return True
+        self._searched = max(0, self.available() - len(self._separator) + 1)
+        return self.available() > self.limit
+
+    def wakeup(self):
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def wait(self, wanted=1, separator=None):
+        if self._exception is not None:
+            raise self._exception
+        if self._eof:
+            return
+
+        self._wanted = wanted
+        self._separator = separator
+        if self._reading_paused:
+            self._reading_paused = False
+            self.transport.resume_reading()
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+            self._separator = None
+
+    def consume(self, size):
+        data = bytes(self._buffer[self._start:self._start + size])
+        self._start += size
+        self._searched = 0
+        if self._start == self._end:
+            self._start = self._end = 0
+        if self._reading_paused and self.available() < self.LOW_WATER:
+            self._reading_paused = False
+            self.transport.resume_reading()
+        return data
+
+    # asyncio.StreamReader interface used by models.Connection
+
+    def at_eof(self):
+        return self._eof and not self.available()
+
+    async def read(self, size=-1):
+        if not size:
+            return b''
+        if not self.available():
+            await self.wait()
+        available = self.available()
+        if size < 0 or size > available:
+            size = available
+        return self.consume(size)
+
+    async def readexactly(self, size):
+        while self.available() < size:
+            if self._eof:
+                partial = self.consume(self.available())
+                raise asyncio.IncompleteReadError(partial, size)
+            await self.wait(size)
+        return self.consume(size)
+
+    async def readuntil(self, separator=b'\n'):
+        self._searched = 0
+        while True:
+            start = self._start + self._searched
+            index = self._buffer.find(separator, start, self._end)
+            if index >= 0:
+                size = index + len(separator) - self._start
+                if size > self.limit:
+                    raise asyncio.LimitOverrunError(
+                        'Separator is found, but chunk is longer than limit',
+                        index - self._start)
+                return self.consume(size)
+
+            if self.available() > self.limit:
+                raise asyncio.LimitOverrunError(
+                    'Separator is not found, and chunk exceed the limit',
+                    self.available())
+            if self._eof:
+                partial = self.consume(self.available())
+                raise asyncio.IncompleteReadError(partial, None)
+
+            self._searched = max(
+                0, self.available() - len(separator) + 1)
+            await self.wait(separator=separator)
+
+    async def readline(self):
+        try:
+            return (await self.readuntil(b'\n'))
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+
+    # chunked transfer coding
+
+    async def read_chunk(self, chunk_size):
+        # Returns the next piece of a chunked body, b'' once it is over.
+        if not self._chunk_left:
+            size = (await self.readline()).strip()
+            if not size:
+                return b''
+            size = int(size.split(b';', 1)[0], base=16)
+            if not size:
+                while (await self.readline()).strip():
+                    pass
+                return b''
+            self._chunk_left = size
+
+        if not self.available():
+            await self.wait()
+        if not self.available():
+            raise asyncio.IncompleteReadError(b'', self._chunk_left)
+
+        data = self.consume(
+            min(self._chunk_left, chunk_size, self.available()))
+        self._chunk_left -= len(data)
+        if not self._chunk_left:
+            await self.readline()
+        return data
+
+    # writing
+
+    async def drain(self):
+        if self.transport.is_closing():
+            raise ConnectionResetError('Connection lost')
+        if not self._writing_paused:
+            return
+        self._drain_waiter = asyncio.get_running_loop().create_future()
+        await self._drain_waiter
+
+
+class Writer(object):
+    # The part of asyncio.StreamWriter requests are written with.
+    def __init__(self, transport, protocol):
+        self.transport = transport
+        self.protocol = protocol
+
+    def write(self, data):
+        self.transport.write(data)
+
+    def writelines(self, data):
+        self.transport.writelines(data)
+
+    def can_write_eof(self):
+        return self.transport.can_write_eof()
+
+    def write_eof(self):
+        self.transport.write_eof()
+
+    def get_extra_info(self, name, default=None):
+        return self.transport.get_extra_info(name, default)
+
+    def is_closing(self):
+        return self.transport.is_closing()
+
+    def close(self):
+        self.transport.close()
+
+    async def drain(self):
+        await self.protocol.drain()
+
+
+class ProtocolConnection(models.Connection):
+    __slots__ = ()
+
+    async def open_stream(self, sock, ssl, server_hostname):
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_connection(
+            lambda: HTTPProtocol(self.MAX_HEAD_SIZE),
+            sock=sock,
+            ssl=ssl,
+            server_hostname=server_hostname)
+        return protocol, Writer(transport, protocol)
+
+    async def iter_chunks(self, chunk_size):
+        reader = self.socket_pair.reader
+        while True:
+            try:
+                chunk = await self.read_coro(reader.read_chunk(chunk_size))
+            except asyncio.IncompleteReadError:
+                raise exc.ConnectionClosed
+            if not chunk:
+                break
+            yield chunk
+
+
+ENGINES = {
+    'streams': models.Connection,
+    'protocol': ProtocolConnection,
+}
+
+
+def connection_class(engine):
+    if engine is None:
+        return models.Connection
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError('Unknown engine: {}'.format(engine))
@@ -6,10 +6,22 @@ class ReadTimeout(Exception):
     pass
 
 
+class RequestTimeout(Exception):
+    pass
+
+
 class ResponseException(Exception):
     pass
 
 
+class ConnectionClosed(ResponseException):
+    pass
+
+
+class HeadersException(ResponseException):
+    pass
+
+
 class TransferEncodingException(ResponseException):
     pass
 
@@ -18,6 +30,15 @@ class ContentEncodingException(ResponseException):
     pass
 
 
+class ContentSizeException(ResponseException):
+    pass
+
+
+class RangeException(ResponseException):
+    # The server sent the whole body instead of the requested range.
+    pass
+
+
 class URIException(Exception):
     pass
 
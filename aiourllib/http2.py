@@ -0,0 +1,518 @@
+import asyncio
+import collections
+import http
+
+from . import (
+    engine,
+    exc,
+    models,
+    protocol,
+    tls,
+    utils)
+from .response import Response
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+    import h2.settings
+except ImportError:
+    h2 = None
+
+
+# Headers that only mean something on an HTTP/1.1 connection.
+CONNECTION_HEADERS = (
+    'connection',
+    'host',
+    'keep-alive',
+    'proxy-connection',
+    'te',
+    'transfer-encoding',
+    'upgrade',
+)
+
+
+class StreamState(object):
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.headers = None
+        self.data = collections.deque()
+        self.ended = False
+        self.released = False
+        self.exception = None
+        self.waiter = None
+
+    def wake(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def fail(self, exception):
+        if self.exception is None:
+            self.exception = exception
+        self.wake()
+
+
+class HTTP2Protocol(asyncio.Protocol):
+    # One HTTP/2 connection, requests are streams multiplexed over it.
+    # Received data is only acknowledged once it was read, so a slow reader
+    # holds back its own stream without stalling the others.
+    WINDOW_SIZE = 2 ** 20
+    CONNECTION_WINDOW_SIZE = 2 ** 24
+
+    def __init__(self):
+        self.h2 = h2.connection.H2Connection(h2.config.H2Configuration(
+            client_side=True, header_encoding=None))
+        self.transport = None
+        self.streams = {}
+        self.closed = False
+        self.goaway = False
+        # Set when TLS did not negotiate h2 and HTTP/1.1 takes over.
+        self.fallback = False
+
+        self._writing_paused = False
+        self._drain_waiter = None
+
+    # asyncio.Protocol
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # The TLS handshake is done by now. The preface has to go out before
+        # anything is read, some loops deliver data while reading is paused.
+        ssl_object = transport.get_extra_info('ssl_object')
+        if ssl_object is not None and \
+                ssl_object.selected_alpn_protocol() != 'h2':
+            self.fallback = True
+            transport.pause_reading()
+        else:
+            self.initiate()
+
+    def data_received(self, data):
+        try:
+            events = self.h2.receive_data(data)
+        except h2.exceptions.ProtocolError as e:
+            self.flush()
+            self.transport.close()
+            self.fail(exc.ConnectionClosed(str(e)))
+            return
+
+        for event in events:
+            if isinstance(event, h2.events.ResponseReceived):
+                state = self.streams.get(event.stream_id)
+                if state is not None:
+                    state.headers = event.headers
+                    state.wake()
+            elif isinstance(event, h2.events.DataReceived):
+                self.data_frame(event)
+            elif isinstance(event, h2.events.StreamEnded):
+                state = self.streams.get(event.stream_id)
+                if state is not None:
+                    state.ended = True
+                    state.wake()
+                    if state.released:
+                        self.forget(state)
+            elif isinstance(event, h2.events.StreamReset):
+                state = self.streams.pop(event.stream_id, None)
+                if state is not None:
+                    state.fail(exc.ConnectionClosed(
+                        'Stream reset: {}'.format(event.error_code)))
+            elif isinstance(event, (
+                h2.events.WindowUpdated,
+                h2.events.RemoteSettingsChanged,
+            )):
+                for state in self.streams.values():
+                    state.wake()
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self.terminated(event)
+        self.flush()
+
+    def connection_lost(self, exception):
+        self.closed = True
+        self.fail(exc.ConnectionClosed(str(exception or 'Connection lost')))
+        if self._writing_paused:
+            self.resume_writing()
+
+    def pause_writing(self):
+        self._writing_paused = True
+
+    def resume_writing(self):
+        self._writing_paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    # Events
+
+    def data_frame(self, event):
+        state = self.streams.get(event.stream_id)
+        if state is None or state.released:
+            self.acknowledge(event.stream_id, event.flow_controlled_length)
+            return
+        # Padding is acknowledged right away, data once it was read.
+        padding = event.flow_controlled_length - len(event.data)
+        if padding:
+            self.acknowledge(event.stream_id, padding)
+        if event.data:
+            state.data.append(event.data)
+            state.wake()
+
+    def terminated(self, event):
+        # Streams above the last one the server processed are safe to retry
+        # on another connection.
+        self.goaway = True
+        for stream_id, state in list(self.streams.items()):
+            if stream_id > event.last_stream_id:
+                del self.streams[stream_id]
+                state.fail(exc.ConnectionClosed(
+                    'Connection terminated: {}'.format(event.error_code)))
+
+    def fail(self, exception):
+        streams, self.streams = self.streams, {}
+        for state in streams.values():
+            state.fail(exception)
+
+    # Connection
+
+    def initiate(self):
+        self.h2.initiate_connection()
+        self.h2.update_settings({
+            h2.settings.SettingCodes.ENABLE_PUSH: 0,
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: self.WINDOW_SIZE,
+        })
+        self.h2.increment_flow_control_window(
+            self.CONNECTION_WINDOW_SIZE - self.h2.inbound_flow_control_window)
+        self.flush()
+
+    def flush(self):
+        data = self.h2.data_to_send()
+        if data and not self.transport.is_closing():
+            self.transport.write(data)
+
+    def at_eof(self):
+        return self.closed or self.goaway
+
+    def max_streams(self):
+        return self.h2.remote_settings.max_concurrent_streams
+
+    def acknowledge(self, stream_id, size):
+        if not self.closed:
+            self.h2.acknowledge_received_data(size, stream_id)
+            self.flush()
+
+    def forget(self, state):
+        if self.streams.get(state.stream_id) is state:
+            del self.streams[state.stream_id]
+
+    def check(self, state):
+        if state.exception is not None:
+            raise state.exception
+        if self.closed:
+            raise exc.ConnectionClosed
+
+    async def wait(self, state):
+        state.waiter = asyncio.get_running_loop().create_future()
+        try:
+            await state.waiter
+        finally:
+            state.waiter = None
+
+    async def drain(self):
+        if self.closed:
+            raise ConnectionResetError('Connection lost')
+        if not self._writing_paused:
+            return
+        self._drain_waiter = asyncio.get_running_loop().create_future()
+        await self._drain_waiter
+
+    # Streams
+
+    def send_headers(self, headers, end_stream, priority=None):
+        if self.at_eof():
+            raise exc.ConnectionClosed
+        state = StreamState(self.h2.get_next_available_stream_id())
+        self.streams[state.stream_id] = state
+        self.h2.send_headers(
+            state.stream_id,
+            headers,
+            end_stream=end_stream,
+            priority_weight=priority)
+        self.flush()
+        return state
+
+    async def window(self, state):
+        while True:
+            self.check(state)
+            window = min(
+                self.h2.local_flow_control_window(state.stream_id),
+                self.h2.max_outbound_frame_size)
+            if window > 0:
+                return window
+            await self.wait(state)
+
+    async def send_data(self, state, data):
+        data = memoryview(data)
+        while data:
+            window = await self.window(state)
+            self.h2.send_data(state.stream_id, bytes(data[:window]))
+            data = data[window:]
+            self.flush()
+            await self.drain()
+
+    def end_stream(self, state):
+        self.check(state)
+        self.h2.end_stream(state.stream_id)
+        self.flush()
+
+    async def read_headers(self, state):
+        while state.headers is None:
+            self.check(state)
+            await self.wait(state)
+        return state.headers
+
+    async def read(self, state, size):
+        while not state.data:
+            if state.ended:
+                return b''
+            self.check(state)
+            await self.wait(state)
+
+        data = state.data.popleft()
+        if len(data) > size:
+            state.data.appendleft(data[size:])
+            data = data[:size]
+        self.acknowledge(state.stream_id, len(data))
+        return data
+
+    def finish(self, state, reset=False):
+        # Unread data is given back to the flow control window, a stream
+        # the server is still sending on is either reset or drained.
+        for data in state.data:
+            self.acknowledge(state.stream_id, len(data))
+        state.data.clear()
+        state.released = True
+
+        if state.ended or state.exception is not None:
+            self.forget(state)
+        elif reset:
+            self.forget(state)
+            if not self.closed:
+                try:
+                    self.h2.reset_stream(
+                        state.stream_id, h2.errors.ErrorCodes.CANCEL)
+                except h2.exceptions.StreamClosedError:
+                    pass
+                self.flush()
+
+
+class DataWriter(object):
+    # The part of asyncio.StreamWriter payloads are written with, the body
+    # goes out as DATA frames within the flow control windows.
+    FRAMED = True
+
+    def __init__(self, protocol, state):
+        self.protocol = protocol
+        self.state = state
+        self.pending = []
+
+    def write(self, data):
+        self.pending.append(data)
+
+    def writelines(self, data):
+        self.pending.extend(data)
+
+    def get_extra_info(self, name, default=None):
+        return self.protocol.transport.get_extra_info(name, default)
+
+    def is_closing(self):
+        return self.protocol.closed
+
+    async def drain(self):
+        data, self.pending = b''.join(self.pending), []
+        await self.protocol.send_data(self.state, data)
+
+
+class HTTP2Response(Response):
+    __slots__ = ()
+
+    HTTP_VERSION = '2'
+
+    async def read_headers(self):
+        fields = await self.connection.read_head()
+        if len(fields) > self.MAX_HEADERS + 1:
+            raise exc.HeadersException(
+                'Response has more than {} headers'.format(self.MAX_HEADERS))
+
+        status = None
+        headers = []
+        for name, value in fields:
+            name = utils.smart_text(name)
+            value = utils.smart_text(value)
+            if name == ':status':
+                status = value
+            elif not name.startswith(':'):
+                headers.append((name, value))
+
+        if not status:
+            raise exc.HeadersException('Response has no status')
+        try:
+            status = '{} {}'.format(
+                status, http.HTTPStatus(int(status)).phrase)
+        except ValueError:
+            pass
+
+        self.http_version = self.HTTP_VERSION
+        self.status = status
+        self.headers = models.Headers(headers)
+        # The size of the HPACK encoded head is not known here.
+        self.headers_received(0)
+
+
+class Stream(models.Connection):
+    # A request on a shared HTTP/2 connection. It reads like a connection
+    # of its own, timeouts included.
+    __slots__ = (
+        'connection',
+        'protocol',
+        'state',
+        'finished',
+    )
+
+    def __init__(self, connection):
+        super().__init__(connection.timeout)
+        self.connection = connection
+        self.protocol = connection.socket_pair.reader
+        self.state = None
+        self.finished = False
+
+    def is_alive(self):
+        return not (self.finished or self.protocol.at_eof())
+
+    def release(self):
+        self.finish()
+
+    def close(self):
+        self.timer.cancel()
+        self.finish(reset=True)
+
+    def finish(self, reset=False):
+        if self.finished:
+            return
+        self.finished = True
+        if self.state is not None:
+            self.protocol.finish(self.state, reset)
+        self.connection.stream_done()
+
+    def headers(self, request):
+        headers = [
+            (':method', request.method),
+            (':scheme', request.uri.scheme),
+            (':authority', request.headers['Host']),
+            (':path', protocol.RequestProtocol.path(request.uri)),
+        ]
+        for name, value in request.headers.items():
+            name = name.lower()
+            if name not in CONNECTION_HEADERS:
+                headers.append((name, str(value)))
+        return headers
+
+    async def send(self, request, max_content_size=Response.MAX_CONTENT_SIZE):
+        try:
+            self.state = self.protocol.send_headers(
+                self.headers(request),
+                end_stream=request.payload is None,
+                priority=request.priority)
+            if request.payload is not None:
+                await request.payload.write(
+                    DataWriter(self.protocol, self.state))
+                self.protocol.end_stream(self.state)
+            if self.trace is not None:
+                # Body bytes only, as for the response.
+                written = 0
+                if request.payload is not None:
+                    written = request.payload.length or 0
+                self.trace.bytes_out += written
+                self.trace.emit('request_written', bytes=written)
+
+            response = HTTP2Response(
+                self,
+                request_method=request.method,
+                max_content_size=max_content_size)
+            await response.read_headers()
+        except BaseException:
+            self.close()
+            raise
+        return response
+
+    async def read_head(self):
+        self.first_byte = True
+        headers = await self.read_coro(
+            self.protocol.read_headers(self.state))
+        if self.trace is not None:
+            self.trace.emit('first_byte')
+        self.first_byte = False
+        return headers
+
+    async def read(self, chunk_size):
+        return (await self.read_coro(
+            self.protocol.read(self.state, chunk_size)))
+
+
+class HTTP2Connection(engine.ProtocolConnection):
+    # HTTP/2 when the server picks h2 through ALPN, or always on cleartext
+    # (prior knowledge). A TLS server that does not offer h2 gets HTTP/1.1
+    # through the protocol engine.
+    MULTIPLEXING = True
+
+    __slots__ = (
+        'multiplexed',
+        'active',
+    )
+
+    def __init__(self, timeout=None):
+        if h2 is None:
+            raise ImportError('The http2 engine requires the h2 package')
+        super().__init__(timeout)
+        self.multiplexed = False
+        self.active = 0
+
+    async def open_stream(self, sock, ssl, server_hostname):
+        if ssl is True:
+            ssl = tls.create_context(alpn_protocols=tls.HTTP2_ALPN_PROTOCOLS)
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_connection(
+            HTTP2Protocol,
+            sock=sock,
+            ssl=ssl or None,
+            server_hostname=server_hostname)
+
+        if protocol.fallback:
+            protocol = engine.HTTPProtocol(self.MAX_HEAD_SIZE)
+            transport.set_protocol(protocol)
+            protocol.connection_made(transport)
+            transport.resume_reading()
+        else:
+            self.multiplexed = True
+        return protocol, engine.Writer(transport, protocol)
+
+    def has_capacity(self):
+        return self.active < self.socket_pair.reader.max_streams()
+
+    def stream(self):
+        stream = Stream(self)
+        stream.reused = self.reused
+        self.reused = True
+        self.active += 1
+        self.idle_since = None
+        return stream
+
+    def stream_done(self):
+        self.active -= 1
+        if self.active:
+            return
+        if self.is_alive():
+            self.idle_since = asyncio.get_running_loop().time()
+        else:
+            self.close()
+
+
+engine.ENGINES['http2'] = HTTP2Connection
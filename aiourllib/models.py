@@ -1,24 +1,135 @@
 import asyncio
 import collections
-import gzip
-import zlib
+import functools
+import socket
 
-from . import exc
+from . import (
+    compression,
+    exc,
+    tls,
+    utils)
+from .resolver import (
+    Resolver,
+    interleave)
+from .timeouts import (
+    Timeout,
+    Timer)
+from .uri import (  # noqa: F401
+    URI,
+    URIComponents)
 
 
 class Connection(object):
-    def __init__(self, connection_timeout, read_timeout, loop=None):
-        self.connection_timeout = connection_timeout
-        self.read_timeout = read_timeout
-        self.loop = loop
+    CHUNK_SIZE = 65536
+    MAX_HEAD_SIZE = 65536
+    HEAD_SEPARATOR = b'\r\n\r\n'
+    HAPPY_EYEBALLS_DELAY = 0.25
+    # Whether connections of the class may be shared by concurrent requests
+    # (HTTP/2), and whether this one turned out to be.
+    MULTIPLEXING = False
+    multiplexed = False
+
+    __slots__ = (
+        'timeout',
+        'deadline',
+        'first_byte',
+        'timer',
+        'trace',
+        'socket_pair',
+        'pool',
+        'key',
+        'idle_since',
+        'reused',
+    )
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or Timeout()
+
+        self.deadline = None
+        self.first_byte = True
+        self.timer = Timer()
+        self.trace = None
 
         self.socket_pair = None
 
+        self.pool = None
+        self.key = None
+        self.idle_since = None
+        self.reused = False
+
+    def is_alive(self):
+        if not self.socket_pair:
+            return False
+        reader, writer = self.socket_pair
+        return not (writer.transport.is_closing() or reader.at_eof())
+
+    def release(self):
+        if self.socket_pair:
+            # TLS 1.3 session tickets arrive after the handshake, once the
+            # response was read they are available for resumption.
+            tls.save_session(self.socket_pair.writer)
+        if self.pool:
+            self.pool.release(self)
+        elif self.socket_pair:
+            self.socket_pair.writer.close()
+
+    def close(self):
+        self.timer.cancel()
+        if self.socket_pair:
+            # As in release, connections that are not kept alive resume
+            # too.
+            tls.save_session(self.socket_pair.writer)
+        if self.pool:
+            self.pool.discard(self)
+        elif self.socket_pair:
+            self.socket_pair.writer.close()
+
+    def start(self, timeout=None, deadline=None, trace=None):
+        # Called for every request sent over the connection.
+        self.timeout = timeout or Timeout()
+        self.deadline = deadline
+        self.first_byte = True
+        self.trace = trace
+
+    def remaining(self, timeout):
+        if self.deadline is None:
+            return timeout
+        remaining = max(
+            0, self.deadline - asyncio.get_running_loop().time())
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def expired(self):
+        return self.deadline is not None and \
+            asyncio.get_running_loop().time() >= self.deadline
+
+    def read_deadline(self):
+        if self.first_byte:
+            timeout = self.timeout.first_byte
+        else:
+            timeout = self.timeout.between_bytes
+        if timeout is None:
+            return self.deadline
+        deadline = asyncio.get_running_loop().time() + timeout
+        if self.deadline is None:
+            return deadline
+        return min(deadline, self.deadline)
+
     async def read_coro(self, coro):
+        deadline = self.read_deadline()
+        if deadline is None:
+            return (await coro)
+
+        self.timer.arm(deadline)
         try:
-            return await asyncio.wait_for(coro, self.read_timeout)
-        except asyncio.TimeoutError:
+            return (await coro)
+        except asyncio.CancelledError:
+            if not self.timer.expired or self.timer.uncancel():
+                raise
+            if self.expired():
+                raise exc.RequestTimeout
             raise exc.ReadTimeout
+        finally:
+            self.timer.disarm()
 
     async def read(self, chunk_size):
         coro = self.socket_pair.reader.read(chunk_size)
@@ -32,85 +143,327 @@ class Connection(object):
         coro = self.socket_pair.reader.readline()
         return (await self.read_coro(coro))
 
-    async def read_chunks(self):
-        content = b''
+    async def readuntil(self, separator):
+        coro = self.socket_pair.reader.readuntil(separator)
+        return (await self.read_coro(coro))
+
+    async def read_head(self):
+        self.first_byte = True
+        try:
+            if self.trace is None:
+                head = await self.readuntil(self.HEAD_SEPARATOR)
+            else:
+                # The head is read in two steps to see its first byte.
+                head = await self.readexactly(1)
+                self.trace.emit('first_byte')
+                head += await self.readuntil(self.HEAD_SEPARATOR)
+            self.first_byte = False
+            return head
+        except asyncio.IncompleteReadError:
+            raise exc.ConnectionClosed
+        except asyncio.LimitOverrunError:
+            raise exc.HeadersException(
+                'Response head exceeds {} bytes'.format(self.MAX_HEAD_SIZE))
+
+    async def iter_chunks(self, chunk_size):
         while True:
-            chunk_size = (await self.readline()).strip()
-            if not chunk_size:
+            size = (await self.readline()).strip()
+            if not size:
                 break
 
-            chunk_size = int(chunk_size, base=16)
-            r = await self.readexactly(chunk_size)
-            if not r:
+            size = int(size.split(b';', 1)[0], base=16)
+            if not size:
+                await self.read_trailers()
                 break
 
-            content += r
+            while size:
+                r = await self.read(min(size, chunk_size))
+                if not r:
+                    raise exc.ConnectionClosed
+                size -= len(r)
+                yield r
+
             await self.readline()
 
-        return content
+    async def iter_until_eof(self, chunk_size):
+        while True:
+            r = await self.read(chunk_size)
+            if not r:
+                break
+            yield r
+
+    async def iter_identity(self, content_length, chunk_size):
+        if content_length is None:
+            async for r in self.iter_until_eof(chunk_size):
+                yield r
+            return
+
+        while content_length > 0:
+            r = await self.read(min(content_length, chunk_size))
+            if not r:
+                raise exc.ConnectionClosed
+            content_length -= len(r)
+            yield r
+
+    async def iter_decoded(self, chunks, decoder):
+        async for chunk in chunks:
+            chunk = decoder.decompress(chunk)
+            if chunk:
+                yield chunk
+        chunk = decoder.flush()
+        if chunk:
+            yield chunk
+
+    async def iter_deflate(self, content_length, chunk_size, max_size=None):
+        chunks = self.iter_identity(content_length, chunk_size)
+        decoder = compression.DeflateDecoder(max_size)
+        async for chunk in self.iter_decoded(chunks, decoder):
+            yield chunk
+
+    async def iter_gzip(self, content_length, chunk_size, max_size=None):
+        chunks = self.iter_identity(content_length, chunk_size)
+        decoder = compression.GzipDecoder(max_size)
+        async for chunk in self.iter_decoded(chunks, decoder):
+            yield chunk
+
+    async def read_chunks(self):
+        return (await utils.join_chunks(self.iter_chunks(self.CHUNK_SIZE)))
+
+    async def read_trailers(self):
+        while (await self.readline()).strip():
+            pass
+
+    async def read_until_eof(self):
+        return (await utils.join_chunks(
+            self.iter_until_eof(self.CHUNK_SIZE)))
 
     async def read_identity(self, content_length):
-        content = b''
-        while len(content) < content_length:
-            chunk_size = content_length - len(content)
+        return (await utils.join_chunks(
+            self.iter_identity(content_length, self.CHUNK_SIZE)))
 
-            r = await self.read(chunk_size)
+    async def read_deflate(self, content_length, max_size=None):
+        return (await utils.join_chunks(
+            self.iter_deflate(content_length, self.CHUNK_SIZE, max_size)))
 
-            if r:
-                content += r
-            else:
-                break
-        return content
+    async def read_gzip(self, content_length, max_size=None):
+        return (await utils.join_chunks(
+            self.iter_gzip(content_length, self.CHUNK_SIZE, max_size)))
 
-    async def read_deflate(self, content_length):
-        return zlib.decompress(await self.read_identity(content_length))
+    async def connect_socket(self, info):
+        family, type_, proto, canonname, address = info
+        sock = socket.socket(family, type_, proto)
+        try:
+            sock.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(sock, address)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    async def open_socket(self, infos):
+        # Happy eyeballs: start the next attempt when the previous one fails
+        # or has not succeeded within HAPPY_EYEBALLS_DELAY, first one wins.
+        infos = interleave(infos)
+        pending = set()
+        errors = []
+        sock = None
+        try:
+            while sock is None and (infos or pending):
+                if infos:
+                    pending.add(asyncio.ensure_future(
+                        self.connect_socket(infos.pop(0))))
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.HAPPY_EYEBALLS_DELAY if infos else None,
+                    return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception():
+                        errors.append(task.exception())
+                    elif sock is None:
+                        sock = task.result()
+                    else:
+                        task.result().close()
+        finally:
+            for task in pending:
+                task.cancel()
 
-    async def read_gzip(self, content_length):
-        return gzip.decompress(await self.read_identity(content_length))
+        if sock is None:
+            if len(errors) == 1:
+                raise errors[0]
+            raise OSError('Multiple exceptions: {}'.format(
+                ', '.join(str(e) for e in errors)))
+        return sock
 
-    async def connect(self, authority, port, ssl=False):
-        conn = asyncio.open_connection(
-            authority,
-            port,
+    async def open_stream(self, sock, ssl, server_hostname):
+        return (await asyncio.open_connection(
+            sock=sock,
             ssl=ssl,
-            loop=self.loop)
+            server_hostname=server_hostname,
+            limit=self.MAX_HEAD_SIZE))
+
+    async def open_connection(self, host, port, ssl, resolver):
+        trace = self.trace
+        if trace is not None:
+            trace.emit('dns_resolve_start', host=host, port=port)
+        infos = await resolver.resolve(host, port)
+        if trace is not None:
+            trace.emit('dns_resolve_end', host=host, port=port, infos=infos)
+            trace.emit('connect_start', host=host, port=port)
+        sock = await self.open_socket(infos)
+        if trace is not None:
+            trace.emit('connect_end', host=host, port=port)
+        try:
+            return (await self.open_tls_stream(sock, ssl, host))
+        except BaseException:
+            sock.close()
+            raise
+
+    async def open_tls_stream(self, sock, ssl, host):
+        if not ssl:
+            return (await self.open_stream(sock, ssl, None))
+        if self.trace is not None:
+            self.trace.emit('tls_handshake_start', host=host)
+        port = tls.PORT.set(tls.peer_port(sock.getpeername()))
+        try:
+            stream = await self.open_stream(sock, ssl, host.strip('[]'))
+        finally:
+            tls.PORT.reset(port)
+        if self.trace is not None:
+            self.trace.emit('tls_handshake_end', host=host)
+        return stream
 
+    async def open_unix_connection(self, path, ssl, host):
+        # The connected socket goes through open_stream like a TCP one, so
+        # every engine works over Unix domain sockets.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         try:
-            reader, writer = await asyncio.wait_for(
-                conn, self.connection_timeout, loop=self.loop)
+            sock.setblocking(False)
+            if self.trace is not None:
+                self.trace.emit('connect_start', unix_socket=path)
+            await asyncio.get_running_loop().sock_connect(sock, path)
+            if self.trace is not None:
+                self.trace.emit('connect_end', unix_socket=path)
+            return (await self.open_tls_stream(sock, ssl, host))
+        except BaseException:
+            sock.close()
+            raise
+
+    async def connect(
+        self,
+        host,
+        port,
+        ssl=False,
+        resolver=None,
+        unix_socket=None,
+    ):
+        if unix_socket is not None:
+            conn = self.open_unix_connection(unix_socket, ssl, host)
+        else:
+            conn = self.open_connection(
+                host,
+                port,
+                ssl,
+                resolver or Resolver(ttl=0))
+
+        timeout = self.remaining(self.timeout.connect)
+        try:
+            reader, writer = await asyncio.wait_for(conn, timeout)
         except asyncio.TimeoutError:
+            if self.expired():
+                raise exc.RequestTimeout
             raise exc.ConnectionTimeout
 
+        tls.save_session(writer)
         self.socket_pair = SocketPair(reader=reader, writer=writer)
         return self.socket_pair
 
 
+@functools.lru_cache(maxsize=256)
+def lower_name(name):
+    # Header names repeat across messages, their lowered forms are shared.
+    return name.lower()
+
+
+class Headers(object):
+    # _index maps lowered names to the first value, getall() is rare enough
+    # to scan the items.
+    __slots__ = (
+        '_items',
+        '_index',
+    )
+
+    def __init__(self, headers=None):
+        self._items = []
+        self._index = {}
+        if headers:
+            self.extend(headers)
+
+    def add(self, name, value):
+        self._items.append((name, value))
+        self._index.setdefault(lower_name(name), value)
+
+    def extend(self, headers):
+        if hasattr(headers, 'items'):
+            headers = headers.items()
+        for name, value in headers:
+            self.add(name, value)
+
+    def get(self, name, default=None):
+        return self._index.get(lower_name(name), default)
+
+    def getall(self, name):
+        lower = lower_name(name)
+        return [v for n, v in self._items if lower_name(n) == lower]
+
+    def items(self):
+        return list(self._items)
+
+    def keys(self):
+        return [name for name, value in self._items]
+
+    def values(self):
+        return [value for name, value in self._items]
+
+    def __getitem__(self, name):
+        return self._index[lower_name(name)]
+
+    def __setitem__(self, name, value):
+        if name in self:
+            del self[name]
+        self.add(name, value)
+
+    def __delitem__(self, name):
+        lower = lower_name(name)
+        del self._index[lower]
+        self._items = [
+            (n, v) for n, v in self._items if lower_name(n) != lower]
+
+    def __contains__(self, name):
+        return lower_name(name) in self._index
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, Headers):
+            return self._items == other._items
+        return NotImplemented
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._items)
+
+
 SocketPair = collections.namedtuple('SocketPair', [
     'reader',
     'writer',
 ])
 
 
-URI = collections.namedtuple('URI', [
-    'scheme',
-    'authority',
-    'path',
-    'query',
-    'fragment',
-    'components',
-])
-
-
-URIComponents = collections.namedtuple('URIComponents', [
-    'userinfo',
-    'port',
-    'host',
-    'ipv6_address',
-    'ipv4_address',
-    'reg_name',
-    'path_abempty',
-    'path_absolute',
-    'path_rootless',
-    'path_empty',
-    'relative_ref',
+Result = collections.namedtuple('Result', [
+    'uri_reference',
+    'response',
+    'exception',
 ])
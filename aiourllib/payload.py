@@ -0,0 +1,155 @@
+import asyncio
+import io
+import os
+
+
+class Payload(object):
+    CHUNK_SIZE = 65536
+    CONTENT_TYPE = 'application/octet-stream'
+
+    length = None
+    # Whether the body can be sent again, a request is only retried on a
+    # new connection when it is.
+    replayable = False
+
+    def __aiter__(self):
+        raise NotImplementedError
+
+    async def write(self, writer):
+        await self.write_chunks(writer, self)
+
+    def send(self, writer, data):
+        if writer.is_closing():
+            # uvloop raises RuntimeError on writes to a closed transport,
+            # this is the error asyncio's drain() raises instead.
+            raise ConnectionResetError('Connection lost')
+        writer.writelines(data)
+
+    async def write_chunks(self, writer, chunks):
+        # Bodies of unknown length go out with chunked transfer encoding,
+        # unless the writer frames the body itself (HTTP/2).
+        chunked = self.length is None and not getattr(writer, 'FRAMED', False)
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if chunked:
+                self.send(writer, [
+                    '{:x}\r\n'.format(len(chunk)).encode('latin-1'),
+                    chunk,
+                    b'\r\n',
+                ])
+            else:
+                self.send(writer, [chunk])
+            await writer.drain()
+
+        if chunked:
+            self.send(writer, [b'0\r\n\r\n'])
+        await writer.drain()
+
+
+class BytesPayload(Payload):
+    CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+    replayable = True
+
+    def __init__(self, data):
+        self.data = data
+        self.length = memoryview(data).nbytes
+
+    async def __aiter__(self):
+        yield self.data
+
+
+class FilePayload(Payload):
+    def __init__(self, fileobj):
+        self.path = None
+        self.fileobj = None
+        # Where the body starts in fileobj, every write seeks back to it.
+        self.offset = None
+        if isinstance(fileobj, os.PathLike):
+            self.path = fileobj
+            self.length = os.stat(fileobj).st_size
+            self.replayable = True
+            return
+
+        self.fileobj = fileobj
+        try:
+            self.offset = fileobj.tell()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+        try:
+            size = os.fstat(fileobj.fileno()).st_size
+            self.length = size - fileobj.tell()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            self.length = None
+
+    async def iter_file(self, fileobj):
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(
+                None, fileobj.read, self.CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    def __aiter__(self):
+        return self.iter_file(self.fileobj)
+
+    async def sendfile(self, writer, fileobj):
+        # Kernel sendfile(2) only works on plain sockets, TLS transports,
+        # HTTP/2 streams (and loops without sendfile support) read the file
+        # in chunks.
+        if self.length is None or writer.get_extra_info('ssl_object') or \
+                getattr(writer, 'FRAMED', False):
+            return False
+
+        await writer.drain()
+        try:
+            await asyncio.get_running_loop().sendfile(
+                writer.transport,
+                fileobj,
+                offset=fileobj.tell(),
+                count=self.length,
+                fallback=False)
+        except (
+            NotImplementedError,
+            asyncio.SendfileNotAvailableError,
+            io.UnsupportedOperation,
+        ):
+            return False
+        return True
+
+    async def write_file(self, writer, fileobj):
+        if self.offset is not None:
+            fileobj.seek(self.offset)
+        if not (await self.sendfile(writer, fileobj)):
+            await self.write_chunks(writer, self.iter_file(fileobj))
+
+    async def write(self, writer):
+        if self.path is None:
+            await self.write_file(writer, self.fileobj)
+        else:
+            with open(self.path, 'rb') as fileobj:
+                await self.write_file(writer, fileobj)
+
+
+class AsyncIterablePayload(Payload):
+    def __init__(self, iterable):
+        self.iterable = iterable
+
+    async def __aiter__(self):
+        async for chunk in self.iterable:
+            yield chunk
+
+
+def from_data(data, encoding='utf-8'):
+    if isinstance(data, Payload):
+        return data
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        return BytesPayload(data)
+    elif hasattr(data, 'read') or isinstance(data, os.PathLike):
+        return FilePayload(data)
+    elif hasattr(data, '__aiter__'):
+        return AsyncIterablePayload(data)
+    else:
+        return BytesPayload(str(data).encode(encoding))
@@ -0,0 +1,103 @@
+import asyncio
+import collections
+
+from . import (
+    exc,
+    utils)
+from .request import Request
+from .response import Response
+
+
+class PipelinedConnection(object):
+    # Responses release their connection once read, on a pipelined
+    # connection that only marks it as unusable for further requests.
+    def __init__(self, connection):
+        self.connection = connection
+        self.broken = False
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def release(self):
+        pass
+
+    def close(self):
+        self.broken = True
+
+
+async def pipeline(
+    requests,
+    depth=10,
+    headers=None,
+    connection_timeout=None,
+    read_timeout=None,
+    loop=None,
+    pool=None,
+    max_content_size=None,
+):
+    utils.deprecated_loop(loop)
+    requests = collections.deque(
+        r if isinstance(r, Request) else
+        Request(Request.PROTOCOL.METHOD_GET, r, headers=headers)
+        for r in requests)
+    if not requests:
+        return
+
+    key = requests[0].key
+    for request in requests:
+        if request.method not in Request.PROTOCOL.PIPELINE_METHODS:
+            raise ValueError(
+                'Method can not be pipelined: {}'.format(request.method))
+        if request.key != key:
+            raise ValueError(
+                'Pipelined requests must share a connection: {}'.format(
+                    request.uri_reference))
+
+    while requests:
+        connection = await requests[0].open_connection(
+            connection_timeout=connection_timeout,
+            read_timeout=read_timeout,
+            pool=pool)
+        pipelined = PipelinedConnection(connection)
+        in_flight = collections.deque()
+        answered = 0
+        try:
+            while requests or in_flight:
+                while requests and len(in_flight) < depth:
+                    # In flight before the write, a failed write resends it.
+                    request = requests.popleft()
+                    in_flight.append(request)
+                    await request.write(connection.socket_pair.writer)
+                await connection.socket_pair.writer.drain()
+
+                response = Response(
+                    pipelined,
+                    request_method=in_flight[0].method,
+                    max_content_size=max_content_size)
+                await response.read_headers()
+                await response.read_content()
+                in_flight.popleft()
+                answered += 1
+
+                yield response
+                if pipelined.broken:
+                    break
+        except (
+            exc.ConnectionClosed,
+            ConnectionError,
+            asyncio.IncompleteReadError,
+        ):
+            if depth == 1 and not answered:
+                raise
+            pipelined.broken = True
+        finally:
+            if pipelined.broken or requests or in_flight:
+                connection.close()
+            else:
+                connection.release()
+
+        # The server closed the connection with requests still in flight,
+        # the rest are sent one at a time.
+        if in_flight:
+            requests.extendleft(reversed(in_flight))
+            depth = 1
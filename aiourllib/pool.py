@@ -0,0 +1,274 @@
+import asyncio
+import collections
+
+from . import (
+    engine as engines,
+    uri,
+    utils)
+from .resolver import Resolver
+
+
+class ConnectionPool(object):
+    LIMIT = 100
+    LIMIT_PER_HOST = 10
+    KEEPALIVE_TIMEOUT = 15.
+
+    def __init__(
+        self,
+        limit=LIMIT,
+        limit_per_host=LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        resolver=None,
+        ssl_context=None,
+        engine=None,
+        unix_socket=None,
+        loop=None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        utils.deprecated_loop(loop)
+        self.resolver = resolver or Resolver()
+        self.ssl_context = ssl_context
+        self.connection_class = engines.connection_class(engine)
+        # Every connection goes to this socket instead of the host.
+        self.unix_socket = unix_socket
+
+        self.closed = False
+
+        # Created on first use, before Python 3.10 asyncio primitives are
+        # bound to the loop running when they are created.
+        self._semaphore = None
+        # Per host semaphores are dropped once no request holds or waits for
+        # a slot, so crawls over many hosts do not keep one for each.
+        self._host_semaphores = {}
+        self._host_users = collections.Counter()
+        self._idle = collections.defaultdict(collections.deque)
+        self._acquired = set()
+        self._multiplexed = collections.defaultdict(list)
+        self._connecting = {}
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    def host_semaphore(self, key):
+        if key not in self._host_semaphores:
+            self._host_semaphores[key] = \
+                asyncio.Semaphore(self.limit_per_host)
+        return self._host_semaphores[key]
+
+    def enter_host(self, key):
+        self._host_users[key] += 1
+        return self.host_semaphore(key)
+
+    def leave_host(self, key):
+        # After the slot was released, or when waiting for it failed.
+        self._host_users[key] -= 1
+        if not self._host_users[key]:
+            del self._host_users[key]
+            del self._host_semaphores[key]
+
+    @property
+    def size(self):
+        return len(self._acquired) + sum(len(c) for c in self._idle.values())
+
+    def time(self):
+        return asyncio.get_running_loop().time()
+
+    def purge(self):
+        expires = self.time() - self.keepalive_timeout
+        for key in list(self._idle):
+            idle = self._idle[key]
+            while idle and idle[0].idle_since < expires:
+                self.close_connection(idle.popleft())
+            if not idle:
+                del self._idle[key]
+
+        for connections in list(self._multiplexed.values()):
+            for connection in list(connections):
+                if not connection.is_alive() or (
+                    connection.idle_since is not None and
+                    connection.idle_since < expires
+                ):
+                    connection.close()
+
+    def evict(self):
+        oldest = None
+        for key, idle in self._idle.items():
+            if oldest is None or idle[0].idle_since < oldest[1].idle_since:
+                oldest = key, idle[0]
+        if oldest is None:
+            return False
+
+        key, connection = oldest
+        self._idle[key].popleft()
+        if not self._idle[key]:
+            del self._idle[key]
+        self.close_connection(connection)
+        return True
+
+    def pop_idle(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if connection.is_alive():
+                break
+            self.close_connection(connection)
+        else:
+            connection = None
+        if key in self._idle and not idle:
+            del self._idle[key]
+        return connection
+
+    def pop_stream(self, key):
+        for connection in self._multiplexed.get(key, ()):
+            if connection.is_alive() and connection.has_capacity():
+                return connection.stream()
+        return None
+
+    async def acquire_stream(self, key):
+        # HTTP/2 connections are shared, a request gets a stream on one that
+        # has room for it. While a connection to the host is negotiated the
+        # other requests wait to find out whether it can be shared.
+        stream = self.pop_stream(key)
+        if stream is None and key in self._connecting:
+            await self._connecting[key].wait()
+            stream = self.pop_stream(key)
+        return stream
+
+    async def connect(self, key, ssl, timeout=None, deadline=None, trace=None):
+        scheme, host, port = key
+        unix_socket = self.unix_socket
+        if scheme == uri.UNIX_SCHEME:
+            unix_socket = host
+        if ssl is True and self.ssl_context:
+            ssl = self.ssl_context
+        connection = self.connection_class(timeout)
+        connection.start(timeout, deadline, trace)
+        await connection.connect(
+            host, port, ssl, self.resolver, unix_socket)
+        return connection
+
+    async def acquire(
+        self,
+        key,
+        ssl=False,
+        timeout=None,
+        deadline=None,
+        trace=None,
+    ):
+        if self.closed:
+            raise RuntimeError('Connection pool is closed')
+
+        multiplexing = self.connection_class.MULTIPLEXING
+        if multiplexing:
+            stream = await self.acquire_stream(key)
+            if stream:
+                stream.start(timeout, deadline, trace)
+                if trace is not None:
+                    trace.emit('pool_hit', key=key, multiplexed=True)
+                return stream
+
+        host_semaphore = self.enter_host(key)
+        if trace is not None:
+            trace.emit('pool_wait_start', key=key)
+        try:
+            await self.semaphore.acquire()
+        except BaseException:
+            self.leave_host(key)
+            raise
+        try:
+            await host_semaphore.acquire()
+        except BaseException:
+            self.leave_host(key)
+            self.semaphore.release()
+            raise
+        if trace is not None:
+            trace.emit('pool_wait_end', key=key)
+
+        connecting = None
+        if multiplexing and key not in self._connecting:
+            connecting = self._connecting[key] = asyncio.Event()
+        try:
+            try:
+                self.purge()
+                connection = self.pop_idle(key)
+                if connection:
+                    connection.start(timeout, deadline, trace)
+                    connection.reused = True
+                    if trace is not None:
+                        trace.emit('pool_hit', key=key, multiplexed=False)
+                else:
+                    if trace is not None:
+                        trace.emit('pool_miss', key=key)
+                    while self.size >= self.limit and self.evict():
+                        pass
+                    connection = await self.connect(
+                        key, ssl, timeout, deadline, trace)
+            except BaseException:
+                host_semaphore.release()
+                self.leave_host(key)
+                self.semaphore.release()
+                raise
+
+            connection.pool = self
+            connection.key = key
+            connection.idle_since = None
+            self._acquired.add(connection)
+            if not connection.multiplexed:
+                return connection
+
+            # A shared connection keeps its place in the pool until closed.
+            self._multiplexed[key].append(connection)
+            stream = connection.stream()
+            stream.start(timeout, deadline, trace)
+            return stream
+        finally:
+            if connecting is not None:
+                del self._connecting[key]
+                connecting.set()
+
+    def forget(self, connection):
+        if connection not in self._acquired:
+            return False
+        self._acquired.discard(connection)
+        self.host_semaphore(connection.key).release()
+        self.leave_host(connection.key)
+        self.semaphore.release()
+        return True
+
+    def release(self, connection):
+        if not self.forget(connection):
+            return
+
+        if self.closed or not connection.is_alive():
+            self.close_connection(connection)
+        else:
+            connection.idle_since = self.time()
+            self._idle[connection.key].append(connection)
+
+    def discard(self, connection):
+        self.forget(connection)
+        connections = self._multiplexed.get(connection.key)
+        if connections and connection in connections:
+            connections.remove(connection)
+            if not connections:
+                del self._multiplexed[connection.key]
+        self.close_connection(connection)
+
+    def close_connection(self, connection):
+        if connection.socket_pair:
+            connection.socket_pair.writer.close()
+
+    def close(self):
+        self.closed = True
+        for idle in self._idle.values():
+            for connection in idle:
+                self.close_connection(connection)
+        self._idle.clear()
+        for connections in list(self._multiplexed.values()):
+            for connection in list(connections):
+                connection.close()
@@ -2,7 +2,9 @@ import re
 import string
 import ipaddress
 
-from . import utils
+from . import (
+    exc,
+    utils)
 
 
 class RequestProtocol(object):
@@ -15,6 +17,23 @@ class RequestProtocol(object):
     METHOD_TRACE = 'TRACE'
     METHOD_CONNECT = 'CONNECT'
 
+    IDEMPOTENT_METHODS = (
+        METHOD_GET,
+        METHOD_OPTIONS,
+        METHOD_HEAD,
+        METHOD_PUT,
+        METHOD_DELETE,
+        METHOD_TRACE,
+    )
+    PIPELINE_METHODS = (
+        METHOD_GET,
+        METHOD_HEAD,
+    )
+    SINGLEFLIGHT_METHODS = (
+        METHOD_GET,
+        METHOD_HEAD,
+    )
+
     HTTP_VERSION = '1.1'
 
     CRLF = '\r\n'
@@ -24,7 +43,7 @@ class RequestProtocol(object):
 
     @classmethod
     def path(cls, uri):
-        path = uri.path
+        path = uri.path or '/'
         if uri.query:
             path = '{}?{}'.format(path, uri.query)
         return path
@@ -34,6 +53,20 @@ class RequestProtocol(object):
         return '\r\n'.join(
             '{}: {}'.format(h, v) for h, v in headers.items())
 
+    @classmethod
+    def header_block(cls, items):
+        # Not cached, the values carry credentials and cookies.
+        return ''.join(
+            '{}: {}\r\n'.format(h, v) for h, v in items
+        ).encode('latin-1') + b'\r\n'
+
+    @classmethod
+    def request_head(cls, method, request_uri, headers):
+        return b''.join([
+            cls.request_line(method, request_uri).encode('latin-1'),
+            cls.header_block(headers.items()),
+        ])
+
     @classmethod
     def request_line(cls, method, request_uri):
         return cls.REQUEST_LINE.format(
@@ -48,11 +81,42 @@ class ResponseProtocol(object):
     COLON = ':'
     HTTP = 'HTTP/'
 
+    METHOD_HEAD = RequestProtocol.METHOD_HEAD
+    NO_CONTENT_STATUS_CODES = (204, 304)
+    SWITCHING_PROTOCOLS = 101
+
     REGEX_CHARSET = re.compile(r';\s*charset=([^;]*)', re.I)
+    REGEX_CONTENT_RANGE = re.compile(
+        r'bytes\s+(?:(\d+)-(\d+)|\*)/(\d+|\*)', re.I)
     REGEX_TOKEN = re.compile(
         r'([a-zA-Z][a-zA-Z_-]*)\s*(?:=(?:"([^"]*)"|'
         r'([^ \t",;]*)))?')
 
+    @classmethod
+    def parse_head(cls, head, max_headers):
+        lines = utils.smart_text(head, 'latin-1').split('\r\n')
+        if len(lines) - 3 > max_headers:
+            raise exc.HeadersException(
+                'Response has more than {} headers'.format(max_headers))
+
+        status = lines[0].strip()
+        headers = []
+        for line in lines[1:]:
+            if not line:
+                continue
+
+            if line[0] in ' \t' and headers:
+                # obs-fold continuation of the previous header value
+                header, value = headers[-1]
+                headers[-1] = header, '{} {}'.format(value, line.strip())
+                continue
+
+            header, colon, value = line.partition(cls.COLON)
+            if not colon:
+                raise ValueError('Bad header line: {}'.format(line))
+            headers.append((header.strip(), value.strip()))
+        return status, headers
+
     @classmethod
     def parse_status(cls, status):
         if status.startswith(cls.HTTP):
@@ -62,6 +126,11 @@ class ResponseProtocol(object):
                 utils.smart_text(status_text))
         return status
 
+    @classmethod
+    def parse_http_version(cls, status):
+        if status.startswith(cls.HTTP):
+            return status.split(None, 1)[0][len(cls.HTTP):]
+
     @classmethod
     def parse_status_code(cls, status):
         return int(status.split()[0])
@@ -73,6 +142,14 @@ class ResponseProtocol(object):
             charset = match.group(1)
         return charset
 
+    @classmethod
+    def parse_content_range(cls, header):
+        match = cls.REGEX_CONTENT_RANGE.match(utils.smart_text(header))
+        if not match:
+            return None, None, None
+        return tuple(
+            int(g) if g and g.isdigit() else None for g in match.groups())
+
     @classmethod
     def parse_cache_control(cls, header):
         header = utils.smart_text(header)
@@ -110,6 +187,10 @@ class ResponseProtocol(object):
         return cache_control
 
 
+def charset(chars):
+    return '[{}]'.format(re.escape(''.join(sorted(set(chars)))))
+
+
 class URIProtocol(object):
     ALPHA = string.ascii_letters
     DIGIT = string.digits
@@ -138,16 +219,29 @@ class URIProtocol(object):
     SEGMENT = PCHAR
     SEGMENT_NZ_NC = UNRESERVED + PCT_ENCODED + SUB_DELIMS + '@'
 
+    REGEX_SCHEME = re.compile(
+        '{}{}*'.format(charset(ALPHA), charset(SCHEME)))
+    REGEX_QUERY = re.compile('{}*'.format(charset(QUERY)))
+    REGEX_FRAGMENT = re.compile('{}*'.format(charset(FRAGMENT)))
+    REGEX_USERINFO = re.compile('{}*'.format(charset(USERINFO)))
+    REGEX_PORT = re.compile('{}+'.format(charset(PORT)))
+    REGEX_REG_NAME = re.compile('{}*'.format(charset(REG_NAME)))
+    REGEX_PATH_ABEMPTY = re.compile(
+        '(?:/{}*)*'.format(charset(SEGMENT)))
+    REGEX_PATH_ABSOLUTE = re.compile(
+        '/{0}+(?:/{0}*)*'.format(charset(SEGMENT)))
+    REGEX_PATH_NOSCHEME = re.compile(
+        '{}+(?:/{}*)*'.format(charset(SEGMENT_NZ_NC), charset(SEGMENT)))
+    REGEX_PATH_ROOTLESS = re.compile(
+        '{0}+(?:/{0}*)*'.format(charset(SEGMENT)))
+
     @classmethod
     def strip_scheme(cls, uri):
         if ':' not in uri:
             return None, uri
 
         scheme, hier_part = uri.split(':', 1)
-        if scheme[0] not in cls.ALPHA:
-            raise exc.SchemeException(uri)
-
-        if any(c not in cls.SCHEME for c in scheme[1:]):
+        if not cls.REGEX_SCHEME.fullmatch(scheme):
             raise exc.SchemeException(scheme)
 
         return scheme.lower(), hier_part
@@ -157,7 +251,7 @@ class URIProtocol(object):
         if '#' in hier_part:
             hier_part, fragment = \
                 hier_part.rsplit('#', 1)
-            if any(c not in cls.FRAGMENT for c in fragment):
+            if not cls.REGEX_FRAGMENT.fullmatch(fragment):
                 raise exc.FragmentException(fragment)
         else:
             fragment = None
@@ -167,7 +261,7 @@ class URIProtocol(object):
     def strip_query(cls, hier_part):
         if '?' in hier_part:
             hier_part, query = hier_part.rsplit('?', 1)
-            if any(c not in cls.QUERY for c in query):
+            if not cls.REGEX_QUERY.fullmatch(query):
                 raise exc.QueryException(query)
         else:
             query = None
@@ -189,7 +283,7 @@ class URIProtocol(object):
     def strip_userinfo(cls, authority):
         if '@' in authority:
             userinfo, authority = authority.split('@', 1)
-            if any(c not in cls.USERINFO for c in userinfo):
+            if not cls.REGEX_USERINFO.fullmatch(userinfo):
                 raise exc.UserInfoException(userinfo)
             if not userinfo:
                 userinfo = None
@@ -199,11 +293,12 @@ class URIProtocol(object):
 
     @classmethod
     def strip_port(cls, authority):
-        if ':' in authority:
+        # The colons of an IP-literal ([::1]) do not start a port.
+        if ':' in authority.rpartition(']')[2]:
             authority, port = authority.rsplit(':', 1)
         else:
             return None, authority
-        if port.isdigit():
+        if cls.REGEX_PORT.fullmatch(port):
             port = int(port)
         else:
             raise exc.PortException(port)
@@ -211,7 +306,7 @@ class URIProtocol(object):
 
     @classmethod
     def verify_reg_name(cls, host):
-        return all(c in cls.REG_NAME for c in host)
+        return bool(cls.REGEX_REG_NAME.fullmatch(host))
 
     @classmethod
     def verify_ipv4_address(cls, host):
@@ -230,6 +325,8 @@ class URIProtocol(object):
         if ':' not in host:
             return False
 
+        if host.startswith('[') and host.endswith(']'):
+            host = host[1:-1]
         try:
             ipaddress.IPv6Address(host)
         except ipaddress.AddressValueError:
@@ -239,66 +336,19 @@ class URIProtocol(object):
 
     @classmethod
     def verify_path_abempty(cls, path):
-        if not path:
-            return True
-
-        if not path.startswith('/'):
-            return False
-
-        segments = path.split('/')
-        for segment in segments:
-            if any(c not in cls.SEGMENT for c in segment):
-                return False
-        else:
-            return True
+        return bool(cls.REGEX_PATH_ABEMPTY.fullmatch(path))
 
     @classmethod
     def verify_path_absolute(cls, path):
-        if not path.startswith('/'):
-            return False
-
-        segments = path.split('/')[1:]
-        segment = segments[0]
-        if not segment or any(c not in cls.SEGMENT for c in segment):
-            return False
-
-        for segment in segments[1:]:
-            if any(c not in cls.SEGMENT for c in segment):
-                return False
-        else:
-            return True
+        return bool(cls.REGEX_PATH_ABSOLUTE.fullmatch(path))
 
     @classmethod
     def verify_path_noscheme(cls, path):
-        if path.startswith('/'):
-            return False
-
-        segments = path.split('/')
-        segment = segments[0]
-        if not segment or any(c not in cls.SEGMENT_NZ_NC for c in segment):
-            return False
-
-        for segment in segments[1:]:
-            if any(c not in cls.SEGMENT for c in segment):
-                return False
-        else:
-            return True
+        return bool(cls.REGEX_PATH_NOSCHEME.fullmatch(path))
 
     @classmethod
     def verify_path_rootless(cls, path):
-        if path.startswith('/'):
-            return False
-
-        segments = path.split('/')
-        segment = segments[0]
-        if not segment or any(c not in cls.SEGMENT for c in segment):
-            return False
-
-        for segment in segments[1:]:
-            if any(c not in cls.SEGMENT for c in segment):
-                return False
-        else:
-            return True
+        return bool(cls.REGEX_PATH_ROOTLESS.fullmatch(path))
 
     @classmethod
     def verify_path_empty(cls, path):
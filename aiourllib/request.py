@@ -1,18 +1,32 @@
 import asyncio
-import collections
 import functools
 import operator
+import urllib.parse
 
 from . import (
+    http2,
     models,
     exc,
+    payload,
     protocol,
     uri,
     utils)
 from .response import Response
+from .timeouts import Timeout
 
 
 class Request(object):
+    __slots__ = (
+        'method',
+        'priority',
+        'data',
+        'payload',
+        'uri_reference',
+        'uri',
+        'headers',
+        '_key',
+    )
+
     PROTOCOL = protocol.RequestProtocol
 
     def __init__(
@@ -22,58 +36,204 @@ class Request(object):
         data=None,
         data_encoding='utf-8',
         headers=None,
+        priority=None,
     ):
         self.method = method
-        self.data = data and str(data).encode(data_encoding)
+        # HTTP/2 stream weight, 1 to 256.
+        self.priority = priority
+        self.data = data
+        self.payload = None
+        if data is not None:
+            self.payload = payload.from_data(data, data_encoding)
 
         self.uri_reference = uri_reference
         self.uri = uri.from_string(uri_reference)
+        self._key = None
 
-        self.headers = collections.OrderedDict(headers or [])
-        self.headers['Host'] = self.uri.authority
+        self.headers = models.Headers(headers)
+        self.headers['Host'] = self.host
 
-        if self.data:
-            self.headers['Content-Type'] = 'application/x-www-form-urlencoded'
-            self.headers['Content-Length'] = len(data)
+        if self.payload is not None:
+            if 'Content-Type' not in self.headers:
+                self.headers['Content-Type'] = self.payload.CONTENT_TYPE
+            if self.payload.length is None:
+                self.headers['Transfer-Encoding'] = 'chunked'
+            else:
+                self.headers['Content-Length'] = self.payload.length
 
-    def __str__(self):
-        request_line = self.PROTOCOL.request_line(
+    def __bytes__(self):
+        return self.PROTOCOL.request_head(
             self.method,
-            self.PROTOCOL.path(self.uri))
-        return (
-            '{request_line}'
-            '{header_fields}\r\n'
-            '\r\n'.format(
-                request_line=request_line,
-                header_fields=self.PROTOCOL.header_fields(self.headers)))
+            self.PROTOCOL.path(self.uri),
+            self.headers)
+
+    def __str__(self):
+        return bytes(self).decode('latin-1')
+
+    @property
+    def ssl(self):
+        return self.uri.scheme == 'https'
+
+    @property
+    def host(self):
+        # The Host header: the authority without userinfo.
+        if self.uri.scheme == uri.UNIX_SCHEME:
+            return 'localhost'
+        return self.uri.authority.rpartition('@')[2]
+
+    @property
+    def unix_socket(self):
+        if self.uri.scheme == uri.UNIX_SCHEME:
+            return self.key[1]
+        return None
+
+    @property
+    def key(self):
+        # Requests with the same key can share connections. Built on first
+        # use, every pool lookup reads it.
+        if self._key is None:
+            components = self.uri.components
+            if self.uri.scheme == uri.UNIX_SCHEME:
+                self._key = (
+                    self.uri.scheme,
+                    urllib.parse.unquote(components.host),
+                    None)
+            else:
+                port = components.port
+                if port is None:
+                    port = uri.DEFAULT_PORTS.get(self.uri.scheme)
+                self._key = (self.uri.scheme, components.host.lower(), port)
+        return self._key
+
+    async def write(self, writer):
+        # Returns the number of bytes written, without chunked framing.
+        head = bytes(self)
+        if self.payload is None:
+            writer.write(head)
+        elif isinstance(self.payload, payload.BytesPayload):
+            writer.writelines([head, self.payload.data])
+        else:
+            writer.write(head)
+            await self.payload.write(writer)
+        await writer.drain()
+        if self.payload is None or self.payload.length is None:
+            return len(head)
+        return len(head) + self.payload.length
+
+    async def send(
+        self,
+        connection,
+        write_eof=False,
+        max_content_size=Response.MAX_CONTENT_SIZE,
+    ):
+        if isinstance(connection, http2.Stream):
+            return (await connection.send(self, max_content_size))
+
+        writer = connection.socket_pair.writer
+        try:
+            written = await self.write(writer)
+            if connection.trace is not None:
+                connection.trace.bytes_out += written
+                connection.trace.emit('request_written', bytes=written)
+
+            if write_eof and writer.can_write_eof():
+                writer.write_eof()
+
+            response = Response(
+                connection,
+                request_method=self.method,
+                max_content_size=max_content_size)
+            await response.read_headers()
+        except BaseException:
+            connection.close()
+            raise
+
+        return response
+
+    async def open_connection(
+        self,
+        connection_timeout=None,
+        read_timeout=None,
+        pool=None,
+        timeout=None,
+        deadline=None,
+        trace=None,
+    ):
+        timeout = Timeout.from_options(
+            timeout, connection_timeout, read_timeout)
+
+        if pool is not None:
+            acquire = pool.acquire(
+                self.key,
+                ssl=self.ssl,
+                timeout=timeout,
+                deadline=deadline,
+                trace=trace)
+            if deadline is None:
+                return (await acquire)
+            # Waiting for a free connection counts towards the total.
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                return (await asyncio.wait_for(acquire, max(0, remaining)))
+            except asyncio.TimeoutError:
+                raise exc.RequestTimeout
+
+        scheme, host, port = self.key
+        connection = models.Connection(timeout)
+        connection.start(timeout, deadline, trace)
+        await connection.connect(
+            host, port, self.ssl, unix_socket=self.unix_socket)
+        return connection
 
     async def connect(
         self,
         connection_timeout=None,
         read_timeout=None,
         loop=None,
+        pool=None,
+        max_content_size=Response.MAX_CONTENT_SIZE,
+        timeout=None,
+        trace_config=None,
     ):
-        if self.uri.scheme == 'https':
-            port, ssl = 443, True
-        else:
-            port, ssl = 80, False
-
-        connection = models.Connection(
-            connection_timeout, read_timeout, loop=loop)
-
-        socket_pair = await connection.connect(self.uri.authority, port, ssl)
-
-        request_line = str(self).encode('latin-1')
-        socket_pair.writer.write(request_line)
-
-        if self.data:
-            socket_pair.writer.write(self.data)
-            socket_pair.writer.write(b'\r\n')
-
-        if socket_pair.writer.can_write_eof():
-            socket_pair.writer.write_eof()
-
-        response = Response(connection)
-        await response.read_headers()
-
-        return response
+        utils.deprecated_loop(loop)
+        timeout = Timeout.from_options(
+            timeout, connection_timeout, read_timeout)
+        deadline = None
+        if timeout.total is not None:
+            deadline = asyncio.get_running_loop().time() + timeout.total
+
+        trace = None
+        if trace_config is not None:
+            trace = trace_config.trace(self)
+        if trace is not None:
+            trace.emit(
+                'request_start',
+                method=self.method,
+                uri_reference=self.uri_reference)
+
+        try:
+            while True:
+                connection = await self.open_connection(
+                    pool=pool,
+                    timeout=timeout,
+                    deadline=deadline,
+                    trace=trace)
+                try:
+                    return (await self.send(
+                        connection,
+                        write_eof=pool is None,
+                        max_content_size=max_content_size))
+                except (exc.ConnectionClosed, ConnectionError):
+                    # A keep-alive connection may be closed by the server
+                    # while idle, so idempotent requests are retried on a
+                    # new one, if their body can be sent again.
+                    if not connection.reused or self.method not in \
+                            self.PROTOCOL.IDEMPOTENT_METHODS:
+                        raise
+                    if self.payload is not None and \
+                            not self.payload.replayable:
+                        raise
+        except BaseException as e:
+            if trace is not None:
+                trace.emit('request_exception', exception=e)
+            raise
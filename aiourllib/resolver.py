@@ -0,0 +1,104 @@
+import asyncio
+import collections
+import ipaddress
+import itertools
+import socket
+
+from . import utils
+
+
+def address_info(address, port):
+    address = ipaddress.ip_address(address)
+    if address.version == 6:
+        return (
+            socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, '',
+            (str(address), port, 0, 0))
+    return (
+        socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '',
+        (str(address), port))
+
+
+def interleave(infos):
+    # RFC 8305: alternate address families, starting with the first one
+    # the resolver returned.
+    families = collections.OrderedDict()
+    for info in infos:
+        families.setdefault(info[0], []).append(info)
+    return [
+        info
+        for infos in itertools.zip_longest(*families.values())
+        for info in infos if info]
+
+
+class Resolver(object):
+    TTL = 60.
+    MAX_SIZE = 1024
+
+    def __init__(self, ttl=TTL, max_size=MAX_SIZE, hosts=None, loop=None):
+        utils.deprecated_loop(loop)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hosts = dict(hosts or {})
+
+        self._cache = collections.OrderedDict()
+        self._lookups = {}
+
+    def override(self, host, port):
+        addresses = self.hosts[host]
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        return [address_info(address, port) for address in addresses]
+
+    def cached(self, key):
+        if key not in self._cache:
+            return None
+        expires, infos = self._cache[key]
+        if expires < asyncio.get_running_loop().time():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return infos
+
+    def store(self, key, infos):
+        if not self.ttl or not self.max_size:
+            return
+        self._cache[key] = \
+            asyncio.get_running_loop().time() + self.ttl, infos
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
+    async def lookup(self, key):
+        host, port = key
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM)
+        finally:
+            del self._lookups[key]
+        infos = [
+            (family, type_, proto, '', address)
+            for family, type_, proto, canonname, address in infos]
+        self.store(key, infos)
+        return infos
+
+    async def resolve(self, host, port):
+        if host in self.hosts:
+            return self.override(host, port)
+
+        try:
+            return [address_info(host.strip('[]'), port)]
+        except ValueError:
+            pass
+
+        key = host, port
+        infos = self.cached(key)
+        if infos is not None:
+            return infos
+
+        # Concurrent lookups of the same host share a single getaddrinfo.
+        if key not in self._lookups:
+            self._lookups[key] = asyncio.ensure_future(self.lookup(key))
+        return (await asyncio.shield(self._lookups[key]))
@@ -1,16 +1,36 @@
 import asyncio
-import collections
 import json
-import gzip
-import zlib
+import os
 
 from . import (
+    compression,
     exc,
+    models,
     protocol,
     utils)
 
 
 class AbstractResponse(object):
+    # Tens of thousands of responses may be in flight, so they carry no
+    # __dict__. The parsed header values are filled in on first use.
+    __slots__ = (
+        'status',
+        'http_version',
+        'headers',
+        'request_method',
+        '_status_code',
+        '_content_encoding',
+        '_content_length',
+        '_content_type',
+        '_charset',
+        '_cache_control',
+        '_transfer_encoding',
+        '_content',
+    )
+
+    # Whether the response was served by the cache.
+    from_cache = False
+
     @property
     def status_code(self):
         if not self._status_code:
@@ -64,17 +84,66 @@ class AbstractResponse(object):
                 self.get_header('Cache-Control'))
         return self._cache_control
 
+    @property
+    def content_range(self):
+        return self.PROTOCOL.parse_content_range(
+            self.get_header('Content-Range') or '')
+
+    @property
+    def keep_alive(self):
+        connection = utils.smart_text(self.get_header('Connection') or '')
+        if self.http_version == '1.0':
+            return connection.lower() == 'keep-alive'
+        return connection.lower() != 'close'
+
+    @property
+    def has_content(self):
+        if self.request_method == self.PROTOCOL.METHOD_HEAD:
+            return False
+        status_code = self.status_code
+        return not (
+            100 <= status_code < 200 or
+            status_code in self.PROTOCOL.NO_CONTENT_STATUS_CODES)
+
+    async def read_text(self):
+        content = await self.read_content()
+        return content.decode(self.charset)
+
+    async def read_json(self):
+        content = await self.read_text()
+        return json.loads(content)
+
 
 class Response(AbstractResponse):
+    __slots__ = (
+        'connection',
+        'max_content_size',
+        'trace',
+        '_consumed',
+        '_released',
+    )
+
     PROTOCOL = protocol.ResponseProtocol
 
     CONTENT_TYPE = 'text/html'
     CHARSET = 'UTF-8'
+    CHUNK_SIZE = 65536
+    MAX_CONTENT_SIZE = None
+    MAX_HEADERS = 100
 
-    def __init__(self, connection):
+    def __init__(
+        self,
+        connection,
+        request_method=None,
+        max_content_size=MAX_CONTENT_SIZE,
+    ):
         self.connection = connection
+        self.request_method = request_method
+        self.max_content_size = max_content_size
+        self.trace = connection.trace
 
         self.status = None
+        self.http_version = None
         self.headers = None
 
         self._status_code = None
@@ -86,74 +155,299 @@ class Response(AbstractResponse):
         self._transfer_encoding = None
 
         self._content = None
+        self._consumed = False
+        self._released = False
 
     def get_header(self, header):
-        mapping = {h.lower(): h for h in self.headers}
-        header = header.lower()
-        if header in mapping:
-            return self.headers[mapping[header]]
+        return self.headers.get(header)
 
     def has_header(self, header):
-        mapping = {h.lower(): h for h in self.headers}
-        header = header.lower()
-        return header in mapping
+        return header in self.headers
+
+    def is_interim(self):
+        status_code = self.status_code
+        return 100 <= status_code < 200 and \
+            status_code != self.PROTOCOL.SWITCHING_PROTOCOLS
 
     async def read_headers(self):
-        status = (await self.connection.readline()).strip()
+        while True:
+            head = await self.connection.read_head()
+            status, headers = self.PROTOCOL.parse_head(head, self.MAX_HEADERS)
 
-        status = utils.smart_text(status, 'latin-1')
-        self.status = self.PROTOCOL.parse_status(status)
+            if not status:
+                raise exc.ConnectionClosed
 
-        self.headers = collections.OrderedDict()
-        while True:
-            line = (await self.connection.readline()).strip()
-            line = utils.smart_text(line, 'latin-1')
-            if not line:
+            self.http_version = self.PROTOCOL.parse_http_version(status)
+            self.status = self.PROTOCOL.parse_status(status)
+            self._status_code = None
+            if not self.is_interim():
                 break
+            # 1xx heads (100 Continue, 103 Early Hints) precede the final
+            # one, which is still to be read from the connection.
+            if self.trace is not None:
+                self.trace.bytes_in += len(head)
 
-            try:
-                header, value = line.split(self.PROTOCOL.COLON, 1)
-            except ValueError:
-                raise ValueError('Bad header line: {}'.format(
-                    utils.smart_text(line)))
-
-            header = utils.smart_text(header.strip(), 'latin-1')
-            value = utils.smart_text(value.strip(), 'latin-1')
-            self.headers[header] = value
-
-    def read(self):
-        if self.transfer_encoding == 'chunked':
-            return self.connection.read_chunks()
-        elif self.transfer_encoding == 'deflate':
-            return self.connection.read_deflate(self.content_length)
-        elif self.transfer_encoding == 'gzip':
-            return self.connection.read_gzip(self.content_length)
-        elif self.transfer_encoding == 'identity':
-            return self.connection.read_identity(self.content_length)
+        self.headers = models.Headers(headers)
+        self.headers_received(len(head))
+
+    def headers_received(self, size):
+        if self.trace is not None:
+            self.trace.bytes_in += size
+            self.trace.emit(
+                'headers_received',
+                status_code=self.status_code,
+                headers=self.headers,
+                bytes=size)
+
+        if not self.has_content:
+            self.release()
+            self.trace_end()
+
+    def trace_end(self):
+        if self.trace is not None:
+            self.trace.emit(
+                'request_end',
+                status_code=self.status_code,
+                bytes_in=self.trace.bytes_in,
+                bytes_out=self.trace.bytes_out)
+
+    def decoder(self):
+        encoding = self.content_encoding.lower()
+        if encoding == 'identity':
+            return None
+        elif encoding in compression.DECODERS:
+            return compression.decoder(encoding, self.max_content_size)
         else:
-            raise exc.TransferEncodingException(self.transfer_encoding)
+            raise exc.ContentEncodingException(self.content_encoding)
 
-    async def read_content(self):
-        if not self._content:
-            content = await self.read()
-            if self.content_encoding == 'deflate':
-                content = zlib.decompress(content)
-            elif self.content_encoding == 'gzip':
-                content = gzip.decompress(content)
-            elif self.content_encoding == 'identity':
-                pass
+    async def iter_raw(self, chunk_size=CHUNK_SIZE):
+        if self._consumed:
+            raise exc.ResponseException('Content is already consumed')
+        self._consumed = True
+
+        if not self.has_content:
+            return
+
+        trace = self.trace
+        try:
+            if self.transfer_encoding == 'chunked':
+                chunks = self.connection.iter_chunks(chunk_size)
+            elif self.transfer_encoding == 'deflate':
+                chunks = self.connection.iter_deflate(
+                    self.content_length, chunk_size, self.max_content_size)
+            elif self.transfer_encoding == 'gzip':
+                chunks = self.connection.iter_gzip(
+                    self.content_length, chunk_size, self.max_content_size)
+            elif self.transfer_encoding == 'identity':
+                chunks = self.connection.iter_identity(
+                    self.content_length, chunk_size)
             else:
-                raise exc.ContentEncodingException(self.content_encoding)
-            self._content = content
+                raise exc.TransferEncodingException(self.transfer_encoding)
+
+            async for chunk in chunks:
+                if trace is not None:
+                    trace.bytes_in += len(chunk)
+                    trace.emit('chunk_received', bytes=len(chunk))
+                yield chunk
+        except BaseException as e:
+            self.close()
+            if trace is not None:
+                trace.emit('request_exception', exception=e)
+            raise
+
+        self.release(
+            self.content_length is not None or
+            self.transfer_encoding == 'chunked')
+        self.trace_end()
+
+    async def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        try:
+            # An unsupported encoding also gives the connection back.
+            decoder = self.decoder()
+            chunks = self.iter_raw(chunk_size)
+            if decoder:
+                chunks = self.connection.iter_decoded(chunks, decoder)
+            async for chunk in chunks:
+                yield chunk
+        except BaseException:
+            self.close()
+            raise
+
+    def __aiter__(self):
+        return self.iter_chunks()
+
+    async def read(self):
+        return (await utils.join_chunks(self.iter_raw()))
+
+    async def read_content(self):
+        if self._content is None:
+            self._content = await utils.join_chunks(self.iter_chunks())
         return self._content
 
-    async def read_text(self):
-        content = await self.read_content()
-        return content.decode(self.charset)
+    async def write_to(self, fileobj, chunk_size=CHUNK_SIZE):
+        # Disk writes run in the executor while the next buffer is read
+        # from the socket.
+        loop = asyncio.get_running_loop()
+        written = 0
+        pending = None
+        buffer = []
+        buffered = 0
+        try:
+            async for chunk in self.iter_chunks(chunk_size):
+                buffer.append(chunk)
+                buffered += len(chunk)
+                if buffered < chunk_size:
+                    continue
 
-    async def read_json(self):
-        content = await self.read_text()
-        return json.loads(content)
+                if pending:
+                    await asyncio.shield(pending)
+                pending = loop.run_in_executor(
+                    None, fileobj.write, b''.join(buffer))
+                written += buffered
+                buffer, buffered = [], 0
+
+            if buffer:
+                if pending:
+                    await asyncio.shield(pending)
+                pending = loop.run_in_executor(
+                    None, fileobj.write, b''.join(buffer))
+                written += buffered
+        finally:
+            # A write handed to the executor keeps running when the task is
+            # cancelled, so it is shielded above and waited for here.
+            if pending:
+                await pending
+        await loop.run_in_executor(None, fileobj.flush)
+        return written
+
+    def preallocate(self, fileobj, offset):
+        if not hasattr(os, 'posix_fallocate'):
+            return
+        if self.content_length and self.content_encoding == 'identity':
+            os.posix_fallocate(fileobj.fileno(), offset, self.content_length)
+
+    async def save(
+        self,
+        target,
+        offset=0,
+        chunk_size=CHUNK_SIZE,
+        preallocate=False,
+    ):
+        loop = asyncio.get_running_loop()
+        if hasattr(target, 'write'):
+            if preallocate:
+                await loop.run_in_executor(
+                    None, self.preallocate, target, target.tell())
+            written = await self.write_to(target, chunk_size)
+            if preallocate:
+                await loop.run_in_executor(None, target.truncate)
+            return written
+
+        fileobj = await loop.run_in_executor(
+            None, open, target, 'r+b' if offset else 'wb')
+        try:
+            if offset:
+                fileobj.seek(offset)
+                fileobj.truncate()
+            if preallocate:
+                await loop.run_in_executor(
+                    None, self.preallocate, fileobj, offset)
+            written = await self.write_to(fileobj, chunk_size)
+            if preallocate:
+                await loop.run_in_executor(None, fileobj.truncate)
+            return written
+        finally:
+            await loop.run_in_executor(None, fileobj.close)
+
+    def release(self, reusable=True):
+        if self._released:
+            return
+        self._released = True
+        if reusable and self.keep_alive:
+            self.connection.release()
+        else:
+            self.connection.close()
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self.connection.close()
+
+
+class BufferedResponse(AbstractResponse):
+    # Decoded content held in memory, so cached and shared responses can be
+    # read by every caller regardless of the others.
+    __slots__ = ('from_cache',)
+
+    PROTOCOL = protocol.ResponseProtocol
+
+    CONTENT_TYPE = Response.CONTENT_TYPE
+    CHARSET = Response.CHARSET
+    CHUNK_SIZE = Response.CHUNK_SIZE
+
+    def __init__(
+        self,
+        status,
+        http_version,
+        headers,
+        content=b'',
+        request_method=None,
+    ):
+        self.status = status
+        self.http_version = http_version
+        self.headers = models.Headers(headers)
+        self.request_method = request_method
+
+        self._status_code = None
+        self._content_encoding = None
+        self._content_length = None
+        self._content_type = self.CONTENT_TYPE
+        self._charset = self.CHARSET
+        self._cache_control = None
+        self._transfer_encoding = None
+
+        self._content = content
+        self.from_cache = False
+
+    @classmethod
+    async def from_response(cls, response):
+        content = await response.read_content()
+        return cls(
+            response.status,
+            response.http_version,
+            response.headers.items(),
+            content,
+            response.request_method)
+
+    def copy(self):
+        return type(self)(
+            self.status,
+            self.http_version,
+            self.headers.items(),
+            self._content,
+            self.request_method)
+
+    def get_header(self, header):
+        return self.headers.get(header)
+
+    def has_header(self, header):
+        return header in self.headers
+
+    async def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        for offset in range(0, len(self._content), chunk_size):
+            yield self._content[offset:offset + chunk_size]
+
+    def __aiter__(self):
+        return self.iter_chunks()
+
+    async def read(self):
+        return self._content
+
+    async def read_content(self):
+        return self._content
+
+    def release(self, reusable=True):
+        pass
 
     def close(self):
-        self.connection.socket_pair.writer.close()
+        pass
@@ -0,0 +1,115 @@
+from . import (
+    api,
+    tls,
+    utils)
+from .cache import Cache
+from .singleflight import SingleFlight
+from .pool import ConnectionPool
+from .resolver import Resolver
+
+
+class Session(object):
+    def __init__(
+        self,
+        limit=ConnectionPool.LIMIT,
+        limit_per_host=ConnectionPool.LIMIT_PER_HOST,
+        keepalive_timeout=ConnectionPool.KEEPALIVE_TIMEOUT,
+        resolver=None,
+        ssl_context=None,
+        connection_timeout=None,
+        read_timeout=None,
+        timeout=None,
+        cache=None,
+        coalesce=False,
+        engine=None,
+        unix_socket=None,
+        trace_config=None,
+        loop=None,
+    ):
+        if ssl_context is None:
+            ssl_context = tls.create_context(alpn_protocols=(
+                tls.HTTP2_ALPN_PROTOCOLS if engine == 'http2' else
+                tls.ALPN_PROTOCOLS))
+        self.ssl_context = ssl_context
+        utils.deprecated_loop(loop)
+        self.resolver = resolver or Resolver()
+        self.pool = ConnectionPool(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            resolver=self.resolver,
+            ssl_context=self.ssl_context,
+            engine=engine,
+            unix_socket=unix_socket)
+        self.connection_timeout = connection_timeout
+        self.read_timeout = read_timeout
+        self.timeout = timeout
+        self.trace_config = trace_config
+        self.cache = Cache() if cache is True else cache
+        self.single_flight = SingleFlight() if coalesce else None
+
+    def options(self, **kwargs):
+        kwargs.setdefault('connection_timeout', self.connection_timeout)
+        kwargs.setdefault('read_timeout', self.read_timeout)
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('trace_config', self.trace_config)
+        kwargs['pool'] = self.pool
+        return kwargs
+
+    async def fetch(self, request, method, uri_reference, headers, kwargs):
+        options = self.options(**kwargs)
+
+        def send(headers):
+            return request(uri_reference, headers=headers, **options)
+
+        def share(headers):
+            return self.single_flight.fetch(
+                method, uri_reference, headers, send)
+
+        upstream = share if self.single_flight else send
+        if self.cache:
+            return (await self.cache.fetch(
+                method, uri_reference, headers, upstream))
+        return (await upstream(headers))
+
+    async def invalidate(self, uri_reference, response):
+        if self.cache and response.status_code < 400:
+            await self.cache.invalidate(uri_reference)
+        return response
+
+    async def get(self, uri_reference, headers=None, **kwargs):
+        return (await self.fetch(
+            api.get,
+            api.Request.PROTOCOL.METHOD_GET,
+            uri_reference,
+            headers,
+            kwargs))
+
+    async def head(self, uri_reference, headers=None, **kwargs):
+        return (await self.fetch(
+            api.head,
+            api.Request.PROTOCOL.METHOD_HEAD,
+            uri_reference,
+            headers,
+            kwargs))
+
+    async def post(self, uri_reference, data, headers=None, **kwargs):
+        return (await self.invalidate(uri_reference, await api.post(
+            uri_reference, data, headers=headers, **self.options(**kwargs))))
+
+    async def put(self, uri_reference, data, headers=None, **kwargs):
+        return (await self.invalidate(uri_reference, await api.put(
+            uri_reference, data, headers=headers, **self.options(**kwargs))))
+
+    def gather_get(self, uri_references, concurrency=None, **kwargs):
+        return api.gather_get(
+            uri_references,
+            concurrency=concurrency or self.pool.limit,
+            **self.options(**kwargs))
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
+        if self.single_flight:
+            self.single_flight.close()
+        self.pool.close()
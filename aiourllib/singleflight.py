@@ -0,0 +1,103 @@
+import asyncio
+
+from . import (
+    models,
+    protocol,
+    uri)
+from .response import BufferedResponse
+
+
+class Flight(object):
+    def __init__(self):
+        self.task = None
+        self.waiters = 0
+        # Whether a waiter took the unbuffered response.
+        self.claimed = False
+
+
+class SingleFlight(object):
+    METHODS = protocol.RequestProtocol.SINGLEFLIGHT_METHODS
+    MAX_SIZE = 2 ** 20
+
+    def __init__(self, max_size=MAX_SIZE):
+        self.max_size = max_size
+        self._flights = {}
+
+    def key(self, method, uri_reference, headers):
+        # Header names are case-insensitive, their order does not change
+        # the response.
+        return (
+            method,
+            uri.normalize(uri_reference),
+            tuple(sorted(
+                (name.lower(), value) for name, value in headers.items())),
+        )
+
+    def bufferable(self, response):
+        # Bodies without Content-Length can not be checked against the cap
+        # before they are read, they are not buffered.
+        if not response.has_content:
+            return True
+        length = response.content_length
+        return length is not None and (
+            self.max_size is None or length <= self.max_size)
+
+    async def request(self, key, flight, headers, send):
+        response = await send(headers)
+        if flight.waiters > 1 and self.bufferable(response):
+            return (await BufferedResponse.from_response(response)), True
+        # Nobody else is waiting, or the body is too large to share. Later
+        # callers start a flight of their own.
+        self.leave(key, flight)
+        return response, False
+
+    def start(self, key, headers, send):
+        flight = self._flights[key] = Flight()
+        flight.task = asyncio.ensure_future(
+            self.request(key, flight, headers, send))
+        flight.task.add_done_callback(lambda task: self.land(key, task))
+        return flight
+
+    def leave(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def land(self, key, task):
+        if self._flights.get(key) and self._flights[key].task is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def fetch(self, method, uri_reference, headers, send):
+        headers = models.Headers(headers)
+        if method not in self.METHODS:
+            return (await send(headers))
+
+        key = self.key(method, uri_reference, headers)
+        flight = self._flights.get(key) or self.start(key, headers, send)
+
+        # A waiter giving up leaves the request running for the others,
+        # it is only cancelled once nobody is waiting for it.
+        flight.waiters += 1
+        try:
+            shared, buffered = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+
+        if buffered:
+            # Every waiter gets its own response over the same content
+            # buffer.
+            return shared.copy()
+        # An unbuffered response can be read once, the other waiters send
+        # requests of their own.
+        if not flight.claimed:
+            flight.claimed = True
+            return shared
+        return (await send(headers))
+
+    def close(self):
+        for flight in list(self._flights.values()):
+            flight.task.cancel()
+        self._flights.clear()
@@ -0,0 +1,104 @@
+import asyncio
+
+
+class Timeout(object):
+    # connect: establishing the connection, TCP and TLS
+    # first_byte: from sending the request until the response head arrives
+    # between_bytes: between two reads of the response body
+    # total: the whole request, from connecting to the last body byte
+    __slots__ = (
+        'connect',
+        'first_byte',
+        'between_bytes',
+        'total',
+    )
+
+    def __init__(
+        self,
+        connect=None,
+        first_byte=None,
+        between_bytes=None,
+        total=None,
+    ):
+        self.connect = connect
+        self.first_byte = first_byte
+        self.between_bytes = between_bytes
+        self.total = total
+
+    @classmethod
+    def from_options(
+        cls,
+        timeout=None,
+        connection_timeout=None,
+        read_timeout=None,
+    ):
+        if timeout is not None:
+            return timeout
+        return cls(
+            connect=connection_timeout,
+            first_byte=read_timeout,
+            between_bytes=read_timeout)
+
+    def __repr__(self):
+        return '{}(connect={!r}, first_byte={!r}, between_bytes={!r}, ' \
+            'total={!r})'.format(
+                type(self).__name__,
+                self.connect,
+                self.first_byte,
+                self.between_bytes,
+                self.total)
+
+
+class Timer(object):
+    # A single timer handle per connection. Every read moves the deadline,
+    # the handle is only rescheduled once it fires early, so a stream of
+    # fast reads costs no timer handles at all.
+    def __init__(self):
+        self.deadline = None
+        self.task = None
+        self.expired = False
+
+        self._handle = None
+        self._when = None
+
+    def arm(self, deadline):
+        self.deadline = deadline
+        self.expired = False
+        self.task = asyncio.current_task()
+        if self._handle is None or self._when > deadline:
+            self.schedule(deadline)
+
+    def disarm(self):
+        self.task = None
+
+    def schedule(self, when):
+        if self._handle:
+            self._handle.cancel()
+        self._when = when
+        self._handle = asyncio.get_running_loop().call_at(when, self.fire)
+
+    def fire(self):
+        self._handle = None
+        if self.task is None:
+            return
+        if asyncio.get_running_loop().time() < self.deadline:
+            self.schedule(self.deadline)
+            return
+        self.expired = True
+        self.task.cancel()
+
+    def uncancel(self):
+        # Takes back our cancellation. True when the task was also
+        # cancelled from outside, as asyncio.timeout does that one wins.
+        # Before Python 3.11 the two can not be told apart.
+        self.expired = False
+        task = asyncio.current_task()
+        if hasattr(task, 'uncancel'):
+            return task.uncancel() > 0
+        return False
+
+    def cancel(self):
+        if self._handle:
+            self._handle.cancel()
+        self._handle = None
+        self.task = None
@@ -0,0 +1,120 @@
+import collections
+import contextvars
+import ssl
+
+
+ALPN_PROTOCOLS = ['http/1.1']
+HTTP2_ALPN_PROTOCOLS = ['h2', 'http/1.1']
+
+# The port of the connection being wrapped, wrap_bio is only given the host
+# name. Connection.open_tls_stream sets it around the handshake.
+PORT = contextvars.ContextVar('port', default=None)
+
+
+class SSLObject(ssl.SSLObject):
+    # The port the object was wrapped for. By the time the session is saved
+    # the transport may be closed and no longer know its peer.
+    port = None
+
+
+class SSLContext(ssl.SSLContext):
+    SESSION_CACHE_SIZE = 256
+
+    sslobject_class = SSLObject
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.session_cache_size = self.SESSION_CACHE_SIZE
+        self.sessions = collections.OrderedDict()
+
+    # Sessions are kept per host and port, services on the same host do not
+    # share one.
+    def get_session(self, server_hostname, port=None):
+        key = (server_hostname, port)
+        session = self.sessions.get(key)
+        if session is not None:
+            self.sessions.move_to_end(key)
+        return session
+
+    def save_session(self, server_hostname, session, port=None):
+        key = (server_hostname, port)
+        self.sessions[key] = session
+        self.sessions.move_to_end(key)
+        while len(self.sessions) > self.session_cache_size:
+            self.sessions.popitem(last=False)
+
+    def wrap_bio(
+        self,
+        incoming,
+        outgoing,
+        server_side=False,
+        server_hostname=None,
+        session=None,
+    ):
+        # asyncio wraps every client connection through wrap_bio, this is
+        # the one place a cached session can be handed to the handshake.
+        port = PORT.get()
+        if session is None and server_hostname and not server_side:
+            session = self.get_session(server_hostname, port)
+        ssl_object = super().wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session)
+        ssl_object.port = port
+        return ssl_object
+
+
+def create_context(
+    verify=True,
+    cafile=None,
+    capath=None,
+    cadata=None,
+    certfile=None,
+    keyfile=None,
+    ciphers=None,
+    alpn_protocols=ALPN_PROTOCOLS,
+    session_cache_size=SSLContext.SESSION_CACHE_SIZE,
+):
+    context = SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.session_cache_size = session_cache_size
+
+    if verify:
+        if cafile or capath or cadata:
+            context.load_verify_locations(cafile, capath, cadata)
+        else:
+            context.load_default_certs()
+    else:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    if certfile:
+        context.load_cert_chain(certfile, keyfile)
+    if ciphers:
+        context.set_ciphers(ciphers)
+    if alpn_protocols:
+        context.set_alpn_protocols(alpn_protocols)
+    return context
+
+
+def peer_port(address):
+    # The port of a socket address, the path for Unix domain sockets.
+    if isinstance(address, tuple):
+        return address[1]
+    return address
+
+
+def save_session(writer):
+    ssl_object = writer.get_extra_info('ssl_object')
+    if not isinstance(ssl_object, SSLObject):
+        return
+    # Before the TLS 1.3 tickets arrive the session can not be resumed, it
+    # must not replace one that can.
+    session = ssl_object.session
+    if session is not None and session.has_ticket and \
+            ssl_object.server_hostname:
+        ssl_object.context.save_session(
+            ssl_object.server_hostname,
+            session,
+            ssl_object.port)
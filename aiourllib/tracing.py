@@ -0,0 +1,67 @@
+import collections
+import time
+
+
+TraceEvent = collections.namedtuple('TraceEvent', [
+    'name',
+    'time',
+    'trace',
+    'info',
+])
+
+
+class Trace(object):
+    # The events of one request. Requests without listeners get no trace at
+    # all, every hook is a single ``is not None`` check then.
+    def __init__(self, config, request, context=None):
+        self.config = config
+        self.request = request
+        self.context = context
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def emit(self, name, **info):
+        listeners = self.config.listeners.get(name)
+        if listeners:
+            event = TraceEvent(name, time.monotonic(), self, info)
+            for listener in listeners:
+                listener(event)
+
+
+class TraceConfig(object):
+    EVENTS = (
+        'request_start',
+        'pool_wait_start',
+        'pool_wait_end',
+        'pool_hit',
+        'pool_miss',
+        'dns_resolve_start',
+        'dns_resolve_end',
+        'connect_start',
+        'connect_end',
+        'tls_handshake_start',
+        'tls_handshake_end',
+        'request_written',
+        'first_byte',
+        'headers_received',
+        'chunk_received',
+        'request_end',
+        'request_exception',
+    )
+
+    def __init__(self, context=None):
+        # context() is called once per request, its result is Trace.context.
+        self.context = context
+        self.listeners = {}
+
+    def on(self, name, listener):
+        if name not in self.EVENTS:
+            raise ValueError('Unknown trace event: {}'.format(name))
+        self.listeners.setdefault(name, []).append(listener)
+        return listener
+
+    def trace(self, request):
+        if not self.listeners:
+            return None
+        context = self.context() if self.context else None
+        return Trace(self, request, context)
@@ -1,110 +1,107 @@
 import collections
+import functools
 
 from . import (
     exc,
-    models,
     protocol)
 
+CACHE_SIZE = 1024
 
+
+URIComponents = collections.namedtuple('URIComponents', [
+    'userinfo',
+    'port',
+    'host',
+    'ipv6_address',
+    'ipv4_address',
+    'reg_name',
+    'path_abempty',
+    'path_absolute',
+    'path_rootless',
+    'path_empty',
+    'relative_ref',
+])
+
+
+class URI(collections.namedtuple('URI', [
+    'scheme',
+    'authority',
+    'path',
+    'query',
+    'fragment',
+])):
+    # The components are mostly None and most requests only need the host
+    # and port, so they are not stored but parsed on first use and shared
+    # by equal URIs.
+    __slots__ = ()
+
+    @property
+    def components(self):
+        return components(self)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
 def from_string(uri_reference):
-    uri = {
-        'scheme': None,
-        'authority': None,
-        'path': None,
-        'query': None,
-        'fragment': None,
-        'components': None,
-    }
-    components = {
-        'userinfo': None,
-        'port': None,
-        'host': None,
-        'ipv6_address': None,
-        'ipv4_address': None,
-        'reg_name': None,
-        'path_abempty': None,
-        'path_absolute': None,
-        'path_rootless': None,
-        'path_empty': None,
-        'relative_ref': None,
-    }
-
-    uri['scheme'], hier_part = protocol.URIProtocol.strip_scheme(uri_reference)
-    uri['fragment'], hier_part = protocol.URIProtocol.strip_fragment(hier_part)
-    uri['query'], hier_part = protocol.URIProtocol.strip_query(hier_part)
-    if uri['scheme']:
-        # hier_part
-        if hier_part.startswith('//'):
-            # authority
-            authority, hier_part = protocol.URIProtocol.strip_authority(
-                hier_part)
-            uri['authority'] = authority
-            components['userinfo'], authority = \
-                protocol.URIProtocol.strip_userinfo(authority)
-            components['port'], authority = \
-                protocol.URIProtocol.strip_port(authority)
-            host = components['host'] = authority
-            if protocol.URIProtocol.verify_ipv6_address(host):
-                components['ipv6_address'] = host
-            elif protocol.URIProtocol.verify_ipv4_address(host):
-                components['ipv4_address'] = host
-            elif protocol.URIProtocol.verify_reg_name(host):
-                components['reg_name'] = host
-            else:
-                raise exc.AuthorityException(host)
-
-            if protocol.URIProtocol.verify_path_abempty(hier_part):
-                uri['path'] = components['path_abempty'] = hier_part
-            else:
-                raise exc.PathException(hier_part)
-
-        elif protocol.URIProtocol.verify_path_absolute(hier_part):
-            uri['path'] = components['path_absolute'] = hier_part
-        elif protocol.URIProtocol.verify_path_rootless(hier_part):
-            uri['path'] = components['path_rootless'] = hier_part
-        elif protocol.URIProtocol.verify_path_empty(hier_part):
-            uri['path'] = components['path_empty'] = hier_part
+    return parse(uri_reference)
+
+
+def parse(uri_reference):
+    scheme, hier_part = protocol.URIProtocol.strip_scheme(uri_reference)
+    fragment, hier_part = protocol.URIProtocol.strip_fragment(hier_part)
+    query, hier_part = protocol.URIProtocol.strip_query(hier_part)
+    authority = None
+    if hier_part.startswith('//'):
+        authority, hier_part = protocol.URIProtocol.strip_authority(hier_part)
+
+    uri = URI(scheme, authority, hier_part, query, fragment)
+    # Validates the reference.
+    components(uri)
+    return uri
+
+
+# Sized with from_string, every cached URI keeps its components.
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def components(uri):
+    parts = dict.fromkeys(URIComponents._fields)
+    path = uri.path
+
+    if not uri.scheme:
+        parts['relative_ref'] = path
+        if uri.authority is not None:
+            parts['relative_ref'] = '//{}{}'.format(uri.authority, path)
+
+    if uri.authority is not None:
+        parts['userinfo'], authority = \
+            protocol.URIProtocol.strip_userinfo(uri.authority)
+        parts['port'], authority = \
+            protocol.URIProtocol.strip_port(authority)
+        host = parts['host'] = authority
+        if protocol.URIProtocol.verify_ipv6_address(host):
+            parts['ipv6_address'] = host
+        elif protocol.URIProtocol.verify_ipv4_address(host):
+            parts['ipv4_address'] = host
+        elif protocol.URIProtocol.verify_reg_name(host):
+            parts['reg_name'] = host
         else:
-            raise exc.PathException(hier_part)
+            raise exc.AuthorityException(host)
 
-    else:
-        # relative_ref
-        relative_ref = components['relative_ref'] = hier_part
-        if relative_ref.startswith('//'):
-            # authority
-            authority, relative_ref = protocol.URIProtocol.strip_authority(
-                relative_ref)
-            uri['authority'] = authority
-            components['userinfo'], authority = \
-                protocol.URIProtocol.strip_userinfo(authority)
-            components['port'], authority = \
-                protocol.URIProtocol.strip_port(authority)
-            host = components['host'] = authority
-            if protocol.URIProtocol.verify_ipv6_address(host):
-                components['ipv6_address'] = host
-            elif protocol.URIProtocol.verify_ipv4_address(host):
-                components['ipv4_address'] = host
-            elif protocol.URIProtocol.verify_reg_name(host):
-                components['reg_name'] = host
-            else:
-                raise exc.AuthorityException(host)
-
-            if protocol.URIProtocol.verify_path_abempty(relative_ref):
-                uri['path'] = components['path_abempty'] = relative_ref
-            else:
-                raise exc.PathException(relative_ref)
-
-        elif protocol.URIProtocol.verify_path_absolute(relative_ref):
-            uri['path'] = components['path_absolute'] = relative_ref
-        elif protocol.URIProtocol.verify_path_noscheme(relative_ref):
-            uri['path'] = components['path_noscheme'] = relative_ref
-        elif protocol.URIProtocol.verify_path_empty(relative_ref):
-            uri['path'] = components['path_empty'] = relative_ref
+        if protocol.URIProtocol.verify_path_abempty(path):
+            parts['path_abempty'] = path
         else:
-            raise exc.PathException(relative_ref)
-    components = models.URIComponents(**components)
-    uri['components'] = components
-    return models.URI(**uri)
+            raise exc.PathException(path)
+
+    elif protocol.URIProtocol.verify_path_absolute(path):
+        parts['path_absolute'] = path
+    elif uri.scheme and protocol.URIProtocol.verify_path_rootless(path):
+        parts['path_rootless'] = path
+    elif (not uri.scheme) and protocol.URIProtocol.verify_path_noscheme(path):
+        # relative_ref holds it, there is no path_noscheme component.
+        pass
+    elif protocol.URIProtocol.verify_path_empty(path):
+        parts['path_empty'] = path
+    else:
+        raise exc.PathException(path)
+    return URIComponents(**parts)
 
 
 def to_string(uri):
@@ -120,3 +117,29 @@ def to_string(uri):
     if uri.fragment:
         uri_reference = '{}#{}'.format(uri_reference, uri.fragment)
     return uri_reference
+
+
+DEFAULT_PORTS = {
+    'http': 80,
+    'https': 443,
+}
+
+# http+unix://%2Fvar%2Frun%2Fdocker.sock/info, the host is the
+# percent-encoded path of the socket.
+UNIX_SCHEME = 'http+unix'
+
+
+def normalize(uri_reference):
+    # The form used to tell whether two references name the same resource:
+    # case-insensitive parts lowered, default port and fragment dropped.
+    uri = from_string(uri_reference)
+    authority = uri.authority
+    if authority:
+        authority = authority.lower()
+        port = uri.components.port
+        if port is not None and port == DEFAULT_PORTS.get(uri.scheme):
+            authority = authority[:authority.rindex(':')]
+    return to_string(uri._replace(
+        authority=authority,
+        path=uri.path or '/',
+        fragment=None))
@@ -1,3 +1,6 @@
+import warnings
+
+
 def smart_bytes(s, encoding='latin-1', errors='strict'):
     if isinstance(s, str):
         return s.encode(encoding, errors)
@@ -10,3 +13,28 @@ def smart_text(s, encoding='latin-1', errors='strict'):
         return s
     else:
         return str(s, encoding, errors)
+
+
+async def join_chunks(chunks):
+    content = []
+    async for chunk in chunks:
+        content.append(chunk)
+    return b''.join(content)
+
+
+async def iter_async(iterable):
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+def deprecated_loop(loop):
+    if loop is not None:
+        warnings.warn(
+            'The loop argument is deprecated and ignored, requests run on '
+            'the running event loop',
+            DeprecationWarning,
+            stacklevel=3)
@@ -0,0 +1,101 @@
+"""Requests per second against a local keep-alive server for every
+available event loop and connection engine.
+
+Usage: python benchmarks/bench_loops.py [requests]
+
+The loops are asyncio and, when installed, uvloop. The engines are the
+``streams`` and ``protocol`` connection classes.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import aiourllib  # noqa: E402
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+CONCURRENCY = [1, 10, 50]
+ENGINES = ['streams', 'protocol']
+BODY = b'x' * 1024
+RESPONSE = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Length: ' + str(len(BODY)).encode() + b'\r\n'
+    b'\r\n' + BODY)
+
+handlers = set()
+
+
+async def handle(reader, writer):
+    handlers.add(asyncio.current_task())
+    try:
+        while True:
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(RESPONSE)
+            await writer.drain()
+    except (
+            asyncio.CancelledError,
+            asyncio.IncompleteReadError,
+            ConnectionError):
+        pass
+    finally:
+        writer.close()
+        handlers.discard(asyncio.current_task())
+
+
+async def bench(engine, requests, concurrency):
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    session = aiourllib.Session(limit_per_host=concurrency, engine=engine)
+    uri_reference = 'http://127.0.0.1:{}/'.format(port)
+    queue = list(range(requests))
+
+    async def worker():
+        while queue:
+            queue.pop()
+            response = await session.get(uri_reference)
+            await response.read_content()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    session.close()
+    server.close()
+    for handler in list(handlers):
+        handler.cancel()
+    await asyncio.gather(*handlers, return_exceptions=True)
+    await server.wait_closed()
+    return requests / elapsed
+
+
+def loops():
+    yield 'asyncio', asyncio.new_event_loop
+    if uvloop is not None:
+        yield 'uvloop', uvloop.new_event_loop
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print('{:>8} {:>9} {:>12} {:>10}'.format(
+        'loop', 'engine', 'concurrency', 'req/s'))
+    for name, new_event_loop in loops():
+        for engine in ENGINES:
+            for concurrency in CONCURRENCY:
+                loop = new_event_loop()
+                try:
+                    rate = loop.run_until_complete(
+                        bench(engine, requests, concurrency))
+                finally:
+                    loop.close()
+                print('{:>8} {:>9} {:>12} {:>10.0f}'.format(
+                    name, engine, concurrency, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Memory held per in-flight request: the ``Request``, its connection and
+the ``Response`` with the head read, body not yet consumed.
+
+Usage: python benchmarks/bench_memory.py [number of requests]
+
+Every request has its own URI so the parse caches do not hide the cost.
+The socket buffers belong to the transport and are not counted.
+"""
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from aiourllib import models  # noqa: E402
+from aiourllib.request import Request  # noqa: E402
+from aiourllib.response import Response  # noqa: E402
+
+
+REQUESTS = 50000
+HEAD = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: application/json; charset=utf-8\r\n'
+    b'Content-Length: 1024\r\n'
+    b'Cache-Control: max-age=60\r\n'
+    b'Server: bench\r\n'
+    b'\r\n')
+
+
+class Reader(object):
+    # Hands out the response head, stands in for the transport.
+    async def readuntil(self, separator):
+        return HEAD
+
+
+def requests(number):
+    return [
+        Request('GET', 'https://api.example.com/items/{}?page=2'.format(n))
+        for n in range(number)]
+
+
+def connections(number):
+    reader = Reader()
+    connections = []
+    for _ in range(number):
+        connection = models.Connection()
+        connection.socket_pair = models.SocketPair(reader, None)
+        connections.append(connection)
+    return connections
+
+
+async def responses(connections):
+    responses = []
+    for connection in connections:
+        response = Response(connection, request_method='GET')
+        await response.read_headers()
+        # The properties a client typically looks at.
+        response.status_code
+        response.content_length
+        response.charset
+        responses.append(response)
+    return responses
+
+
+def measure(func, *args):
+    # Returns the result and the bytes it holds on to.
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS
+    loop = asyncio.new_event_loop()
+    tracemalloc.start()
+
+    held_requests, request_bytes = measure(requests, number)
+    held_connections, connection_bytes = measure(connections, number)
+    held_responses, response_bytes = measure(
+        lambda: loop.run_until_complete(responses(held_connections)))
+
+    tracemalloc.stop()
+    loop.close()
+
+    total = request_bytes + connection_bytes + response_bytes
+    for name, size in [
+        ('request', request_bytes),
+        ('connection', connection_bytes),
+        ('response', response_bytes),
+        ('total', total),
+    ]:
+        print('{:>12} {:>10.0f} bytes'.format(name, size / number))
+    print('{:>12} {:>10.1f} MB for {} requests'.format(
+        'in flight', total / 2 ** 20, number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Body accumulation throughput of ``Connection.read_chunks`` and
+``Connection.read_identity`` for growing body sizes.
+
+Usage: python benchmarks/bench_read.py [chunk size in bytes]
+
+With linear accumulation MB/s stays flat as the body grows.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from aiourllib import models  # noqa: E402
+
+
+SIZES = [2 ** 20, 2 ** 21, 2 ** 22, 2 ** 23, 2 ** 24]
+
+
+def chunked_body(size, chunk_size):
+    chunk = b'x' * chunk_size
+    head = '{:x}\r\n'.format(chunk_size).encode()
+    return (head + chunk + b'\r\n') * (size // chunk_size) + b'0\r\n\r\n'
+
+
+def connection(data):
+    reader = asyncio.StreamReader(limit=2 ** 30)
+    reader.feed_data(data)
+    reader.feed_eof()
+    connection = models.Connection()
+    connection.socket_pair = models.SocketPair(reader=reader, writer=None)
+    return connection
+
+
+async def bench(size, chunk_size):
+    data = chunked_body(size, chunk_size)
+    started = time.perf_counter()
+    content = await connection(data).read_chunks()
+    chunked = time.perf_counter() - started
+    assert len(content) == size
+
+    started = time.perf_counter()
+    content = await connection(b'x' * size).read_identity(size)
+    identity = time.perf_counter() - started
+    assert len(content) == size
+
+    return chunked, identity
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    loop = asyncio.new_event_loop()
+    print('{:>10} {:>16} {:>16}'.format(
+        'size', 'chunked MB/s', 'identity MB/s'))
+    for size in SIZES:
+        chunked, identity = loop.run_until_complete(bench(size, chunk_size))
+        mb = size / 2 ** 20
+        print('{:>10} {:>16.1f} {:>16.1f}'.format(
+            size, mb / chunked, mb / identity))
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
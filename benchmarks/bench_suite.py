@@ -0,0 +1,300 @@
+"""End-to-end benchmarks against the local stand-in server
+(benchmarks/server.py) and micro benchmarks of the hot paths.
+
+Usage: python benchmarks/bench_suite.py [--output results.json]
+           [--compare baseline.json] [--threshold 0.1]
+           [--requests 2000] [--concurrency 1,10,100]
+           [--engine streams] [--loop asyncio] [--only get,post,...]
+
+Every scenario reports requests/sec, p50/p99 latency, body bytes/sec (sent
+and received) and the peak RSS of the client, the server runs in a
+subprocess. --output writes the results as JSON; --compare prints the
+change against an earlier run and exits with status 1 when requests/sec
+(or the rate of a micro benchmark) dropped by more than --threshold.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import aiourllib  # noqa: E402
+from aiourllib import (  # noqa: E402
+    models,
+    uri)
+from aiourllib.response import Response  # noqa: E402
+
+
+Scenario = collections.namedtuple('Scenario', [
+    'name',
+    'method',
+    'path',
+    'data',
+    'requests',
+])
+
+
+SCENARIOS = [
+    Scenario('get', 'GET', '/fixed?size=1024', None, None),
+    Scenario('get_headers', 'GET', '/headers?count=50', None, None),
+    Scenario(
+        'get_chunked', 'GET', '/chunked?size=65536&chunk=4096', None, None),
+    Scenario('get_gzip', 'GET', '/gzip?size=65536', None, None),
+    Scenario('post', 'POST', '/', b'x' * 65536, None),
+    Scenario('large_body', 'GET', '/fixed?size=16777216', None, 50),
+    Scenario('slow_drip', 'GET', '/drip?size=20&delay=0.001', None, 200),
+]
+CONCURRENCY = [1, 10, 100]
+REQUESTS = 2000
+THRESHOLD = 0.1
+SERVER = os.path.join(os.path.dirname(__file__), 'server.py')
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))]
+
+
+def reset_peak_rss():
+    # Linux only, lets every scenario report its own peak.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss():
+    # kB
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+async def run(base, scenario, requests, concurrency, engine):
+    session = aiourllib.Session(
+        limit=concurrency, limit_per_host=concurrency, engine=engine)
+    uri_reference = base + scenario.path
+    latencies = []
+    transferred = 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal transferred
+        for _ in queue:
+            started = time.perf_counter()
+            if scenario.method == 'GET':
+                response = await session.get(uri_reference)
+            else:
+                response = await session.post(uri_reference, scenario.data)
+            content = await response.read_content()
+            latencies.append(time.perf_counter() - started)
+            transferred += len(content) + len(scenario.data or b'')
+
+    reset_peak_rss()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+    finally:
+        session.close()
+    elapsed = time.perf_counter() - started
+    return {
+        'scenario': scenario.name,
+        'concurrency': concurrency,
+        'requests': requests,
+        'requests_per_second': requests / elapsed,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'bytes_per_second': transferred / elapsed,
+        'peak_rss_kb': peak_rss(),
+    }
+
+
+def micro_uri(number=20000):
+    references = [
+        'https://user@cdn.example.com:8443/static/app.js?n={}#top'.format(n)
+        for n in range(number)]
+    started = time.perf_counter()
+    for reference in references:
+        uri.parse(reference)
+    return number / (time.perf_counter() - started)
+
+
+def connection(data):
+    reader = asyncio.StreamReader(limit=2 ** 30)
+    reader.feed_data(data)
+    reader.feed_eof()
+    connection = models.Connection()
+    connection.socket_pair = models.SocketPair(reader=reader, writer=None)
+    return connection
+
+
+async def micro_read_headers(number=20000):
+    head = b'HTTP/1.1 200 OK\r\n' + b''.join(
+        'X-Header-{0}: value-{0}\r\n'.format(n).encode()
+        for n in range(50)) + b'Content-Length: 0\r\n\r\n'
+    connections = [connection(head) for _ in range(number)]
+    started = time.perf_counter()
+    for c in connections:
+        await Response(c).read_headers()
+    return number / (time.perf_counter() - started)
+
+
+async def micro_read_chunks(size=2 ** 24, chunk_size=16384):
+    chunk = '{:x}\r\n'.format(chunk_size).encode() + \
+        b'x' * chunk_size + b'\r\n'
+    data = chunk * (size // chunk_size) + b'0\r\n\r\n'
+    c = connection(data)
+    started = time.perf_counter()
+    await c.read_chunks()
+    return size / (time.perf_counter() - started)
+
+
+def new_event_loop(name):
+    if name == 'uvloop':
+        import uvloop
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def start_server():
+    server = subprocess.Popen(
+        [sys.executable, SERVER], stdout=subprocess.PIPE)
+    port = int(server.stdout.readline())
+    return server, 'http://127.0.0.1:{}'.format(port)
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(options):
+    scenarios = SCENARIOS
+    if options.only:
+        scenarios = [s for s in SCENARIOS if s.name in options.only]
+
+    results = {
+        'meta': {
+            'commit': commit(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'loop': options.loop,
+            'engine': options.engine or 'streams',
+        },
+        'scenarios': [],
+        'micro': [],
+    }
+
+    server, base = start_server()
+    loop = new_event_loop(options.loop)
+    try:
+        for scenario in scenarios:
+            for concurrency in options.concurrency:
+                requests = scenario.requests or options.requests
+                result = loop.run_until_complete(run(
+                    base, scenario, requests, concurrency, options.engine))
+                results['scenarios'].append(result)
+                print(
+                    '{scenario:>12} c={concurrency:<4} '
+                    '{requests_per_second:>9.0f} req/s '
+                    'p50 {p50_ms:>8.2f} ms  p99 {p99_ms:>8.2f} ms '
+                    '{mb_per_second:>8.1f} MB/s  rss {peak_rss_kb} kB'.format(
+                        mb_per_second=result['bytes_per_second'] / 2 ** 20,
+                        **result))
+
+        for name, unit, per_second in [
+            ('uri.from_string', 'parses', micro_uri()),
+            ('read_headers', 'heads', loop.run_until_complete(
+                micro_read_headers())),
+            ('read_chunks', 'bytes', loop.run_until_complete(
+                micro_read_chunks())),
+        ]:
+            results['micro'].append({
+                'name': name,
+                'unit': unit,
+                'per_second': per_second,
+            })
+            print('{:>16} {:>12.0f} {}/s'.format(name, per_second, unit))
+    finally:
+        loop.close()
+        server.terminate()
+        server.wait()
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Returns the number of regressions.
+    def changes(old, new, key, value):
+        old = {key(r): r[value] for r in old}
+        for r in new:
+            if key(r) in old:
+                yield key(r), old[key(r)], r[value]
+
+    regressions = 0
+    for name, old, new in list(changes(
+        baseline['scenarios'],
+        results['scenarios'],
+        lambda r: '{} c={}'.format(r['scenario'], r['concurrency']),
+        'requests_per_second',
+    )) + list(changes(
+        baseline['micro'],
+        results['micro'],
+        lambda r: r['name'],
+        'per_second',
+    )):
+        change = (new - old) / old
+        regressed = change < -threshold
+        regressions += regressed
+        print('{:>20} {:>12.0f} -> {:>12.0f} {:>+7.1%}{}'.format(
+            name, old, new, change, '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    parser.add_argument(
+        '--concurrency',
+        type=lambda s: [int(c) for c in s.split(',')],
+        default=CONCURRENCY)
+    parser.add_argument('--engine')
+    parser.add_argument('--loop', default='asyncio')
+    parser.add_argument('--only', type=lambda s: s.split(','))
+    options = parser.parse_args()
+
+    results = benchmark(options)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, options.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
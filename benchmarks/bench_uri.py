@@ -0,0 +1,39 @@
+"""Parses per second of ``uri.from_string``.
+
+Usage: python benchmarks/bench_uri.py
+
+"distinct" parses a different reference every time, so it measures the
+validation path; "repeated" parses the same reference over and over.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from aiourllib import uri  # noqa: E402
+
+
+URI = (
+    'https://user@cdn.example.com:8443/static/assets/v2/app.bundle.js'
+    '?version=1.2.3&locale=en_US{}#section-2')
+NUMBER = 20000
+
+
+def main():
+    references = [URI.format('&n={}'.format(n)) for n in range(NUMBER)]
+    references = iter(references)
+
+    def distinct():
+        uri.from_string(next(references))
+
+    def repeated():
+        uri.from_string(URI.format(''))
+
+    for name, func in [('distinct', distinct), ('repeated', repeated)]:
+        elapsed = timeit.timeit(func, number=NUMBER)
+        print('{:>10} {:>12.0f} parses/s'.format(name, NUMBER / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""A local HTTP/1.1 stand-in server for the benchmarks.
+
+Usage: python benchmarks/server.py [port]
+
+Prints the port it listens on. Keep-alive, routes:
+
+    /fixed?size=N               N bytes with Content-Length
+    /chunked?size=N&chunk=M     N bytes in chunks of M bytes
+    /gzip?size=N                N bytes gzip-encoded
+    /drip?size=N&delay=S        N one byte chunks, S seconds apart
+    /headers?count=N            N extra response headers
+    POST/PUT any path           the request body size as the response
+"""
+import asyncio
+import functools
+import gzip
+import sys
+import urllib.parse
+
+
+@functools.lru_cache(maxsize=None)
+def body(size):
+    return (b'0123456789abcdef' * (size // 16 + 1))[:size]
+
+
+@functools.lru_cache(maxsize=None)
+def gzipped(size):
+    return gzip.compress(body(size), compresslevel=1)
+
+
+def head(status='200 OK', headers=()):
+    lines = ['HTTP/1.1 {}'.format(status)]
+    lines.extend('{}: {}'.format(name, value) for name, value in headers)
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+def fixed(content, headers=()):
+    return head(headers=[('Content-Length', len(content))] + list(headers)) \
+        + content
+
+
+async def respond(writer, method, path, query, content):
+    size = int(query.get('size', 1024))
+    if method in ('POST', 'PUT'):
+        writer.write(fixed(str(len(content)).encode()))
+    elif path == '/fixed':
+        writer.write(fixed(body(size)))
+    elif path == '/chunked':
+        chunk = int(query.get('chunk', 16384))
+        data = body(size)
+        writer.write(head(headers=[('Transfer-Encoding', 'chunked')]))
+        for offset in range(0, size, chunk):
+            part = data[offset:offset + chunk]
+            writer.writelines([
+                '{:x}\r\n'.format(len(part)).encode(), part, b'\r\n'])
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+    elif path == '/gzip':
+        writer.write(fixed(gzipped(size), [('Content-Encoding', 'gzip')]))
+    elif path == '/drip':
+        delay = float(query.get('delay', 0.001))
+        writer.write(head(headers=[('Transfer-Encoding', 'chunked')]))
+        for _ in range(size):
+            writer.write(b'1\r\nx\r\n')
+            await writer.drain()
+            await asyncio.sleep(delay)
+        writer.write(b'0\r\n\r\n')
+    elif path == '/headers':
+        count = int(query.get('count', 50))
+        writer.write(fixed(b'ok', [
+            ('X-Header-{}'.format(n), 'value-{}'.format(n) * 4)
+            for n in range(count)]))
+    else:
+        writer.write(fixed(b'not found'))
+    await writer.drain()
+
+
+async def handle(reader, writer):
+    try:
+        while True:
+            try:
+                request = await reader.readuntil(b'\r\n\r\n')
+            except asyncio.IncompleteReadError:
+                break
+            lines = request.decode('latin-1').split('\r\n')
+            method, target, version = lines[0].split()
+            headers = dict(
+                line.lower().split(': ', 1) for line in lines[1:] if line)
+
+            if headers.get('transfer-encoding') == 'chunked':
+                content = []
+                while True:
+                    size = int((await reader.readline()).split(b';')[0], 16)
+                    content.append(await reader.readexactly(size))
+                    # The CRLF closing the chunk is not part of the content.
+                    await reader.readexactly(2)
+                    if not size:
+                        break
+                content = b''.join(content)
+            else:
+                content = await reader.readexactly(
+                    int(headers.get('content-length', 0)))
+
+            url = urllib.parse.urlsplit(target)
+            query = dict(urllib.parse.parse_qsl(url.query))
+            await respond(writer, method, url.path, query, content)
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start(host='127.0.0.1', port=0):
+    return (await asyncio.start_server(handle, host, port, backlog=1024))
+
+
+async def main(port):
+    server = await start(port=port)
+    print(server.sockets[0].getsockname()[1], flush=True)
+    await server.serve_forever()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 0))
+    except KeyboardInterrupt:
+        pass
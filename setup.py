@@ -26,13 +26,23 @@ setup(
     keywords=['http',],
     license='MIT',
     platforms='any',
+    python_requires='>=3.7',
     install_requires=[],
+    extras_require={
+        'uvloop': ['uvloop'],
+        'http2': ['h2>=4'],
+    },
     classifiers=(
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
         'Operating System :: OS Independent',
         'License :: OSI Approved :: MIT License',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Internet :: WWW/HTTP',
         'Topic :: Software Development :: Libraries :: Python Modules',
     ),
@@ -0,0 +1,23 @@
+import asyncio
+import os
+import unittest
+
+# AIOURLLIB_LOOP=uvloop runs the whole suite on uvloop.
+if os.environ.get('AIOURLLIB_LOOP') == 'uvloop':
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+class TestCase(unittest.TestCase):
+    # Every test runs in a new event loop.
+    def new_loop(self):
+        return asyncio.new_event_loop()
+
+    def setUp(self):
+        self.loop = self.new_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
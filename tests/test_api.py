@@ -0,0 +1,89 @@
+import asyncio
+
+import aiourllib
+
+from tests import TestCase
+from tests.test_client import Server
+
+
+class DelayServer(Server):
+    # Every response takes a moment, the peak of concurrent requests is
+    # recorded.
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def respond(self, writer, method, path, body):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            await super().respond(writer, method, path, body)
+        finally:
+            self.active -= 1
+
+
+class TestGatherGet(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = DelayServer()
+        self.listener = self.run_async(
+            asyncio.start_server(self.server.handle, '127.0.0.1', 0))
+        self.base = 'http://127.0.0.1:{}'.format(
+            self.listener.sockets[0].getsockname()[1])
+
+    def tearDown(self):
+        async def close():
+            self.listener.close()
+            for handler in self.server.handlers:
+                handler.cancel()
+            await asyncio.gather(*self.server.handlers, return_exceptions=True)
+        self.run_async(close())
+        super().tearDown()
+
+    def gather(self, uri_references, **kwargs):
+        async def gather():
+            return [
+                result async for result in
+                aiourllib.gather_get(uri_references, **kwargs)]
+        return self.run_async(gather())
+
+    def test_concurrency(self):
+        results = self.gather(
+            [self.base + '/{}'.format(n) for n in range(20)], concurrency=3)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(self.server.peak, 3)
+        for result in results:
+            self.assertIsNone(result.exception)
+            self.assertEqual(self.run_async(
+                result.response.read_content()), b'GET ')
+
+    def test_lazy(self):
+        pulled = []
+
+        def uri_references():
+            for n in range(10):
+                pulled.append(n)
+                yield self.base + '/{}'.format(n)
+
+        async def first():
+            results = aiourllib.gather_get(uri_references(), concurrency=2)
+            try:
+                return (await results.__anext__())
+            finally:
+                await results.aclose()
+
+        self.assertIsNone(self.run_async(first()).exception)
+        self.assertLessEqual(len(pulled), 3)
+
+    def test_exception(self):
+        failing = 'http://127.0.0.1:1/'
+        results = self.gather([self.base + '/a', failing, self.base + '/b'])
+        results = {result.uri_reference: result for result in results}
+        self.assertIsInstance(results[failing].exception, OSError)
+        self.assertIsNone(results[failing].response)
+        for uri_reference in (self.base + '/a', self.base + '/b'):
+            self.assertIsNone(results[uri_reference].exception)
+            self.assertEqual(
+                results[uri_reference].response.status_code, 200)
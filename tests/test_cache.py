@@ -0,0 +1,251 @@
+import asyncio
+import email.utils
+import shutil
+import tempfile
+
+from aiourllib import cache
+from aiourllib.response import BufferedResponse
+
+from tests import TestCase
+
+
+URI = 'http://example.com/config'
+
+
+class Origin(object):
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.sent = []
+
+    async def send(self, headers):
+        self.requests.append(headers)
+        await asyncio.sleep(0)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        status, headers, content = response
+        response = BufferedResponse(status, '1.1', headers, content, 'GET')
+        self.sent.append(response)
+        return response
+
+
+class ClockCache(cache.Cache):
+    now = 1000000.
+
+    def time(self):
+        return self.now
+
+
+class TestCache(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ClockCache()
+
+    def tearDown(self):
+        self.cache.close()
+        super().tearDown()
+
+    def fetch(self, origin, headers=None, uri_reference=URI):
+        return self.run_async(self.cache.fetch(
+            'GET', uri_reference, headers, origin.send))
+
+    def test_fresh_hit(self):
+        origin = Origin(
+            ('200 OK', [('Cache-Control', 'max-age=60')], b'config'))
+        response = self.fetch(origin)
+        self.assertFalse(response.from_cache)
+
+        self.cache.now += 30
+        response = self.fetch(
+            origin, uri_reference='HTTP://Example.com:80/config#x')
+        self.assertTrue(response.from_cache)
+        self.assertEqual(self.run_async(response.read_content()), b'config')
+        self.assertEqual(len(origin.requests), 1)
+
+    def test_no_store(self):
+        origin = Origin(
+            ('200 OK', [('Cache-Control', 'no-store, max-age=60')], b'a'),
+            ('200 OK', [('Cache-Control', 'max-age=60')], b'b'))
+        self.fetch(origin)
+        response = self.fetch(origin)
+        self.assertEqual(self.run_async(response.read_content()), b'b')
+        self.assertEqual(len(origin.requests), 2)
+
+    def test_not_storable_unread(self):
+        origin = Origin(
+            ('200 OK', [('Cache-Control', 'no-store')], b'a'),
+            ('200 OK', [
+                ('Cache-Control', 'max-age=60'),
+                ('Content-Length', '6'),
+            ], b'config'))
+        self.cache.max_entry_size = 4
+        for sent in range(2):
+            response = self.fetch(origin)
+            self.assertIs(response, origin.sent[sent])
+            self.assertFalse(response.from_cache)
+        self.assertIsNone(self.run_async(self.cache.storage.get(
+            self.cache.key('GET', URI))))
+
+    def test_revalidate_not_modified(self):
+        origin = Origin(
+            ('200 OK', [('Cache-Control', 'max-age=10'), ('ETag', '"v1"')],
+             b'config'),
+            ('304 Not Modified', [('Cache-Control', 'max-age=20')], b''))
+        self.fetch(origin)
+
+        self.cache.now += 11
+        response = self.fetch(origin)
+        self.assertEqual(origin.requests[1]['If-None-Match'], '"v1"')
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_header('Cache-Control'), 'max-age=20')
+        self.assertEqual(self.run_async(response.read_content()), b'config')
+
+        self.cache.now += 15
+        self.fetch(origin)
+        self.assertEqual(len(origin.requests), 2)
+
+    def test_revalidate_last_modified(self):
+        last_modified = email.utils.formatdate(
+            ClockCache.now - 100, usegmt=True)
+        origin = Origin(
+            ('200 OK', [('Last-Modified', last_modified)], b'a'),
+            ('200 OK', [('Last-Modified', last_modified)], b'b'))
+        self.fetch(origin)
+
+        # heuristic freshness is a tenth of the time since modification
+        self.cache.now += 5
+        self.fetch(origin)
+        self.assertEqual(len(origin.requests), 1)
+
+        self.cache.now += 10
+        response = self.fetch(origin)
+        self.assertEqual(
+            origin.requests[1]['If-Modified-Since'], last_modified)
+        self.assertEqual(self.run_async(response.read_content()), b'b')
+
+    def test_stale_while_revalidate(self):
+        origin = Origin(
+            ('200 OK', [
+                ('Cache-Control', 'max-age=10, stale-while-revalidate=30'),
+                ('ETag', '"v1"')], b'old'),
+            ('200 OK', [('Cache-Control', 'max-age=10')], b'new'))
+        self.fetch(origin)
+
+        self.cache.now += 20
+        response = self.fetch(origin)
+        self.assertEqual(self.run_async(response.read_content()), b'old')
+
+        self.run_async(asyncio.sleep(0.01))
+        self.assertEqual(len(origin.requests), 2)
+        response = self.fetch(origin)
+        self.assertEqual(self.run_async(response.read_content()), b'new')
+
+    def test_stale_if_error(self):
+        origin = Origin(
+            ('200 OK', [
+                ('Cache-Control', 'max-age=10, stale-if-error=60'),
+                ('ETag', '"v1"')], b'old'),
+            ConnectionRefusedError(),
+            ('503 Service Unavailable', [], b''),
+            ConnectionRefusedError())
+        self.fetch(origin)
+
+        self.cache.now += 20
+        response = self.fetch(origin)
+        self.assertEqual(self.run_async(response.read_content()), b'old')
+        response = self.fetch(origin)
+        self.assertEqual(response.status_code, 200)
+
+        self.cache.now += 60
+        with self.assertRaises(ConnectionRefusedError):
+            self.fetch(origin)
+
+    def test_vary(self):
+        origin = Origin(
+            ('200 OK', [
+                ('Cache-Control', 'max-age=60'),
+                ('Vary', 'Accept-Language')], b'en'),
+            ('200 OK', [
+                ('Cache-Control', 'max-age=60'),
+                ('Vary', 'Accept-Language')], b'de'))
+        self.fetch(origin, {'Accept-Language': 'en'})
+        self.assertTrue(
+            self.fetch(origin, {'accept-language': 'en'}).from_cache)
+        response = self.fetch(origin, {'Accept-Language': 'de'})
+        self.assertEqual(self.run_async(response.read_content()), b'de')
+        self.assertEqual(len(origin.requests), 2)
+
+    def test_coalesce_misses(self):
+        origin = Origin(
+            ('200 OK', [('Cache-Control', 'max-age=60')], b'config'))
+
+        async def fetch_all():
+            return (await asyncio.gather(*[
+                self.cache.fetch('GET', URI, None, origin.send)
+                for _ in range(10)]))
+
+        responses = self.run_async(fetch_all())
+        self.assertEqual(len(origin.requests), 1)
+        for response in responses:
+            self.assertEqual(
+                self.run_async(response.read_content()), b'config')
+
+    def test_coalesce_not_storable(self):
+        # Only one caller can read an unstored response, the others send
+        # their own request.
+        origin = Origin(*[
+            ('200 OK', [('Cache-Control', 'no-store')], b'a')] * 3)
+
+        async def fetch_all():
+            return (await asyncio.gather(*[
+                self.cache.fetch('GET', URI, None, origin.send)
+                for _ in range(3)]))
+
+        responses = self.run_async(fetch_all())
+        self.assertEqual(len(origin.requests), 3)
+        self.assertEqual(len(set(map(id, responses))), 3)
+
+    def test_invalidate(self):
+        origin = Origin(
+            ('200 OK', [('Cache-Control', 'max-age=60')], b'a'),
+            ('200 OK', [('Cache-Control', 'max-age=60')], b'b'))
+        self.fetch(origin)
+        self.run_async(self.cache.invalidate(URI))
+        response = self.fetch(origin)
+        self.assertEqual(self.run_async(response.read_content()), b'b')
+
+
+class TestMemoryStorage(TestCase):
+    def test_lru(self):
+        storage = cache.MemoryStorage(max_size=2)
+        self.run_async(storage.set('a', 1))
+        self.run_async(storage.set('b', 2))
+        self.run_async(storage.get('a'))
+        self.run_async(storage.set('c', 3))
+        self.assertIsNone(self.run_async(storage.get('b')))
+        self.assertEqual(self.run_async(storage.get('a')), 1)
+
+
+class TestFileStorage(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def test_roundtrip(self):
+        storage = cache.FileStorage(self.directory)
+        entry = cache.CacheEntry(
+            '200 OK', '1.1', [('ETag', '"v1"')], b'content', 1., 2., ())
+        self.run_async(storage.set('GET /', entry))
+
+        storage = cache.FileStorage(self.directory)
+        self.assertEqual(
+            self.run_async(storage.get('GET /')), entry)
+        self.run_async(storage.delete('GET /'))
+        self.assertIsNone(
+            self.run_async(storage.get('GET /')))
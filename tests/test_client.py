@@ -0,0 +1,279 @@
+import asyncio
+import gzip
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+import urllib.parse
+
+import aiourllib
+from aiourllib import exc
+
+from tests import TestCase
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+class Server(object):
+    def __init__(self):
+        self.connections = 0
+        self.handlers = set()
+        self.dropped = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                method, path, version = lines[0].split()
+                headers = dict(
+                    line.lower().split(': ', 1) for line in lines[1:] if line)
+                body = await reader.readexactly(
+                    int(headers.get('content-length', 0)))
+                await self.respond(writer, method, path, body)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, writer, method, path, body):
+        if path == '/chunked':
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Transfer-Encoding: chunked\r\n'
+                b'\r\n'
+                b'5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n')
+        elif path == '/gzip':
+            content = gzip.compress(b'hello world')
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Encoding: gzip\r\n'
+                b'Content-Length: %d\r\n'
+                b'\r\n' % len(content) + content)
+        elif path == '/early-hints':
+            writer.write(
+                b'HTTP/1.1 103 Early Hints\r\n'
+                b'Link: </style.css>; rel=preload\r\n'
+                b'\r\n'
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 5\r\n'
+                b'\r\n'
+                b'hello')
+        elif path == '/slow':
+            await asyncio.sleep(1)
+        elif path == '/delayed':
+            await asyncio.sleep(0.1)
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 5\r\n'
+                b'\r\n'
+                b'hello')
+        elif path == '/drop-once' and not self.dropped:
+            # As a server closing an idle keep-alive connection just as
+            # the request arrives.
+            self.dropped.append(body)
+            writer.close()
+        else:
+            content = method.encode() + b' ' + body
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: %d\r\n'
+                b'\r\n' % len(content) + content)
+
+
+class ClientTestCase(TestCase):
+    ENGINE = None
+
+    def setUp(self):
+        super().setUp()
+        self.server = Server()
+        self.run_async(self.start_server())
+        self.session = aiourllib.Session(engine=self.ENGINE)
+
+    async def start_server(self):
+        self.listener = await asyncio.start_server(
+            self.server.handle, '127.0.0.1', 0)
+        self.base = 'http://127.0.0.1:{}'.format(
+            self.listener.sockets[0].getsockname()[1])
+
+    def tearDown(self):
+        async def close():
+            self.session.close()
+            self.listener.close()
+            for handler in self.server.handlers:
+                handler.cancel()
+            await asyncio.gather(*self.server.handlers, return_exceptions=True)
+            await self.listener.wait_closed()
+        self.run_async(close())
+        super().tearDown()
+
+    def get(self, path, **kwargs):
+        async def get():
+            response = await self.session.get(
+                self.base + path, **kwargs)
+            return (await response.read_content())
+        return self.run_async(get())
+
+    def test_get(self):
+        self.assertEqual(self.get('/'), b'GET ')
+
+    def test_post(self):
+        async def post():
+            response = await self.session.post(self.base + '/', b'data')
+            return (await response.read_content())
+        self.assertEqual(self.run_async(post()), b'POST data')
+
+    def test_post_file(self):
+        with tempfile.NamedTemporaryFile(delete=False) as fileobj:
+            fileobj.write(b'x' * 100000)
+        try:
+            async def post():
+                response = await self.session.post(
+                    self.base + '/', pathlib.Path(fileobj.name))
+                return (await response.read_content())
+            self.assertEqual(self.run_async(post()), b'POST ' + b'x' * 100000)
+        finally:
+            os.unlink(fileobj.name)
+
+    def test_chunked(self):
+        self.assertEqual(self.get('/chunked'), b'hello world')
+
+    def test_gzip(self):
+        self.assertEqual(self.get('/gzip'), b'hello world')
+
+    def test_interim_response(self):
+        async def get():
+            response = await self.session.get(self.base + '/early-hints')
+            return response.status_code, (await response.read_content())
+        for _ in range(2):
+            self.assertEqual(self.run_async(get()), (200, b'hello'))
+        self.assertEqual(self.get('/'), b'GET ')
+        self.assertEqual(self.server.connections, 1)
+
+    def test_keep_alive(self):
+        for _ in range(3):
+            self.get('/chunked')
+        self.assertEqual(self.server.connections, 1)
+
+    def test_concurrent(self):
+        async def get():
+            response = await self.session.get(self.base + '/chunked')
+            return (await response.read_content())
+
+        async def get_all():
+            return (await asyncio.gather(*[get() for _ in range(50)]))
+        self.assertEqual(self.run_async(get_all()), [b'hello world'] * 50)
+        self.assertLessEqual(
+            self.server.connections, self.session.pool.limit_per_host)
+
+    def test_retry(self):
+        with tempfile.NamedTemporaryFile(delete=False) as fileobj:
+            fileobj.write(b'x' * 5000)
+        self.addCleanup(os.unlink, fileobj.name)
+
+        async def put():
+            response = await self.session.put(
+                self.base + '/drop-once', pathlib.Path(fileobj.name))
+            return (await response.read_content())
+        self.assertEqual(self.get('/'), b'GET ')
+        self.assertEqual(self.run_async(put()), b'PUT ' + b'x' * 5000)
+        self.assertEqual(self.server.dropped, [b'x' * 5000])
+
+    def test_no_retry(self):
+        # A stream can not be sent twice.
+        async def put():
+            await self.session.put(
+                self.base + '/drop-once', io.BytesIO(b'x' * 5000))
+        self.assertEqual(self.get('/'), b'GET ')
+        with self.assertRaises((exc.ConnectionClosed, ConnectionError)):
+            self.run_async(put())
+        self.assertEqual(self.server.connections, 1)
+
+    def test_read_timeout(self):
+        with self.assertRaises(exc.ReadTimeout):
+            self.get('/slow', timeout=aiourllib.Timeout(first_byte=0.05))
+
+    def test_session_outside_loop(self):
+        # Built before the loop runs, as at module level. Before Python
+        # 3.10 asyncio primitives bind to the loop they are created in.
+        session = aiourllib.Session(limit=1, engine=self.ENGINE)
+
+        async def get():
+            response = await session.get(self.base + '/chunked')
+            return (await response.read_content())
+
+        async def get_all():
+            try:
+                return (await asyncio.gather(*[get() for _ in range(3)]))
+            finally:
+                session.close()
+        self.assertEqual(self.run_async(get_all()), [b'hello world'] * 3)
+
+    def test_cache_timeout(self):
+        # The response can not be stored and the caller that would have
+        # read it gave up, it must still free the connection.
+        session = aiourllib.Session(
+            cache=True, limit_per_host=1, engine=self.ENGINE)
+
+        async def get():
+            try:
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        session.get(self.base + '/delayed'), 0.05)
+                response = await asyncio.wait_for(
+                    session.get(self.base + '/delayed'), 1)
+                return (await response.read_content())
+            finally:
+                session.close()
+        self.assertEqual(self.run_async(get()), b'hello')
+
+    def test_loop_argument(self):
+        with self.assertWarns(DeprecationWarning):
+            self.get('/', loop=self.loop)
+
+
+class ProtocolEngineTestCase(ClientTestCase):
+    ENGINE = 'protocol'
+
+
+@unittest.skipUnless(uvloop, 'uvloop is not installed')
+class UVLoopTestCase(ClientTestCase):
+    def new_loop(self):
+        return uvloop.new_event_loop()
+
+
+@unittest.skipUnless(uvloop, 'uvloop is not installed')
+class UVLoopProtocolEngineTestCase(UVLoopTestCase):
+    ENGINE = 'protocol'
+
+
+class UnixSocketTestCase(ClientTestCase):
+    async def start_server(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'server.sock')
+        self.listener = await asyncio.start_unix_server(
+            self.server.handle, self.path)
+        self.base = 'http+unix://' + urllib.parse.quote(self.path, safe='')
+
+    def test_unix_socket_option(self):
+        async def get():
+            session = aiourllib.Session(unix_socket=self.path)
+            try:
+                response = await session.get('http://sidecar/chunked')
+                return (await response.read_content())
+            finally:
+                session.close()
+        self.assertEqual(self.run_async(get()), b'hello world')
+
+
+class UnixSocketProtocolEngineTestCase(UnixSocketTestCase):
+    ENGINE = 'protocol'
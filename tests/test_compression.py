@@ -0,0 +1,48 @@
+import gzip
+import unittest
+import zlib
+
+from aiourllib import (
+    compression,
+    exc)
+
+
+class TestDecoders(unittest.TestCase):
+    CONTENT = b'hello world ' * 1000
+
+    def decode(self, encoding, data, max_size=None, step=7):
+        decoder = compression.decoder(encoding, max_size)
+        content = [
+            decoder.decompress(data[i:i + step])
+            for i in range(0, len(data), step)]
+        content.append(decoder.flush())
+        return b''.join(content)
+
+    def test_deflate_zlib(self):
+        data = zlib.compress(self.CONTENT)
+        self.assertEqual(self.decode('deflate', data, step=1), self.CONTENT)
+
+    def test_deflate_raw(self):
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        data = compressor.compress(self.CONTENT) + compressor.flush()
+        self.assertEqual(self.decode('deflate', data), self.CONTENT)
+
+    def test_gzip(self):
+        data = gzip.compress(self.CONTENT)
+        self.assertEqual(self.decode('gzip', data), self.CONTENT)
+
+    def test_gzip_members(self):
+        data = gzip.compress(b'hello ') + gzip.compress(b'world')
+        self.assertEqual(self.decode('gzip', data), b'hello world')
+        self.assertEqual(self.decode('gzip', data, step=1), b'hello world')
+
+    def test_max_size(self):
+        data = gzip.compress(b'\0' * 10 ** 6)
+        self.assertEqual(
+            len(self.decode('gzip', data, max_size=10 ** 6)), 10 ** 6)
+        with self.assertRaises(exc.ContentSizeException):
+            self.decode('gzip', data, max_size=10 ** 6 - 1, step=len(data))
+
+    def test_corrupted(self):
+        with self.assertRaises(exc.ContentEncodingException):
+            self.decode('gzip', b'not a gzip stream')
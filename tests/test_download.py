@@ -0,0 +1,114 @@
+import asyncio
+import os
+import re
+import tempfile
+
+from aiourllib import exc
+from aiourllib.download import parallel_download
+
+from tests import TestCase
+
+
+CONTENT = bytes(range(256)) * 40
+
+
+class RangeServer(object):
+    # Serves CONTENT with byte ranges. The first request for each range in
+    # fail_once gets a 503, ignore_ranges answers every GET with 200.
+    def __init__(self, ignore_ranges=False, fail_once=()):
+        self.ignore_ranges = ignore_ranges
+        self.fail_once = set(fail_once)
+        self.ranges = []
+        self.handlers = set()
+
+    async def handle(self, reader, writer):
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                method = head.split()[0]
+                match = re.search(rb'Range: bytes=(\d+)-(\d+)', head)
+                writer.write(self.respond(method, match))
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, method, match):
+        status = b'200 OK'
+        headers = b'Accept-Ranges: bytes\r\n'
+        content = CONTENT
+        if match and not self.ignore_ranges:
+            start, end = int(match.group(1)), int(match.group(2))
+            self.ranges.append((start, end))
+            if (start, end) in self.fail_once:
+                self.fail_once.remove((start, end))
+                return b'HTTP/1.1 503 Service Unavailable\r\n' \
+                    b'Content-Length: 0\r\n\r\n'
+            status = b'206 Partial Content'
+            headers += b'Content-Range: bytes %d-%d/%d\r\n' % (
+                start, end, len(CONTENT))
+            content = CONTENT[start:end + 1]
+        head = b'HTTP/1.1 %s\r\n%sContent-Length: %d\r\n\r\n' % (
+            status, headers, len(content))
+        if method == b'HEAD':
+            return head
+        return head + content
+
+
+class TestParallelDownload(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'content')
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def download(self, server, **kwargs):
+        async def download():
+            listener = await asyncio.start_server(
+                server.handle, '127.0.0.1', 0)
+            uri_reference = 'http://127.0.0.1:{}/'.format(
+                listener.sockets[0].getsockname()[1])
+            try:
+                await parallel_download(
+                    uri_reference,
+                    self.path,
+                    parts=4,
+                    min_part_size=1024,
+                    **kwargs)
+            finally:
+                listener.close()
+                for handler in server.handlers:
+                    handler.cancel()
+                await asyncio.gather(*server.handlers, return_exceptions=True)
+        self.run_async(download())
+        with open(self.path, 'rb') as fileobj:
+            return fileobj.read()
+
+    def test_ranges(self):
+        server = RangeServer()
+        self.assertEqual(self.download(server), CONTENT)
+        self.assertEqual(sorted(server.ranges), [
+            (0, 2559), (2560, 5119), (5120, 7679), (7680, 10239)])
+
+    def test_retry(self):
+        server = RangeServer(fail_once=[(2560, 5119)])
+        self.assertEqual(self.download(server), CONTENT)
+        self.assertEqual(server.ranges.count((2560, 5119)), 2)
+
+    def test_retries_exhausted(self):
+        server = RangeServer(fail_once=[(2560, 5119)])
+        with self.assertRaises(exc.ResponseException):
+            self.download(server, retries=0)
+
+    def test_ranges_ignored(self):
+        server = RangeServer(ignore_ranges=True)
+        self.assertEqual(self.download(server), CONTENT)
+        self.assertEqual(server.ranges, [])
@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import socket
+import unittest
+
+from aiourllib import (
+    engine,
+    exc,
+    models)
+from aiourllib.pipeline import PipelinedConnection
+from aiourllib.response import Response
+
+from tests import TestCase
+
+
+class TestProtocolConnection(TestCase):
+    async def connection(self, parts, close=True):
+        client, server = socket.socketpair()
+        server.setblocking(False)
+        connection = engine.ProtocolConnection()
+        connection.socket_pair = models.SocketPair(
+            *(await connection.open_stream(client, None, None)))
+
+        async def send():
+            for part in parts:
+                await self.loop.sock_sendall(server, part)
+                await asyncio.sleep(0)
+            if close:
+                server.close()
+        self.server = server
+        self.sender = asyncio.ensure_future(send())
+        return connection
+
+    def read(self, parts, request_method='GET'):
+        async def read():
+            connection = await self.connection(parts)
+            try:
+                response = Response(
+                    connection, request_method=request_method)
+                await response.read_headers()
+                content = await response.read_content()
+                await self.sender
+            finally:
+                self.sender.cancel()
+                self.server.close()
+            return response, content
+        return self.run_async(read())
+
+    def split(self, data, size=1):
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_identity(self):
+        response, content = self.read([
+            b'HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content, b'hello')
+
+    def test_until_eof(self):
+        response, content = self.read([b'HTTP/1.1 200 OK\r\n\r\n', b'hello'])
+        self.assertEqual(content, b'hello')
+
+    def test_chunked(self):
+        data = (
+            b'HTTP/1.1 200 OK\r\n'
+            b'Transfer-Encoding: chunked\r\n'
+            b'\r\n'
+            b'5\r\nhello\r\n'
+            b'6;ext=1\r\n world\r\n'
+            b'0\r\n'
+            b'Trailer: value\r\n'
+            b'\r\n')
+        for size in [1, 3, len(data)]:
+            response, content = self.read(self.split(data, size))
+            self.assertEqual(content, b'hello world')
+
+    def test_chunked_truncated(self):
+        with self.assertRaises(exc.ConnectionClosed):
+            self.read([
+                b'HTTP/1.1 200 OK\r\n'
+                b'Transfer-Encoding: chunked\r\n'
+                b'\r\n'
+                b'a\r\nhello'])
+
+    def test_gzip(self):
+        body = gzip.compress(b'hello world' * 1000)
+        response, content = self.read(self.split(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Encoding: gzip\r\n'
+            b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+            b'\r\n' + body, 1000))
+        self.assertEqual(content, b'hello world' * 1000)
+
+    def test_large_body(self):
+        body = bytes(range(256)) * 4096
+        response, content = self.read(self.split(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+            b'\r\n' + body, 100000))
+        self.assertEqual(content, body)
+
+    def test_head_too_large(self):
+        with self.assertRaises(exc.HeadersException):
+            self.read([b'HTTP/1.1 200 OK\r\n'] + [b'X: y\r\n'] * 20000)
+
+    def test_keep_alive(self):
+        async def read():
+            connection = await self.connection([
+                b'HTTP/1.1 200 OK\r\nContent-Length: 1\r\n\r\na',
+                b'HTTP/1.1 200 OK\r\n'
+                b'Transfer-Encoding: chunked\r\n'
+                b'\r\n'
+                b'1\r\nb\r\n0\r\n\r\n'
+                b'HTTP/1.1 204 No Content\r\n\r\n'], close=False)
+            # Responses close a connection without a pool once read.
+            pipelined = PipelinedConnection(connection)
+            contents = []
+            for _ in range(3):
+                response = Response(pipelined)
+                await response.read_headers()
+                contents.append(await response.read_content())
+            await self.sender
+            self.server.close()
+            return contents
+        self.assertEqual(self.run_async(read()), [b'a', b'b', b''])
+
+
+class TestEngines(unittest.TestCase):
+    def test_connection_class(self):
+        self.assertIs(engine.connection_class(None), models.Connection)
+        self.assertIs(
+            engine.connection_class('protocol'), engine.ProtocolConnection)
+        with self.assertRaises(ValueError):
+            engine.connection_class('carrier-pigeon')
@@ -0,0 +1,51 @@
+import unittest
+
+from aiourllib import models
+
+
+class TestHeaders(unittest.TestCase):
+    def setUp(self):
+        self.headers = models.Headers([
+            ('Content-Type', 'text/html'),
+            ('Set-Cookie', 'a=1'),
+            ('set-cookie', 'b=2'),
+        ])
+
+    def test_get(self):
+        self.assertEqual(self.headers['content-type'], 'text/html')
+        self.assertEqual(self.headers.get('CONTENT-TYPE'), 'text/html')
+        self.assertIsNone(self.headers.get('Content-Length'))
+        with self.assertRaises(KeyError):
+            self.headers['Content-Length']
+
+    def test_getall(self):
+        self.assertEqual(self.headers.getall('Set-Cookie'), ['a=1', 'b=2'])
+        self.assertEqual(self.headers.getall('Content-Length'), [])
+
+    def test_contains(self):
+        self.assertIn('SET-COOKIE', self.headers)
+        self.assertNotIn('Content-Length', self.headers)
+
+    def test_order(self):
+        self.assertEqual(
+            self.headers.keys(), ['Content-Type', 'Set-Cookie', 'set-cookie'])
+        self.assertEqual(len(self.headers), 3)
+
+    def test_setitem(self):
+        self.headers['SET-COOKIE'] = 'c=3'
+        self.assertEqual(self.headers.items(), [
+            ('Content-Type', 'text/html'),
+            ('SET-COOKIE', 'c=3'),
+        ])
+
+    def test_delitem(self):
+        del self.headers['set-cookie']
+        self.assertEqual(self.headers.items(), [
+            ('Content-Type', 'text/html'),
+        ])
+        with self.assertRaises(KeyError):
+            del self.headers['set-cookie']
+
+    def test_mapping(self):
+        headers = models.Headers({'Host': 'example.com'})
+        self.assertEqual(headers['host'], 'example.com')
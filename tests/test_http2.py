@@ -0,0 +1,226 @@
+import asyncio
+import os
+import ssl
+import unittest
+
+import aiourllib
+from aiourllib import (
+    exc,
+    tls)
+
+from tests import TestCase
+from tests.test_client import Server
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+CERTFILE = os.path.join(os.path.dirname(__file__), 'keycert.pem')
+LARGE = bytes(range(256)) * 12288
+
+
+class H2Server(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.h2 = h2.connection.H2Connection(h2.config.H2Configuration(
+            client_side=False, header_encoding='utf-8'))
+        self.requests = {}
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.server.connections += 1
+        self.server.transports.append(transport)
+        self.transport = transport
+        self.h2.initiate_connection()
+        self.transport.write(self.h2.data_to_send())
+
+    def data_received(self, data):
+        for event in self.h2.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                self.requests[event.stream_id] = (dict(event.headers), [])
+            elif isinstance(event, h2.events.DataReceived):
+                self.requests[event.stream_id][1].append(event.data)
+                self.h2.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, h2.events.StreamEnded):
+                self.respond(event.stream_id)
+        self.send_pending()
+
+    def respond(self, stream_id):
+        headers, data = self.requests.pop(stream_id)
+        self.server.streams.append(headers)
+        path = headers[':path']
+        if path == '/reset':
+            self.h2.reset_stream(stream_id)
+            return
+        if path == '/large':
+            body = LARGE
+        else:
+            body = headers[':method'].encode() + b' ' + b''.join(data)
+        self.h2.send_headers(stream_id, [
+            (':status', '200'),
+            ('content-length', str(len(body))),
+        ])
+        self.pending[stream_id] = body
+
+    def send_pending(self):
+        for stream_id, body in list(self.pending.items()):
+            window = min(
+                self.h2.local_flow_control_window(stream_id),
+                self.h2.max_outbound_frame_size)
+            while body and window > 0:
+                self.h2.send_data(stream_id, body[:window])
+                body = body[window:]
+                window = min(
+                    self.h2.local_flow_control_window(stream_id),
+                    self.h2.max_outbound_frame_size)
+            self.pending[stream_id] = body
+            if not body:
+                self.h2.end_stream(stream_id)
+                del self.pending[stream_id]
+        self.transport.write(self.h2.data_to_send())
+
+
+class H2Origin(object):
+    def __init__(self):
+        self.connections = 0
+        self.streams = []
+        self.transports = []
+
+    def close(self):
+        for transport in self.transports:
+            transport.close()
+
+
+@unittest.skipUnless(h2, 'h2 is not installed')
+class TestHTTP2(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.origin = H2Origin()
+        self.listener = self.run_async(
+            self.loop.create_server(
+                lambda: H2Server(self.origin), '127.0.0.1', 0))
+        self.authority = '127.0.0.1:{}'.format(
+            self.listener.sockets[0].getsockname()[1])
+        self.session = aiourllib.Session(engine='http2')
+
+    def tearDown(self):
+        self.session.close()
+        self.origin.close()
+        self.listener.close()
+        self.run_async(self.listener.wait_closed())
+        self.run_async(asyncio.sleep(0))
+        super().tearDown()
+
+    def get(self, path, **kwargs):
+        async def get():
+            response = await self.session.get(
+                'http://' + self.authority + path, **kwargs)
+            return response, (await response.read_content())
+        return self.run_async(get())
+
+    def test_get(self):
+        response, content = self.get('/')
+        self.assertEqual(content, b'GET ')
+        self.assertEqual(response.http_version, '2')
+        self.assertEqual(response.status, '200 OK')
+        self.assertEqual(response.content_length, 4)
+        headers = self.origin.streams[0]
+        self.assertEqual(headers[':authority'], self.authority)
+        self.assertEqual(headers[':scheme'], 'http')
+        self.assertNotIn('host', headers)
+
+    def test_post(self):
+        async def post():
+            response = await self.session.post(
+                'http://' + self.authority + '/', LARGE)
+            return (await response.read_content())
+        self.assertEqual(self.run_async(post()), b'POST ' + LARGE)
+
+    def test_flow_control(self):
+        response, content = self.get('/large')
+        self.assertEqual(content, LARGE)
+
+    def test_multiplexed(self):
+        async def get():
+            response = await self.session.get(
+                'http://' + self.authority + '/large')
+            return (await response.read_content())
+
+        async def get_all():
+            return (await asyncio.gather(*[get() for _ in range(20)]))
+        self.assertEqual(self.run_async(get_all()), [LARGE] * 20)
+        self.assertEqual(self.origin.connections, 1)
+        self.get('/')
+        self.assertEqual(self.origin.connections, 1)
+
+    def test_reset(self):
+        with self.assertRaises(exc.ConnectionClosed):
+            self.get('/reset')
+        response, content = self.get('/')
+        self.assertEqual(content, b'GET ')
+        self.assertEqual(self.origin.connections, 1)
+
+
+@unittest.skipUnless(uvloop, 'uvloop is not installed')
+class UVLoopTestHTTP2(TestHTTP2):
+    def new_loop(self):
+        return uvloop.new_event_loop()
+
+
+@unittest.skipUnless(h2, 'h2 is not installed')
+class TestALPN(TestCase):
+    def get(self, alpn_protocols):
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(CERTFILE)
+        server_context.set_alpn_protocols(alpn_protocols)
+        origin = H2Origin()
+        server = Server()
+
+        def protocol():
+            if 'h2' in alpn_protocols:
+                return H2Server(origin)
+            return asyncio.StreamReaderProtocol(
+                asyncio.StreamReader(), server.handle)
+
+        async def get():
+            listener = await asyncio.get_running_loop().create_server(
+                protocol, '127.0.0.1', 0, ssl=server_context)
+            port = listener.sockets[0].getsockname()[1]
+            session = aiourllib.Session(
+                ssl_context=tls.create_context(
+                    cafile=CERTFILE,
+                    alpn_protocols=tls.HTTP2_ALPN_PROTOCOLS),
+                engine='http2')
+            try:
+                response = await session.get(
+                    'https://localhost:{}/'.format(port))
+                return response, (await response.read_content())
+            finally:
+                session.close()
+                origin.close()
+                listener.close()
+                for handler in server.handlers:
+                    handler.cancel()
+                await asyncio.gather(*server.handlers, return_exceptions=True)
+                await asyncio.sleep(0)
+        return self.run_async(get())
+
+    def test_h2(self):
+        response, content = self.get(['h2'])
+        self.assertEqual(response.http_version, '2')
+        self.assertEqual(content, b'GET ')
+
+    def test_http11_fallback(self):
+        response, content = self.get(['http/1.1'])
+        self.assertEqual(response.http_version, '1.1')
+        self.assertEqual(content, b'GET ')
@@ -0,0 +1,98 @@
+import asyncio
+
+import aiourllib
+
+from tests import TestCase
+
+
+class PipelineServer(object):
+    # Answers requests in the order they arrive, after a short pause so
+    # pipelined requests pile up. The first connection is closed after
+    # close_after responses, if set.
+    def __init__(self, close_after=None):
+        self.close_after = close_after
+        self.connections = []
+        # The most requests waiting for an answer, per connection.
+        self.outstanding = []
+        self.handlers = set()
+
+    async def handle(self, reader, writer):
+        self.handlers.add(asyncio.current_task())
+        answered = []
+        self.connections.append(answered)
+        self.outstanding.append(0)
+        index = len(self.outstanding) - 1
+        buffer = b''
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                queued = []
+                while b'\r\n\r\n' in buffer:
+                    head, buffer = buffer.split(b'\r\n\r\n', 1)
+                    queued.append(head.split()[1])
+                self.outstanding[index] = max(
+                    self.outstanding[index], len(queued))
+
+                await asyncio.sleep(0.01)
+                for path in queued:
+                    if len(self.connections) == 1 and \
+                            len(answered) == self.close_after:
+                        return
+                    answered.append(path)
+                    writer.write(
+                        b'HTTP/1.1 200 OK\r\n'
+                        b'Content-Length: %d\r\n'
+                        b'\r\n' % len(path) + path)
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            writer.close()
+
+
+class TestPipeline(TestCase):
+    PATHS = ['/{}'.format(n) for n in range(10)]
+
+    def pipeline(self, server, **kwargs):
+        async def pipeline():
+            listener = await asyncio.start_server(
+                server.handle, '127.0.0.1', 0)
+            base = 'http://127.0.0.1:{}'.format(
+                listener.sockets[0].getsockname()[1])
+            try:
+                return [
+                    (await response.read_content())
+                    async for response in aiourllib.pipeline(
+                        [base + path for path in self.PATHS], **kwargs)]
+            finally:
+                listener.close()
+                for handler in server.handlers:
+                    handler.cancel()
+                await asyncio.gather(*server.handlers, return_exceptions=True)
+        return self.run_async(pipeline())
+
+    def test_order(self):
+        server = PipelineServer()
+        self.assertEqual(
+            self.pipeline(server), [path.encode() for path in self.PATHS])
+        self.assertEqual(len(server.connections), 1)
+
+    def test_depth(self):
+        server = PipelineServer()
+        self.assertEqual(
+            self.pipeline(server, depth=3),
+            [path.encode() for path in self.PATHS])
+        self.assertEqual(server.outstanding, [3])
+
+    def test_closed(self):
+        server = PipelineServer(close_after=2)
+        self.assertEqual(
+            self.pipeline(server, depth=5),
+            [path.encode() for path in self.PATHS])
+        self.assertEqual(server.connections[0], [b'/0', b'/1'])
+        # The rest went out one at a time.
+        self.assertGreater(server.outstanding[0], 1)
+        self.assertEqual(server.outstanding[1:], [1])
@@ -0,0 +1,120 @@
+import asyncio
+import socket
+
+from aiourllib import (
+    models,
+    pool)
+
+from tests import TestCase
+
+
+class SocketPairPool(pool.ConnectionPool):
+    async def connect(self, key, ssl, timeout=None, deadline=None, trace=None):
+        client, self.server = socket.socketpair()
+        reader, writer = await asyncio.open_connection(sock=client)
+        connection = models.Connection(timeout)
+        connection.socket_pair = models.SocketPair(reader, writer)
+        return connection
+
+
+class TestConnectionPool(TestCase):
+    KEY = ('http', 'example.com', 80)
+
+    def test_reuse(self):
+        async def test():
+            connection_pool = SocketPairPool()
+            connection = await connection_pool.acquire(self.KEY)
+            self.assertFalse(connection.reused)
+            connection.release()
+
+            reused = await connection_pool.acquire(self.KEY)
+            self.assertIs(reused, connection)
+            self.assertTrue(reused.reused)
+            self.assertEqual(connection_pool.size, 1)
+            connection_pool.close()
+        self.run_async(test())
+
+    def test_discard(self):
+        async def test():
+            connection_pool = SocketPairPool()
+            connection = await connection_pool.acquire(self.KEY)
+            connection.close()
+
+            other = await connection_pool.acquire(self.KEY)
+            self.assertIsNot(other, connection)
+            connection_pool.close()
+        self.run_async(test())
+
+    def test_dead_connection(self):
+        async def test():
+            connection_pool = SocketPairPool()
+            connection = await connection_pool.acquire(self.KEY)
+            connection.release()
+            connection_pool.server.close()
+            await asyncio.sleep(0.01)
+
+            other = await connection_pool.acquire(self.KEY)
+            self.assertIsNot(other, connection)
+            connection_pool.close()
+        self.run_async(test())
+
+    def test_keepalive_timeout(self):
+        async def test():
+            connection_pool = SocketPairPool(keepalive_timeout=0.)
+            connection = await connection_pool.acquire(self.KEY)
+            connection.release()
+            await asyncio.sleep(0.01)
+
+            other = await connection_pool.acquire(self.KEY)
+            self.assertIsNot(other, connection)
+            self.assertEqual(connection_pool.size, 1)
+            connection_pool.close()
+        self.run_async(test())
+
+    def test_limit(self):
+        async def test():
+            connection_pool = SocketPairPool(limit=1)
+            connection = await connection_pool.acquire(self.KEY)
+            waiter = asyncio.ensure_future(
+                connection_pool.acquire(('http', 'example.org', 80)))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiter.done())
+
+            connection.release()
+            other = await waiter
+            self.assertIsNot(other, connection)
+            self.assertEqual(connection_pool.size, 1)
+            connection_pool.close()
+        self.run_async(test())
+
+    def test_limit_per_host(self):
+        async def test():
+            connection_pool = SocketPairPool(limit_per_host=1)
+            await connection_pool.acquire(self.KEY)
+            other = await connection_pool.acquire(('http', 'example.org', 80))
+            waiter = asyncio.ensure_future(connection_pool.acquire(self.KEY))
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiter.done())
+
+            other.release()
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiter.done())
+            waiter.cancel()
+            connection_pool.close()
+        self.run_async(test())
+
+    def test_host_semaphores(self):
+        async def test():
+            connection_pool = SocketPairPool(limit_per_host=1)
+            connection = await connection_pool.acquire(self.KEY)
+            waiter = asyncio.ensure_future(connection_pool.acquire(self.KEY))
+            await asyncio.sleep(0.01)
+            connection.release()
+            (await waiter).release()
+            for host in ['example.org', 'example.net']:
+                connection = await connection_pool.acquire(
+                    ('http', host, 80))
+                connection.close()
+            self.assertEqual(connection_pool._host_semaphores, {})
+            connection_pool.close()
+        self.run_async(test())
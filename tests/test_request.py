@@ -0,0 +1,123 @@
+import asyncio
+import io
+import pathlib
+import socket
+import tempfile
+
+from aiourllib.request import Request
+
+from tests import TestCase
+
+
+class TestRequest(TestCase):
+    def write(self, request):
+        async def read(server):
+            content = []
+            while True:
+                chunk = await self.loop.sock_recv(server, 65536)
+                if not chunk:
+                    break
+                content.append(chunk)
+            server.close()
+            return b''.join(content)
+
+        async def write():
+            client, server = socket.socketpair()
+            server.setblocking(False)
+            content = asyncio.ensure_future(read(server))
+            reader, writer = await asyncio.open_connection(sock=client)
+            await request.write(writer)
+            writer.close()
+            return (await content)
+        return self.run_async(write())
+
+    def test_get(self):
+        request = Request('GET', 'http://example.com', headers={'A': 'b'})
+        self.assertEqual(
+            bytes(request),
+            b'GET / HTTP/1.1\r\n'
+            b'A: b\r\n'
+            b'Host: example.com\r\n'
+            b'\r\n')
+        self.assertEqual(self.write(request), bytes(request))
+
+    def test_bytes(self):
+        request = Request(
+            'POST', 'http://example.com/?a=b', data=memoryview(b'data'))
+        self.assertEqual(
+            self.write(request),
+            b'POST /?a=b HTTP/1.1\r\n'
+            b'Host: example.com\r\n'
+            b'Content-Type: application/x-www-form-urlencoded\r\n'
+            b'Content-Length: 4\r\n'
+            b'\r\n'
+            b'data')
+
+    def test_text(self):
+        request = Request('POST', 'http://example.com/', data='é')
+        self.assertEqual(request.headers['Content-Length'], 2)
+
+    def test_file(self):
+        fileobj = io.BytesIO(b'skip data')
+        fileobj.seek(5)
+        request = Request(
+            'PUT', 'http://example.com/', data=fileobj,
+            headers={'Content-Type': 'text/plain'})
+        self.assertEqual(
+            self.write(request),
+            b'PUT / HTTP/1.1\r\n'
+            b'Content-Type: text/plain\r\n'
+            b'Host: example.com\r\n'
+            b'Transfer-Encoding: chunked\r\n'
+            b'\r\n'
+            b'4\r\ndata\r\n'
+            b'0\r\n\r\n')
+        # Every write starts where the body started.
+        self.assertTrue(
+            self.write(request).endswith(b'4\r\ndata\r\n0\r\n\r\n'))
+        self.assertFalse(request.payload.replayable)
+
+    def test_async_iterable(self):
+        async def chunks():
+            yield b'hello'
+            yield b''
+            yield b' world'
+
+        request = Request('POST', 'http://example.com/', data=chunks())
+        self.assertEqual(
+            self.write(request),
+            b'POST / HTTP/1.1\r\n'
+            b'Host: example.com\r\n'
+            b'Content-Type: application/octet-stream\r\n'
+            b'Transfer-Encoding: chunked\r\n'
+            b'\r\n'
+            b'5\r\nhello\r\n'
+            b'6\r\n world\r\n'
+            b'0\r\n\r\n')
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, 'data')
+            path.write_bytes(b'x' * 100000)
+            request = Request('PUT', 'http://example.com/', data=path)
+            self.assertEqual(request.headers['Content-Length'], 100000)
+            content = self.write(request)
+        self.assertTrue(content.endswith(b'\r\n\r\n' + b'x' * 100000))
+
+    def test_key(self):
+        request = Request('GET', 'http://user:pw@Example.com:8080/')
+        self.assertEqual(request.key, ('http', 'example.com', 8080))
+        self.assertEqual(request.headers['Host'], 'Example.com:8080')
+        # Built once, then kept on the request.
+        self.assertIs(request.key, request.key)
+        self.assertEqual(
+            Request('GET', 'https://[::1]/').key, ('https', '[::1]', 443))
+
+    def test_unix_socket(self):
+        request = Request(
+            'GET', 'http+unix://%2Fvar%2Frun%2Fdocker.sock/info')
+        self.assertEqual(
+            request.key, ('http+unix', '/var/run/docker.sock', None))
+        self.assertEqual(request.headers['Host'], 'localhost')
+        self.assertEqual(
+            bytes(request).split(b'\r\n')[0], b'GET /info HTTP/1.1')
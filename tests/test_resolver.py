@@ -0,0 +1,81 @@
+import asyncio
+import socket
+
+from aiourllib import (
+    models,
+    resolver)
+
+from tests import TestCase
+
+
+class CountingResolver(resolver.Resolver):
+    lookups = 0
+
+    async def lookup(self, key):
+        self.lookups += 1
+        await asyncio.sleep(0.01)
+        return (await super().lookup(key))
+
+
+class TestResolver(TestCase):
+    def test_address(self):
+        infos = self.run_async(resolver.Resolver().resolve('127.0.0.1', 80))
+        self.assertEqual(infos[0][0], socket.AF_INET)
+        self.assertEqual(infos[0][4], ('127.0.0.1', 80))
+
+    def test_hosts(self):
+        infos = self.run_async(resolver.Resolver(
+            hosts={'example.com': ['::1', '127.0.0.1']},
+        ).resolve('example.com', 80))
+        self.assertEqual(
+            [info[4] for info in infos],
+            [('::1', 80, 0, 0), ('127.0.0.1', 80)])
+
+    def test_cache(self):
+        async def test():
+            host_resolver = CountingResolver()
+            results = await asyncio.gather(*[
+                host_resolver.resolve('localhost', 80) for _ in range(10)])
+            await host_resolver.resolve('localhost', 80)
+            self.assertEqual(host_resolver.lookups, 1)
+            self.assertTrue(all(r == results[0] for r in results))
+
+            host_resolver.clear()
+            await host_resolver.resolve('localhost', 80)
+            self.assertEqual(host_resolver.lookups, 2)
+        self.run_async(test())
+
+    def test_ttl(self):
+        async def test():
+            host_resolver = CountingResolver(ttl=0)
+            await host_resolver.resolve('localhost', 80)
+            await host_resolver.resolve('localhost', 80)
+            self.assertEqual(host_resolver.lookups, 2)
+        self.run_async(test())
+
+    def test_interleave(self):
+        v4 = resolver.address_info('127.0.0.1', 80)
+        v6 = resolver.address_info('::1', 80)
+        self.assertEqual(
+            resolver.interleave([v6, v6, v4, v4]), [v6, v4, v6, v4])
+
+
+class StalledConnection(models.Connection):
+    HAPPY_EYEBALLS_DELAY = 0.01
+
+    async def connect_socket(self, info):
+        family, type_, proto, canonname, address = info
+        if family == socket.AF_INET6:
+            await asyncio.sleep(60)
+        return address
+
+
+class TestHappyEyeballs(TestCase):
+    def test_fallback(self):
+        connection = StalledConnection()
+        address = self.run_async(asyncio.wait_for(
+            connection.open_socket([
+                resolver.address_info('::1', 80),
+                resolver.address_info('127.0.0.1', 80),
+            ]), 1))
+        self.assertEqual(address, ('127.0.0.1', 80))
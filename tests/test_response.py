@@ -0,0 +1,215 @@
+import asyncio
+import gzip
+import io
+import os
+import socket
+import tempfile
+import zlib
+
+from aiourllib import (
+    exc,
+    models)
+from aiourllib.response import Response
+
+from tests import TestCase
+
+
+class TestResponse(TestCase):
+    async def response(self, data, request_method='GET'):
+        client, server = socket.socketpair()
+        server.sendall(data)
+        server.close()
+
+        reader, writer = await asyncio.open_connection(sock=client)
+        connection = models.Connection()
+        connection.socket_pair = models.SocketPair(reader, writer)
+
+        response = Response(connection, request_method=request_method)
+        await response.read_headers()
+        return response
+
+    def read_content(self, data, request_method='GET'):
+        async def read():
+            response = await self.response(data, request_method)
+            return (await response.read_content())
+        return self.run_async(read())
+
+    def iter_chunks(self, data, chunk_size):
+        async def read():
+            response = await self.response(data)
+            return [c async for c in response.iter_chunks(chunk_size)]
+        return self.run_async(read())
+
+    def test_identity(self):
+        content = self.read_content(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Length: 5\r\n'
+            b'\r\n'
+            b'hello')
+        self.assertEqual(content, b'hello')
+
+    def test_until_eof(self):
+        content = self.read_content(
+            b'HTTP/1.1 200 OK\r\n'
+            b'\r\n'
+            b'hello')
+        self.assertEqual(content, b'hello')
+
+    def test_chunked(self):
+        content = self.read_content(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Transfer-Encoding: chunked\r\n'
+            b'\r\n'
+            b'5\r\nhello\r\n'
+            b'6;ext=1\r\n world\r\n'
+            b'0\r\n'
+            b'Trailer: value\r\n'
+            b'\r\n')
+        self.assertEqual(content, b'hello world')
+
+    def test_head(self):
+        content = self.read_content(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Length: 5\r\n'
+            b'\r\n', request_method='HEAD')
+        self.assertEqual(content, b'')
+
+    def test_gzip(self):
+        body = gzip.compress(b'hello' * 100)
+        content = self.read_content(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Encoding: gzip\r\n'
+            b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+            b'\r\n' + body)
+        self.assertEqual(content, b'hello' * 100)
+
+    def test_deflate(self):
+        body = zlib.compress(b'hello' * 100)
+        content = self.read_content(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Encoding: deflate\r\n'
+            b'Transfer-Encoding: chunked\r\n'
+            b'\r\n' +
+            '{:x}'.format(len(body)).encode() + b'\r\n' + body + b'\r\n'
+            b'0\r\n\r\n')
+        self.assertEqual(content, b'hello' * 100)
+
+    def test_unsupported_encoding(self):
+        async def read():
+            response = await self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Encoding: zstd\r\n'
+                b'Content-Length: 5\r\n'
+                b'\r\n'
+                b'hello')
+            with self.assertRaises(exc.ContentEncodingException):
+                await response.read_content()
+            return response.connection.socket_pair.writer
+        self.assertTrue(self.run_async(read()).is_closing())
+
+    def test_iter_chunks(self):
+        chunks = self.iter_chunks(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Transfer-Encoding: chunked\r\n'
+            b'\r\n'
+            b'5\r\nhello\r\n'
+            b'6\r\n world\r\n'
+            b'0\r\n\r\n', 4)
+        self.assertEqual(chunks, [b'hell', b'o', b' wor', b'ld'])
+
+    def test_aiter(self):
+        async def read():
+            response = await self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 5\r\n'
+                b'\r\n'
+                b'hello')
+            return [c async for c in response]
+        self.assertEqual(self.run_async(read()), [b'hello'])
+
+    def test_consumed(self):
+        async def read():
+            response = await self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 5\r\n'
+                b'\r\n'
+                b'hello')
+            await response.read()
+            await response.read()
+        with self.assertRaises(exc.ResponseException):
+            self.run_async(read())
+
+    def test_repeated_headers(self):
+        async def read():
+            return (await self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Set-Cookie: a=1\r\n'
+                b'set-cookie: b=2\r\n'
+                b'Content-Length: 0\r\n'
+                b'\r\n'))
+        response = self.run_async(read())
+        self.assertEqual(response.headers.getall('Set-Cookie'), ['a=1', 'b=2'])
+        self.assertEqual(response.get_header('SET-COOKIE'), 'a=1')
+        self.assertEqual(response.content_length, 0)
+
+    def test_folded_header(self):
+        async def read():
+            return (await self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'X-Folded: a\r\n'
+                b'\tb\r\n'
+                b'Content-Length: 0\r\n'
+                b'\r\n'))
+        response = self.run_async(read())
+        self.assertEqual(response.get_header('X-Folded'), 'a b')
+
+    def test_too_many_headers(self):
+        with self.assertRaises(exc.HeadersException):
+            self.run_async(self.response(
+                b'HTTP/1.1 200 OK\r\n' +
+                b'X-Header: value\r\n' * (Response.MAX_HEADERS + 1) +
+                b'\r\n'))
+
+    def test_head_too_large(self):
+        with self.assertRaises(exc.HeadersException):
+            self.run_async(self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'X-Header: ' + b'x' * models.Connection.MAX_HEAD_SIZE +
+                b'\r\n\r\n'))
+
+    def test_truncated_head(self):
+        with self.assertRaises(exc.ConnectionClosed):
+            self.run_async(self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 0\r\n'))
+
+    def test_save(self):
+        body = gzip.compress(b'hello' * 100000)
+
+        async def save(target, **kwargs):
+            response = await self.response(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Encoding: gzip\r\n'
+                b'Content-Length: ' + str(len(body)).encode() + b'\r\n'
+                b'\r\n' + body)
+            return (await response.save(target, **kwargs))
+
+        fileobj = io.BytesIO()
+        self.assertEqual(self.run_async(save(fileobj)), 500000)
+        self.assertEqual(fileobj.getvalue(), b'hello' * 100000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data')
+            with open(path, 'wb') as f:
+                f.write(b'partial-garbage')
+            self.run_async(save(path, offset=7, chunk_size=1000))
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), b'partial' + b'hello' * 100000)
+
+    def test_truncated_content(self):
+        with self.assertRaises(exc.ConnectionClosed):
+            self.read_content(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Length: 10\r\n'
+                b'\r\n'
+                b'hello')
@@ -0,0 +1,166 @@
+import asyncio
+
+from aiourllib.response import BufferedResponse
+from aiourllib.singleflight import SingleFlight
+
+from tests import TestCase
+
+
+URI = 'http://example.com/config'
+
+
+class Origin(object):
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+        self.requests = 0
+        self.cancelled = 0
+        self.event = asyncio.Event()
+
+    async def send(self, headers):
+        self.requests += 1
+        try:
+            await self.event.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        response = BufferedResponse(
+            '200 OK', '1.1', [('Content-Length', '6')], b'config', 'GET')
+        self.sent.append(response)
+        return response
+
+
+class TestSingleFlight(TestCase):
+    def setUp(self):
+        super().setUp()
+        asyncio.set_event_loop(self.loop)
+        self.single_flight = SingleFlight()
+
+    def tearDown(self):
+        self.single_flight.close()
+        super().tearDown()
+        asyncio.set_event_loop(None)
+
+    def test_shared_request(self):
+        async def test():
+            origin = Origin()
+            tasks = [
+                asyncio.ensure_future(self.single_flight.fetch(
+                    'GET', uri_reference, {'Accept': '*/*'}, origin.send))
+                for uri_reference in [URI, 'HTTP://EXAMPLE.COM/config'] * 50]
+            await asyncio.sleep(0)
+            origin.event.set()
+            responses = await asyncio.gather(*tasks)
+
+            self.assertEqual(origin.requests, 1)
+            self.assertEqual(len(set(map(id, responses))), 100)
+            for response in responses:
+                self.assertEqual(await response.read_content(), b'config')
+
+        self.run_async(test())
+
+    def test_single_waiter(self):
+        # Nothing to share, the response is not buffered.
+        async def test():
+            origin = Origin()
+            origin.event.set()
+            response = await self.single_flight.fetch(
+                'GET', URI, None, origin.send)
+            self.assertIs(response, origin.sent[0])
+            self.assertFalse(self.single_flight._flights)
+
+        self.run_async(test())
+
+    def test_max_size(self):
+        async def test():
+            self.single_flight.max_size = 4
+            origin = Origin()
+            tasks = [
+                asyncio.ensure_future(self.single_flight.fetch(
+                    'GET', URI, None, origin.send))
+                for _ in range(3)]
+            await asyncio.sleep(0)
+            origin.event.set()
+            responses = await asyncio.gather(*tasks)
+            # One waiter reads the first response, the others sent their
+            # own requests.
+            self.assertEqual(origin.requests, 3)
+            self.assertEqual(
+                sorted(map(id, responses)), sorted(map(id, origin.sent)))
+
+        self.run_async(test())
+
+    def test_distinct_keys(self):
+        async def test():
+            origin = Origin()
+            tasks = [
+                asyncio.ensure_future(self.single_flight.fetch(
+                    'GET', URI, headers, origin.send))
+                for headers in [{'Accept': 'a'}, {'Accept': 'b'}, None]]
+            tasks.append(asyncio.ensure_future(self.single_flight.fetch(
+                'POST', URI, None, origin.send)))
+            await asyncio.sleep(0)
+            origin.event.set()
+            await asyncio.gather(*tasks)
+            self.assertEqual(origin.requests, 4)
+
+        self.run_async(test())
+
+    def test_error(self):
+        async def test():
+            origin = Origin(ConnectionResetError())
+            tasks = [
+                asyncio.ensure_future(self.single_flight.fetch(
+                    'GET', URI, None, origin.send))
+                for _ in range(3)]
+            await asyncio.sleep(0)
+            origin.event.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                self.assertIsInstance(result, ConnectionResetError)
+            self.assertEqual(origin.requests, 1)
+
+        self.run_async(test())
+
+    def test_cancel_one_waiter(self):
+        async def test():
+            origin = Origin()
+            first, second = [
+                asyncio.ensure_future(self.single_flight.fetch(
+                    'GET', URI, None, origin.send))
+                for _ in range(2)]
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            origin.event.set()
+
+            response = await second
+            self.assertEqual(await response.read_content(), b'config')
+            self.assertTrue(first.cancelled())
+            self.assertEqual(origin.cancelled, 0)
+
+        self.run_async(test())
+
+    def test_cancel_all_waiters(self):
+        async def test():
+            origin = Origin()
+            tasks = [
+                asyncio.ensure_future(self.single_flight.fetch(
+                    'GET', URI, None, origin.send))
+                for _ in range(2)]
+            await asyncio.sleep(0)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.sleep(0)
+            self.assertEqual(origin.cancelled, 1)
+
+            origin.event.set()
+            response = await self.single_flight.fetch(
+                'GET', URI, None, origin.send)
+            self.assertEqual(await response.read_content(), b'config')
+            self.assertEqual(origin.requests, 2)
+
+        self.run_async(test())
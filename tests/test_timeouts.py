@@ -0,0 +1,128 @@
+import asyncio
+import socket
+import unittest
+import unittest.mock
+
+from aiourllib import (
+    exc,
+    models)
+from aiourllib.response import Response
+from aiourllib.timeouts import (
+    Timeout,
+    Timer)
+
+from tests import TestCase
+
+
+HEAD = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Transfer-Encoding: chunked\r\n'
+    b'\r\n')
+
+
+class TestTimeouts(TestCase):
+    async def serve(self, parts, timeout, total=None):
+        client, server = socket.socketpair()
+        server.setblocking(False)
+        reader, writer = await asyncio.open_connection(sock=client)
+        connection = models.Connection(timeout)
+        connection.socket_pair = models.SocketPair(reader, writer)
+        deadline = None
+        if total is not None:
+            deadline = self.loop.time() + total
+        connection.start(timeout, deadline)
+
+        async def drip():
+            for delay, data in parts:
+                await asyncio.sleep(delay)
+                await self.loop.sock_sendall(server, data)
+
+        task = asyncio.ensure_future(drip())
+        try:
+            response = Response(connection)
+            await response.read_headers()
+            return (await response.read_content())
+        finally:
+            task.cancel()
+            writer.close()
+            server.close()
+
+    def test_no_timeouts(self):
+        content = self.run_async(self.serve([
+            (0, HEAD),
+            (0.01, b'5\r\nhello\r\n0\r\n\r\n')], Timeout()))
+        self.assertEqual(content, b'hello')
+
+    def test_first_byte(self):
+        with self.assertRaises(exc.ReadTimeout):
+            self.run_async(self.serve([
+                (0.2, HEAD)], Timeout(first_byte=0.05)))
+
+    def test_between_bytes(self):
+        timeout = Timeout(first_byte=1, between_bytes=0.05)
+        content = self.run_async(self.serve(
+            [(0.02, HEAD)] +
+            [(0.02, b'1\r\na\r\n')] * 10 +
+            [(0, b'0\r\n\r\n')], timeout))
+        self.assertEqual(content, b'a' * 10)
+
+        with self.assertRaises(exc.ReadTimeout):
+            self.run_async(self.serve([
+                (0, HEAD),
+                (0, b'1\r\na\r\n'),
+                (0.2, b'0\r\n\r\n')], timeout))
+
+    def test_total(self):
+        timeout = Timeout(between_bytes=0.05, total=0.1)
+        with self.assertRaises(exc.RequestTimeout):
+            self.run_async(self.serve(
+                [(0, HEAD)] + [(0.02, b'1\r\na\r\n')] * 20, timeout,
+                total=timeout.total))
+
+    def test_task_not_cancelled(self):
+        async def test():
+            with self.assertRaises(exc.ReadTimeout):
+                await self.serve([(0.2, HEAD)], Timeout(first_byte=0.01))
+            await asyncio.sleep(0)
+            return True
+        self.assertTrue(self.run_async(test()))
+
+    @unittest.skipUnless(
+        hasattr(asyncio.Task, 'uncancel'), 'Python 3.11 or later')
+    def test_cancelled_with_timeout(self):
+        # The caller cancels in the same iteration the timer fires, its
+        # cancellation is not turned into a timeout.
+        fire = Timer.fire
+
+        def fire_and_cancel(timer):
+            task = timer.task
+            fire(timer)
+            if timer.expired:
+                task.cancel()
+
+        with unittest.mock.patch.object(Timer, 'fire', fire_and_cancel):
+            with self.assertRaises(asyncio.CancelledError):
+                self.run_async(self.serve(
+                    [(0.2, HEAD)], Timeout(first_byte=0.01)))
+
+
+class TestTimer(TestCase):
+    def test_rescheduled_lazily(self):
+        timer = Timer()
+        scheduled = []
+        schedule = timer.schedule
+
+        def count(when):
+            scheduled.append(when)
+            schedule(when)
+        timer.schedule = count
+
+        async def reads():
+            for _ in range(1000):
+                timer.arm(self.loop.time() + 0.05)
+                await asyncio.sleep(0)
+                timer.disarm()
+
+        self.run_async(reads())
+        timer.cancel()
+        self.assertLess(len(scheduled), 100)
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import ssl
+import unittest
+
+import aiourllib
+from aiourllib import tls
+
+from tests import TestCase
+
+
+CERTFILE = os.path.join(os.path.dirname(__file__), 'keycert.pem')
+
+
+class TestSSLContext(unittest.TestCase):
+    def setUp(self):
+        self.server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.server_context.load_cert_chain(CERTFILE)
+        self.context = tls.create_context(cafile=CERTFILE)
+
+    def handshake(self, server_hostname='localhost'):
+        client_in, client_out = ssl.MemoryBIO(), ssl.MemoryBIO()
+        server_in, server_out = ssl.MemoryBIO(), ssl.MemoryBIO()
+        client = self.context.wrap_bio(
+            client_in, client_out, server_hostname=server_hostname)
+        server = self.server_context.wrap_bio(
+            server_in, server_out, server_side=True)
+
+        def pump():
+            server_in.write(client_out.read())
+            client_in.write(server_out.read())
+
+        for ssl_object in [client, server] * 10:
+            try:
+                ssl_object.do_handshake()
+            except ssl.SSLWantReadError:
+                pass
+            pump()
+
+        # TLS 1.3 tickets are sent after the handshake with the first data.
+        server.write(b'data')
+        pump()
+        self.assertEqual(client.read(4), b'data')
+        return client
+
+    def test_resumption(self):
+        client = self.handshake()
+        self.assertFalse(client.session_reused)
+        self.context.save_session(client.server_hostname, client.session)
+
+        client = self.handshake()
+        self.assertTrue(client.session_reused)
+
+    def test_session_cache_size(self):
+        self.context.session_cache_size = 1
+        client = self.handshake()
+        self.context.save_session('a', client.session)
+        self.context.save_session('b', client.session)
+        self.assertEqual(list(self.context.sessions), [('b', None)])
+
+    def test_port(self):
+        port = tls.PORT.set(443)
+        try:
+            client = self.handshake()
+            self.context.save_session(
+                client.server_hostname, client.session, 443)
+            self.assertTrue(self.handshake().session_reused)
+        finally:
+            tls.PORT.reset(port)
+
+        port = tls.PORT.set(8443)
+        try:
+            self.assertFalse(self.handshake().session_reused)
+        finally:
+            tls.PORT.reset(port)
+
+    def test_verify(self):
+        context = tls.create_context(verify=False)
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+        self.assertFalse(context.check_hostname)
+
+    def test_untrusted(self):
+        self.context = tls.create_context()
+        with self.assertRaises(ssl.SSLError):
+            self.handshake()
+
+
+class TestSessionResumption(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.server_context.load_cert_chain(CERTFILE)
+        self.reused = []
+
+    async def handle(self, reader, writer):
+        # Every response closes the connection, as Connection: close does.
+        try:
+            await reader.readuntil(b'\r\n\r\n')
+            self.reused.append(
+                writer.get_extra_info('ssl_object').session_reused)
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Connection: close\r\n'
+                b'\r\n'
+                b'hello')
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def test_connection_close(self):
+        async def get_all():
+            listener = await asyncio.start_server(
+                self.handle, '127.0.0.1', 0, ssl=self.server_context)
+            uri_reference = 'https://localhost:{}/'.format(
+                listener.sockets[0].getsockname()[1])
+            session = aiourllib.Session(
+                ssl_context=tls.create_context(cafile=CERTFILE))
+            try:
+                for _ in range(3):
+                    response = await session.get(uri_reference)
+                    self.assertEqual(
+                        (await response.read_content()), b'hello')
+            finally:
+                session.close()
+                listener.close()
+                await listener.wait_closed()
+        self.run_async(get_all())
+        self.assertEqual(self.reused, [False, True, True])
@@ -0,0 +1,94 @@
+import asyncio
+
+import aiourllib
+from aiourllib.request import Request
+from aiourllib.tracing import TraceConfig
+
+from tests import TestCase
+from tests.test_client import Server
+
+
+class TestTracing(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = Server()
+        self.listener = self.run_async(
+            asyncio.start_server(self.server.handle, '127.0.0.1', 0))
+        self.base = 'http://127.0.0.1:{}'.format(
+            self.listener.sockets[0].getsockname()[1])
+
+        self.events = []
+        self.trace_config = TraceConfig(context=dict)
+        for name in TraceConfig.EVENTS:
+            self.trace_config.on(name, self.events.append)
+        self.session = aiourllib.Session(trace_config=self.trace_config)
+
+    def tearDown(self):
+        async def close():
+            self.session.close()
+            self.listener.close()
+            for handler in self.server.handlers:
+                handler.cancel()
+            await asyncio.gather(*self.server.handlers, return_exceptions=True)
+        self.run_async(close())
+        super().tearDown()
+
+    def get(self, path):
+        async def get():
+            response = await self.session.get(self.base + path)
+            return (await response.read_content())
+        return self.run_async(get())
+
+    def names(self):
+        return [event.name for event in self.events]
+
+    def test_events(self):
+        self.assertEqual(self.get('/chunked'), b'hello world')
+        self.assertEqual(self.names(), [
+            'request_start',
+            'pool_wait_start',
+            'pool_wait_end',
+            'pool_miss',
+            'dns_resolve_start',
+            'dns_resolve_end',
+            'connect_start',
+            'connect_end',
+            'request_written',
+            'first_byte',
+            'headers_received',
+            'chunk_received',
+            'chunk_received',
+            'request_end',
+        ])
+        times = [event.time for event in self.events]
+        self.assertEqual(times, sorted(times))
+
+        trace = self.events[0].trace
+        self.assertEqual(trace.context, {})
+        end = self.events[-1].info
+        self.assertEqual(end['status_code'], 200)
+        self.assertEqual(end['bytes_out'], trace.bytes_out)
+        self.assertEqual(
+            end['bytes_in'],
+            self.events[-4].info['bytes'] + len(b'hello world'))
+
+        del self.events[:]
+        self.get('/chunked')
+        self.assertIn('pool_hit', self.names())
+        self.assertNotIn('connect_start', self.names())
+
+    def test_exception(self):
+        async def get():
+            await self.session.get('http://127.0.0.1:1/')
+        with self.assertRaises(OSError):
+            self.run_async(get())
+        self.assertEqual(self.names()[-1], 'request_exception')
+        self.assertIsInstance(
+            self.events[-1].info['exception'], OSError)
+
+    def test_no_listeners(self):
+        trace_config = TraceConfig()
+        self.assertIsNone(
+            trace_config.trace(Request('GET', 'http://example.com/')))
+        with self.assertRaises(ValueError):
+            trace_config.on('dns', print)
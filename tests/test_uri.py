@@ -1,6 +1,8 @@
 import unittest
 
-from aiourllib import uri
+from aiourllib import (
+    exc,
+    uri)
 
 
 class TestURI(unittest.TestCase):
@@ -31,3 +33,49 @@ class TestURI(unittest.TestCase):
 
     def test_urn(self):
         self.assertMatch('urn:oasis:names:specification:docbook:dtd:xml:4.1.2')
+
+    def test_ipv6(self):
+        self.assertMatch('http://[2001:db8::7]:8080/c=GB')
+        components = uri.from_string('http://[::1]/').components
+        self.assertEqual(components.host, '[::1]')
+        self.assertIsNone(components.port)
+
+    def test_relative_ref(self):
+        self.assertMatch('items/1?page=2')
+        components = uri.from_string('//example.com/a').components
+        self.assertEqual(components.relative_ref, '//example.com/a')
+        self.assertEqual(components.host, 'example.com')
+        self.assertEqual(components.path_abempty, '/a')
+
+    def test_cache(self):
+        uri_reference = 'http://www.ietf.org/rfc/rfc2396.txt'
+        self.assertIs(
+            uri.from_string(uri_reference), uri.from_string(uri_reference))
+        self.assertIs(
+            uri.from_string(uri_reference).components,
+            uri.from_string(uri_reference).components)
+
+
+class TestURIValidation(unittest.TestCase):
+    def assertInvalid(self, uri_reference, exception):
+        with self.assertRaises(exception):
+            uri.from_string(uri_reference)
+
+    def test_scheme(self):
+        self.assertInvalid('1http://example.com/', exc.SchemeException)
+        self.assertInvalid('ht~tp://example.com/', exc.SchemeException)
+
+    def test_port(self):
+        self.assertInvalid('http://example.com:8o/', exc.PortException)
+
+    def test_userinfo(self):
+        self.assertInvalid('http://us]er@example.com/', exc.UserInfoException)
+
+    def test_query(self):
+        self.assertInvalid('http://example.com/?a^b', exc.QueryException)
+
+    def test_fragment(self):
+        self.assertInvalid('http://example.com/#a^b', exc.FragmentException)
+
+    def test_path(self):
+        self.assertInvalid('http://example.com/a^b', exc.PathException)